@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Camada de números aleatórios dos motores de simulação.
+
+  • Dois geradores:
+      - "legado": np.random.RandomState, a sequência histórica (os números
+        do relatório e do dashboard não mudam)
+      - "pcg64" : np.random.Generator(PCG64), normais pelo ziggurat (bem
+        mais baratas que o Box-Muller do legado) e fluxos derivados por
+        SeedSequence
+  • Sorteios em blocos: FluxoNormais entrega uma normal por vez ao laço
+    escalar a partir de um buffer preenchido em lotes (sem uma chamada ao
+    gerador por dia e por pedido); normais_em_bloco monta a matriz
+    réplicas × sorteios dos motores vetorizados
+  • Uma semente por réplica: no "legado" um inteiro; no "pcg64" o próprio
+    filho de SeedSequence(seed).spawn(n) (fluxos independentes pela árvore
+    de spawn, sem espremer o filho num inteiro). Como a semente é da
+    réplica, o resultado não depende de blocos, tarefas nem processos
+  • SementesFilhas cria os filhos só no recorte pedido (varreduras longas
+    não guardam milhões de SeedSequence); rotulos_sementes dá o inteiro
+    guardado nas tabelas (a semente no legado, o índice do filho no pcg64)
+  • FluxosNormais guarda a continuação do fluxo de cada réplica, para
+    motores que sorteiam por trechos (simular_estoque_fluxo)
+
+Uso:
+    fluxo = FluxoNormais(111, "pcg64")
+    d = media + desvio * fluxo.proximo()
+    z = normais_em_bloco(sementes_replicacoes(1000, 111, "pcg64"), 730, "pcg64")
+"""
+
+import numpy as np
+
+GERADORES = ("legado", "pcg64")
+GERADOR_PADRAO = "legado"
+TAMANHO_BUFFER = 1024              # normais sorteadas por vez no laço escalar
+
+
+def _validar(gerador: str):
+    if gerador not in GERADORES:
+        raise ValueError(f"gerador deve ser um de {GERADORES}, não {gerador!r}")
+
+
+def criar_gerador(semente=None, gerador: str = GERADOR_PADRAO):
+    """
+    RandomState(semente) ou default_rng(semente), isto é,
+    Generator(PCG64(SeedSequence(semente))); no pcg64 a semente pode ser um
+    SeedSequence (um filho de spawn). None sorteia a entropia. Os dois têm
+    standard_normal(n).
+    """
+    _validar(gerador)
+    if gerador == "legado":
+        return np.random.RandomState(None if semente is None else int(semente))
+    if semente is not None and not isinstance(semente, np.random.SeedSequence):
+        semente = int(semente)
+    return np.random.default_rng(semente)
+
+
+def filhos(raiz: np.random.SeedSequence, inicio: int, fim: int) -> np.ndarray:
+    """
+    Filhos inicio..fim-1 de `raiz` (os mesmos de raiz.spawn(fim)[inicio:]),
+    sem criar os anteriores, num array de objetos.
+    """
+    saida = np.empty(max(0, fim - inicio), dtype=object)
+    saida[:] = [np.random.SeedSequence(raiz.entropy, spawn_key=raiz.spawn_key + (i,),
+                                       pool_size=raiz.pool_size)
+                for i in range(inicio, fim)]
+    return saida
+
+
+class SementesFilhas:
+    """
+    As n primeiras sementes-filhas de `raiz`, criadas só quando fatiadas
+    (sementes[ini:fim] → array de SeedSequence).
+    """
+
+    def __init__(self, raiz: np.random.SeedSequence, n: int):
+        self.raiz = raiz
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, fatia):
+        if not isinstance(fatia, slice):
+            raise TypeError("SementesFilhas só aceita fatias")
+        inicio, fim, passo = fatia.indices(self.n)
+        if passo != 1:
+            raise TypeError("SementesFilhas não aceita fatias com passo")
+        return filhos(self.raiz, inicio, fim)
+
+
+def sementes_replicacoes(n_replicacoes: int, seed: int | None,
+                         gerador: str = GERADOR_PADRAO) -> np.ndarray:
+    """
+    Semente de cada réplica:
+        - legado: int64 seed, seed+1, ... (réplica 0 = simular_estoque(seed=seed))
+        - pcg64 : SeedSequence(seed).spawn(n), um fluxo filho independente
+                  por réplica (array de objetos)
+    seed=None sorteia a raiz.
+    """
+    _validar(gerador)
+    if gerador == "legado":
+        if seed is not None:
+            return seed + np.arange(n_replicacoes, dtype=np.int64)
+        return np.random.RandomState().randint(0, 2**31 - 1, size=n_replicacoes)
+    return filhos(np.random.SeedSequence(seed), 0, n_replicacoes)
+
+
+def como_sementes(sementes) -> np.ndarray:
+    """Sementes como array: int64 ou, se forem SeedSequence, de objetos."""
+    if isinstance(sementes, SementesFilhas):
+        return sementes[:]
+    if isinstance(sementes, np.ndarray) and sementes.dtype == object:
+        return sementes
+    lista = list(sementes) if not isinstance(sementes, np.ndarray) else None
+    if lista and isinstance(lista[0], np.random.SeedSequence):
+        saida = np.empty(len(lista), dtype=object)
+        saida[:] = lista
+        return saida
+    return np.asarray(sementes, dtype=np.int64)
+
+
+def rotulos_sementes(sementes) -> np.ndarray:
+    """
+    Inteiro que identifica a semente de cada réplica nas tabelas: a própria
+    semente no legado; no pcg64 o índice do filho na árvore de spawn
+    (reproduzível a partir da seed raiz).
+    """
+    sementes = como_sementes(sementes)
+    if sementes.dtype != object:
+        return sementes
+    return np.array([s.spawn_key[-1] if s.spawn_key else -1 for s in sementes], dtype=np.int64)
+
+
+def normais_em_bloco(sementes, n_sorteios: int, gerador: str = GERADOR_PADRAO) -> np.ndarray:
+    """Matriz (N, n_sorteios): linha i = primeiros sorteios do fluxo de sementes[i]."""
+    _validar(gerador)
+    z = np.empty((len(sementes), n_sorteios))
+    if gerador == "legado":
+        rng = np.random.RandomState()
+        for i, s in enumerate(sementes):
+            rng.seed(int(s))  # re-semear é bem mais barato que criar um RandomState
+            z[i] = rng.standard_normal(n_sorteios)
+    else:
+        for i, s in enumerate(sementes):
+            criar_gerador(s, "pcg64").standard_normal(out=z[i])
+    return z
+
+
+class FluxoNormais:
+    """
+    Normais padrão de um fluxo, uma a uma, tiradas de um buffer sorteado em
+    lotes de `tamanho_buffer`. A sequência é a mesma de chamadas sucessivas
+    ao gerador (inclusive a de rng.normal(media, desvio) no legado).
+    """
+    __slots__ = ("_rng", "_buffer", "_posicao", "_tamanho")
+
+    def __init__(self, semente=None, gerador: str = GERADOR_PADRAO,
+                 tamanho_buffer: int = TAMANHO_BUFFER):
+        self._rng = criar_gerador(semente, gerador)
+        self._tamanho = tamanho_buffer
+        self._buffer = []
+        self._posicao = 0
+
+    def proximo(self) -> float:
+        if self._posicao == len(self._buffer):
+            # Lista de float: indexar é bem mais barato que escalares NumPy
+            self._buffer = self._rng.standard_normal(self._tamanho).tolist()
+            self._posicao = 0
+        valor = self._buffer[self._posicao]
+        self._posicao += 1
+        return valor
+
+    def normais(self, n: int) -> np.ndarray:
+        """As próximas n normais (o que restou no buffer primeiro)."""
+        restantes = self._buffer[self._posicao:]
+        self._buffer, self._posicao = [], 0
+        if len(restantes) >= n:
+            self._buffer, self._posicao = restantes, n
+            return np.array(restantes[:n])
+        return np.concatenate([restantes, self._rng.standard_normal(n - len(restantes))])
+
+
+class FluxosNormais:
+    """
+    Fluxos de várias réplicas que continuam de onde pararam: continuar(i, n)
+    devolve os n sorteios seguintes da réplica i. No legado um único
+    RandomState troca de estado entre as réplicas (guardar N RandomState
+    custaria ~5 KB cada); no pcg64 cada réplica tem o seu Generator.
+    """
+
+    def __init__(self, sementes, gerador: str = GERADOR_PADRAO):
+        _validar(gerador)
+        self.gerador = gerador
+        if gerador == "legado":
+            self._rng = np.random.RandomState()
+            self._estados = [None] * len(sementes)
+            self._sementes = [int(s) for s in sementes]
+        else:
+            self._geradores = [criar_gerador(s, "pcg64") for s in sementes]
+
+    def continuar(self, i: int, n: int) -> np.ndarray:
+        if self.gerador != "legado":
+            return self._geradores[i].standard_normal(n)
+        if self._estados[i] is None:
+            self._rng.seed(self._sementes[i])
+        else:
+            self._rng.set_state(self._estados[i])
+        z = self._rng.standard_normal(n)
+        self._estados[i] = self._rng.get_state()
+        return z
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Avaliação analítica (aproximada) da política (Q, ROP), sem simular.
+
+  • Custo esperado de pedido, manutenção e falta e nível de serviço por
+    ciclo, pela função de perda da normal
+  • Vetorizada: avalia milhares de políticas de uma vez (arrays de Q e ROP,
+    parâmetros escalares ou por política)
+  • Serve de triagem: varreduras e otimizador simulam só os candidatos
+    promissores; comparar_com_simulacao mede o erro da aproximação
+
+O modelo segue as regras de simular_estoque: revisão no fim do dia (o
+estoque cruza o ROP com um "undershoot" de até uma demanda diária), um
+pedido em aberto por vez, falta acumulada (custo por unidade × dia em
+falta) e chegada no dia de emissão + lead time, antes da revisão. Assim a
+exposição à falta é de lead time − 1 dias após o dia do pedido.
+"""
+
+import numpy as np
+
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    calcular_parametros_lote, normais_replicacoes, simular_politicas,
+)
+
+METRICAS_ANALITICAS = ("n_pedidos", "custo_pedido", "custo_manut", "custo_falta",
+                       "custo_total", "nivel_servico")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. NORMAL PADRÃO VETORIZADA
+# ══════════════════════════════════════════════════════════════════════════════
+def _phi(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+
+def _Phi(x):
+    """
+    CDF da normal padrão (Abramowitz & Stegun 7.1.26, erro < 1e-7): só
+    NumPy, sem scipy.
+    """
+    t = 1.0 / (1.0 + 0.3275911 * np.abs(x) / np.sqrt(2))
+    poli = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741
+                + t * (-1.453152027 + t * 1.061405429))))
+    cauda = 0.5 * poli * np.exp(-0.5 * x * x)
+    return np.where(x >= 0, 1.0 - cauda, cauda)
+
+
+def perda_normal(z):
+    """Função de perda da normal padrão G(z) = E[(X − z)⁺] = φ(z) − z·(1 − Φ(z))."""
+    return _phi(z) - z * (1.0 - _Phi(z))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. AVALIAÇÃO DE POLÍTICAS
+# ══════════════════════════════════════════════════════════════════════════════
+def _distribuicao_lead_time(lt_media, lt_desvio, l_max: int):
+    """
+    P(lead time = ℓ), ℓ = 1..l_max, para max(1, round(N(μ_L, σ_L))).
+    Retorna matriz (M, l_max); σ_L = 0 vira lead time determinístico.
+    """
+    ell = np.arange(1, l_max + 1)
+    lt_media = np.asarray(lt_media, dtype=float)[..., None]
+    lt_desvio = np.asarray(lt_desvio, dtype=float)[..., None]
+    desvio = np.where(lt_desvio > 0, lt_desvio, 1.0)
+    sup = np.where(lt_desvio > 0, _Phi((ell + 0.5 - lt_media) / desvio),
+                   (ell + 0.5 > lt_media).astype(float))
+    sup[..., -1] = 1.0                           # a cauda superior fica no último ℓ
+    inf = np.concatenate([np.zeros_like(sup[..., :1]), sup[..., :-1]], axis=-1)
+    return sup - inf
+
+
+def avaliar_politicas(Q, ROP, horizonte: int = HORIZONTE,
+                      demanda_media=DEMANDA_MEDIA, demanda_desvio=DEMANDA_DESVIO,
+                      lt_media=LEAD_TIME_MEDIO, lt_desvio=LEAD_TIME_DESVIO,
+                      custo_pedido=CUSTO_PEDIDO, custo_manutencao=CUSTO_MANUTENCAO,
+                      custo_falta=CUSTO_FALTA) -> dict:
+    """
+    Valores esperados aproximados de M políticas (Q[m], ROP[m]).
+
+    Por ciclo (Q/μ_d dias): o estoque no dia do pedido é ROP − u, com u o
+    undershoot (média E[D²]/2μ − ½, variância da renovação); nos ℓ − 1 dias
+    seguintes cai com a demanda acumulada D_j ~ N(jμ, jσ²). Então:
+        falta (un·dia) = Σ_ℓ P(ℓ) Σ_{j<ℓ} σ_j · G((ROP − ū − jμ) / σ_j)
+        serviço        = 1 − Σ_ℓ P(ℓ) · P(ROP − u − D_{ℓ−1} < 0)
+        estoque médio  = ROP − ū − μ·E[ℓ] + Q/2 + μ/2 + falta / duração do ciclo
+    e os custos seguem as fórmulas de simular_estoque no horizonte, com
+    horizonte/duração − ½ pedidos (efeito de borda da renovação). Retorna
+    arrays (M,) de METRICAS_ANALITICAS e `estavel`.
+
+    Com um pedido em aberto por vez, se Q ≤ μ·E[ℓ] o lote não cobre a
+    demanda do lead time e a falta cresce sem limite ao longo do horizonte:
+    essas políticas saem com estavel=False e custo de falta/total infinito.
+    """
+    Q = np.atleast_1d(np.asarray(Q, dtype=float))
+    ROP = np.atleast_1d(np.asarray(ROP, dtype=float))
+    Q, ROP, mu, sigma, lt_m, lt_d, cp, cm, cf = np.broadcast_arrays(
+        Q, ROP, *(np.asarray(p, dtype=float) for p in (
+            demanda_media, demanda_desvio, lt_media, lt_desvio,
+            custo_pedido, custo_manutencao, custo_falta)))
+
+    # Undershoot no cruzamento do ROP (renovação com saltos D ~ N(μ, σ²))
+    m2 = mu**2 + sigma**2
+    m3 = mu**3 + 3 * mu * sigma**2
+    u_media = m2 / (2 * mu) - 0.5
+    u_var = np.maximum(m3 / (3 * mu) - (m2 / (2 * mu))**2, 0.0)
+
+    l_max = int(np.ceil(np.max(lt_m + 6 * lt_d))) + 1
+    p_ell = _distribuicao_lead_time(lt_m, lt_d, l_max)          # (M, L), ℓ = 1..L
+    j = np.arange(l_max)                                          # dias após o pedido
+
+    media_j = (ROP - u_media)[:, None] - j * mu[:, None]          # (M, L)
+    desvio_j = np.sqrt(j * sigma[:, None]**2 + u_var[:, None])
+    desvio_j = np.maximum(desvio_j, 1e-9)
+    z_j = media_j / desvio_j
+    falta_j = desvio_j * perda_normal(z_j)                        # E[(nível_j)⁻]
+    ruptura_j = 1.0 - _Phi(z_j)                                   # P(nível_j < 0)
+
+    # Para lead time ℓ contam os dias j = 1..ℓ−1; o último é o de menor estoque
+    falta_acum = np.cumsum(np.concatenate(
+        [np.zeros_like(falta_j[:, :1]), falta_j[:, 1:]], axis=1), axis=1)[:, :l_max]
+    falta_ciclo = (p_ell * falta_acum).sum(axis=1)
+    servico = 1.0 - (p_ell * ruptura_j).sum(axis=1)
+
+    duracao_ciclo = Q / mu
+    ell_medio = (p_ell * np.arange(1, l_max + 1)).sum(axis=1)
+    nivel_medio = ROP - u_media - mu * ell_medio + Q / 2 + mu / 2
+    estoque_medio = np.maximum(nivel_medio + falta_ciclo / duracao_ciclo, 0.0)
+
+    # Pedidos nos instantes T, 2T, ... ≤ horizonte (o 1º após consumir Q)
+    n_pedidos = np.maximum(horizonte / duracao_ciclo - 0.5, 0.0)
+    custo_ped = n_pedidos * cp
+    custo_man = estoque_medio * cm
+    estavel = Q > mu * ell_medio
+    custo_fal = np.where(estavel, n_pedidos * falta_ciclo * cf, np.inf)
+    return {
+        "n_pedidos": n_pedidos,
+        "custo_pedido": custo_ped,
+        "custo_manut": custo_man,
+        "custo_falta": custo_fal,
+        "custo_total": custo_ped + custo_man + custo_fal,
+        "nivel_servico": servico,
+        "estavel": estavel,
+    }
+
+
+def otimizar_analitico(demanda_media: float = DEMANDA_MEDIA,
+                       demanda_desvio: float = DEMANDA_DESVIO,
+                       lt_media: float = LEAD_TIME_MEDIO,
+                       lt_desvio: float = LEAD_TIME_DESVIO,
+                       custo_pedido: float = CUSTO_PEDIDO,
+                       custo_manutencao: float = CUSTO_MANUTENCAO,
+                       custo_falta: float = CUSTO_FALTA,
+                       nivel_servico_min: float | None = None,
+                       horizonte: int = HORIZONTE, n_pontos: int = 80) -> dict:
+    """
+    Melhor (Q, ROP) da avaliação analítica numa grade n_pontos × n_pontos
+    em torno do EOQ (0,5× a 2×) e do ROP sem SS (até +5 desvios do lead time).
+    """
+    base = calcular_parametros_lote(demanda_media, demanda_desvio, lt_media,
+                                    lt_desvio, custo_pedido, custo_manutencao,
+                                    horizonte=horizonte)
+    eoq, rop_a = int(base["EOQ"]), int(base["ROP_A"])
+    desvio_lt = np.sqrt(lt_media * demanda_desvio**2 + demanda_media**2 * lt_desvio**2)
+    Qs = np.unique(np.linspace(max(1, eoq // 2), 2 * eoq, n_pontos).round().astype(int))
+    ROPs = np.unique(np.linspace(max(0, rop_a - desvio_lt), rop_a + 5 * desvio_lt,
+                                 n_pontos).round().astype(int))
+    Q, ROP = (g.ravel() for g in np.meshgrid(Qs, ROPs))
+    aval = avaliar_politicas(Q, ROP, horizonte, demanda_media, demanda_desvio,
+                             lt_media, lt_desvio, custo_pedido, custo_manutencao,
+                             custo_falta)
+    custo = aval["custo_total"].copy()
+    if nivel_servico_min is not None:
+        custo[aval["nivel_servico"] < nivel_servico_min] = np.inf
+        if not np.isfinite(custo).any():
+            custo = nivel_servico_min - aval["nivel_servico"]   # a menos inviável
+    k = int(np.argmin(custo))
+    return {"Q": int(Q[k]), "ROP": int(ROP[k]), **{m: aval[m][k] for m in METRICAS_ANALITICAS}}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. TRIAGEM E ERRO DA APROXIMAÇÃO
+# ══════════════════════════════════════════════════════════════════════════════
+def triar_pontos(pontos: list[dict], margem: float = 0.10,
+                 nivel_servico_min: float | None = None,
+                 folga_servico: float = 0.01,
+                 n_max: int | None = None) -> list[int]:
+    """
+    Índices dos pontos de uma varredura (ver varredura_estoque.montar_grade)
+    que valem simular: políticas estáveis com custo analítico até
+    (1 + margem) × o melhor, entre as que atingem nivel_servico_min menos
+    `folga_servico` (a aproximação erra o serviço em ~0,5 p.p.). n_max
+    limita aos n_max mais baratos.
+    """
+    chaves = ("demanda_media", "demanda_desvio", "lt_media", "lt_desvio",
+              "custo_pedido", "custo_manutencao", "custo_falta", "horizonte")
+    padrao = dict(zip(chaves, (DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+                               LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO,
+                               CUSTO_FALTA, HORIZONTE)))
+    colunas = {c: np.array([p[c] if c in ("Q", "ROP") else p.get(c, padrao[c])
+                            for p in pontos], dtype=float)
+               for c in ("Q", "ROP") + chaves}
+    horizontes = np.unique(colunas.pop("horizonte"))
+    if len(horizontes) > 1:
+        raise ValueError("triar_pontos: todos os pontos devem ter o mesmo horizonte")
+    aval = avaliar_politicas(horizonte=int(horizontes[0]), **colunas)
+
+    custo = aval["custo_total"]
+    candidatos = aval["estavel"].copy()
+    if nivel_servico_min is not None:
+        candidatos &= aval["nivel_servico"] >= nivel_servico_min - folga_servico
+    if not candidatos.any():
+        return []
+    melhor = custo[candidatos].min()
+    candidatos &= custo <= melhor * (1 + margem)
+    indices = np.flatnonzero(candidatos)
+    indices = indices[np.argsort(custo[indices], kind="stable")]
+    if n_max is not None:
+        indices = indices[:n_max]
+    return sorted(indices.tolist())
+
+
+def comparar_com_simulacao(Q, ROP, n_replicacoes: int = 500,
+                           horizonte: int = HORIZONTE, seed: int | None = SEED,
+                           **parametros) -> dict:
+    """
+    Avalia as políticas pelos dois caminhos (simulação com números
+    aleatórios comuns) e devolve, por métrica, os arrays "analitico",
+    "simulado", "erro" (analítico − simulado) e "erro_relativo".
+    """
+    Q = np.atleast_1d(np.asarray(Q, dtype=np.int64))
+    ROP = np.atleast_1d(np.asarray(ROP, dtype=np.int64))
+    aval = avaliar_politicas(Q, ROP, horizonte, **parametros)
+    sementes = (seed if seed is not None else 0) + np.arange(n_replicacoes)
+    z = normais_replicacoes(sementes, 2 * horizonte)
+    sim = simular_politicas(Q, ROP, z, horizonte=horizonte, **parametros)
+
+    comparacao = {}
+    for m in METRICAS_ANALITICAS:
+        simulado = sim[m].mean(axis=1)
+        erro = aval[m] - simulado
+        comparacao[m] = {
+            "analitico": aval[m],
+            "simulado": simulado,
+            "erro": erro,
+            "erro_relativo": erro / np.where(simulado != 0, np.abs(simulado), 1.0),
+        }
+    comparacao["estavel"] = aval["estavel"]
+    return comparacao
+
+
+def resumir_erro(comparacao: dict) -> dict:
+    """
+    Erro da aproximação por métrica, só nas políticas estáveis: erro
+    relativo médio (viés), erro relativo absoluto médio e máximo.
+    """
+    estavel = comparacao["estavel"]
+    resumo = {}
+    for m in METRICAS_ANALITICAS:
+        rel = comparacao[m]["erro_relativo"][estavel]
+        resumo[m] = {
+            "vies": rel.mean() if len(rel) else np.nan,
+            "erro_medio": np.abs(rel).mean() if len(rel) else np.nan,
+            "erro_maximo": np.abs(rel).max() if len(rel) else np.nan,
+        }
+    return resumo
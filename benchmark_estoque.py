@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Benchmarks dos motores de simulação, das varreduras e do dashboard.
+
+  • Cada caso é cronometrado várias vezes (vale o menor tempo); cada
+    medição repete a chamada até somar TEMPO_MINIMO segundos (como
+    timeit.Timer.autorange) e o caso roda uma vez a mais sob tracemalloc
+    para medir o pico de memória
+  • Vazão em réplica-dias por segundo (réplicas × horizonte / tempo)
+  • Resultados em JSON, comparáveis entre commits com um limite de
+    regressão acrescido do ruído medido de cada caso (código de saída 1 se
+    algum caso ficar mais lento); com --rapido a comparação sai sem
+    veredito, porque os casos pequenos são ruidosos demais
+
+Uso:
+    python benchmark_estoque.py --saida bench_base.json
+    python benchmark_estoque.py --comparar bench_base.json --limite 0.20
+    python benchmark_estoque.py --rapido --filtro horizonte
+
+O pico de memória é o das alocações Python/NumPy do processo atual: com
+--processos > 1 a memória dos processos filhos das varreduras não entra.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from nucleo_estoque import (
+    SEED, HORIZONTE, EOQ, ROP_B, DEMANDA_MEDIA, DEMANDA_DESVIO,
+    LEAD_TIME_MEDIO, LEAD_TIME_DESVIO, CUSTO_FALTA, calcular_parametros_lote,
+    simular_estoque, simular_estoque_lote, simular_estoque_eventos,
+    simular_estoque_fluxo,
+)
+
+HORIZONTES_LONGOS = (365, 10_000, 100_000)
+REPLICACOES_LOTE = 1000            # caso "replicacoes"
+REPLICACOES_HORIZONTE_LONGO = 32   # réplicas do motor em lote nos horizontes longos
+SKUS_PORTFOLIO = 1000
+SKUS_PARAMETROS = 100_000
+REPLICACOES_VARREDURA = 200        # réplicas por ponto nas Figs 6 e 7
+LIMITE_REGRESSAO = 0.20            # +20% de tempo conta como regressão
+REPETICOES = 5                     # medições por caso (vale a menor)
+TEMPO_MINIMO = 0.5                 # s somados por medição
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. CASOS
+# ══════════════════════════════════════════════════════════════════════════════
+def _caso(nome: str, funcao, replicacao_dias: int) -> dict:
+    return {"nome": nome, "funcao": funcao, "replicacao_dias": replicacao_dias}
+
+
+def _carregar_dashboard():
+    """
+    Importa dashboard_estoque fora do `streamlit run` (modo "bare"): o
+    script inteiro roda uma vez com os valores padrão da barra lateral. Os
+    avisos do modo "bare" vão para um buffer descartado.
+    """
+    with contextlib.redirect_stderr(io.StringIO()):
+        import dashboard_estoque
+    return dashboard_estoque
+
+
+def _portfolio_sintetico(n_skus: int, seed: int = SEED):
+    from portfolio_estoque import montar_portfolio
+
+    rng = np.random.RandomState(seed)
+    return montar_portfolio(
+        demanda_media=rng.uniform(20, 500, n_skus),
+        demanda_desvio=rng.uniform(2, 80, n_skus),
+        lt_media=rng.uniform(2, 15, n_skus),
+        lt_desvio=rng.uniform(0, 4, n_skus))
+
+
+def casos_trajetoria() -> list[dict]:
+    return [
+        _caso("trajetoria/escalar_365",
+              lambda: simular_estoque(EOQ, ROP_B, seed=SEED), HORIZONTE),
+        _caso("trajetoria/eventos_365",
+              lambda: simular_estoque_eventos(EOQ, ROP_B, seed=SEED), HORIZONTE),
+    ]
+
+
+def casos_dashboard() -> list[dict]:
+    d = _carregar_dashboard()
+    argumentos = (EOQ, ROP_B, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+                  LEAD_TIME_DESVIO)
+
+    def sem_cache():
+        trajetoria = d._simular_trajetoria(*argumentos, SEED)
+        return d.precificar(trajetoria, d.CUSTO_PEDIDO, d.CUSTO_MANUTENCAO, CUSTO_FALTA)
+
+    return [
+        # Mesma política e seed dos casos "trajetoria": comparação direta
+        _caso("dashboard/sem_cache_365", sem_cache, d.HORIZONTE),
+        _caso("dashboard/com_cache_365",
+              lambda: d.simular_estoque(*argumentos, CUSTO_FALTA, seed=SEED), d.HORIZONTE),
+    ]
+
+
+def casos_replicacoes(rapido: bool = False) -> list[dict]:
+    n = REPLICACOES_LOTE // 10 if rapido else REPLICACOES_LOTE
+
+    def laco():
+        return [simular_estoque(EOQ, ROP_B, seed=SEED + r) for r in range(n // 10)]
+
+    return [
+        _caso(f"replicacoes/lote_{n}",
+              lambda: simular_estoque_lote(EOQ, ROP_B, n_replicacoes=n, seed=SEED),
+              n * HORIZONTE),
+        _caso(f"replicacoes/laco_escalar_{n // 10}", laco, n // 10 * HORIZONTE),
+    ]
+
+
+def casos_horizonte(rapido: bool = False) -> list[dict]:
+    horizontes = HORIZONTES_LONGOS[:-1] if rapido else HORIZONTES_LONGOS
+    n = REPLICACOES_HORIZONTE_LONGO
+    casos = []
+    for h in horizontes:
+        casos += [
+            _caso(f"horizonte/escalar_{h}",
+                  lambda h=h: simular_estoque(EOQ, ROP_B, horizonte=h, seed=SEED), h),
+            _caso(f"horizonte/eventos_{h}",
+                  lambda h=h: simular_estoque_eventos(EOQ, ROP_B, horizonte=h, seed=SEED), h),
+            _caso(f"horizonte/lote_{n}x{h}",
+                  lambda h=h: simular_estoque_lote(EOQ, ROP_B, n_replicacoes=n,
+                                                   horizonte=h, seed=SEED), n * h),
+            _caso(f"horizonte/fluxo_{n}x{h}",
+                  lambda h=h: simular_estoque_fluxo(EOQ, ROP_B, n_replicacoes=n,
+                                                    horizonte=h, seed=SEED), n * h),
+        ]
+    return casos
+
+
+def casos_portfolio(rapido: bool = False) -> list[dict]:
+    n_skus = SKUS_PORTFOLIO // 10 if rapido else SKUS_PORTFOLIO
+    n_param = SKUS_PARAMETROS // 10 if rapido else SKUS_PARAMETROS
+    from portfolio_estoque import simular_portfolio
+
+    portfolio = _portfolio_sintetico(n_skus)
+    grande = _portfolio_sintetico(n_param)
+    colunas = [grande[c].to_numpy() for c in ("demanda_media", "demanda_desvio",
+                                              "lt_media", "lt_desvio")]
+    return [
+        _caso(f"portfolio/simular_{n_skus}_skus",
+              lambda: simular_portfolio(portfolio, seed=SEED), n_skus * HORIZONTE),
+        # Só as fórmulas analíticas: sem dias simulados
+        _caso(f"portfolio/parametros_{n_param}_skus",
+              lambda: calcular_parametros_lote(*colunas), 0),
+    ]
+
+
+def casos_varredura(rapido: bool = False, n_processos: int | None = 1) -> list[dict]:
+    from varredura_estoque import (
+        NIVEIS_ALVO_TRADEOFF, SIGMA_L_SENSIBILIDADE, estudo_tradeoff,
+        estudo_sigma_lead_time,
+    )
+
+    n = REPLICACOES_VARREDURA // 4 if rapido else REPLICACOES_VARREDURA
+    opcoes = dict(n_replicacoes=n, seed=SEED, n_processos=n_processos)
+    return [
+        _caso(f"varredura/fig6_{n}",
+              lambda: estudo_tradeoff(**opcoes),
+              len(NIVEIS_ALVO_TRADEOFF) * n * HORIZONTE),
+        _caso(f"varredura/fig7_{n}",
+              lambda: estudo_sigma_lead_time(**opcoes),
+              len(SIGMA_L_SENSIBILIDADE) * n * HORIZONTE),
+    ]
+
+
+def casos_graficos() -> list[dict]:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from graficos_estoque import fig3_estoque_cenario_A, fig4_estoque_cenario_B
+
+    resultado = simular_estoque(EOQ, ROP_B, seed=SEED)
+
+    def desenhar(fig_funcao):
+        fig = fig_funcao(resultado)
+        fig.tight_layout()
+        fig.savefig(io.BytesIO(), format="png", dpi=300, bbox_inches="tight")
+        plt.close(fig)
+
+    return [
+        _caso("graficos/fig3_365", lambda: desenhar(fig3_estoque_cenario_A), 0),
+        _caso("graficos/fig4_365", lambda: desenhar(fig4_estoque_cenario_B), 0),
+    ]
+
+
+GRUPOS = ("trajetoria", "dashboard", "replicacoes", "horizonte", "portfolio",
+          "varredura", "graficos")
+
+
+def montar_casos(grupos=GRUPOS, rapido: bool = False,
+                 n_processos: int | None = 1) -> list[dict]:
+    """Monta os casos dos grupos pedidos (importa só o que cada grupo usa)."""
+    fabricas = {
+        "trajetoria": casos_trajetoria,
+        "dashboard": casos_dashboard,
+        "replicacoes": lambda: casos_replicacoes(rapido),
+        "horizonte": lambda: casos_horizonte(rapido),
+        "portfolio": lambda: casos_portfolio(rapido),
+        "varredura": lambda: casos_varredura(rapido, n_processos),
+        "graficos": casos_graficos,
+    }
+    return [caso for g in grupos for caso in fabricas[g]()]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. MEDIÇÃO
+# ══════════════════════════════════════════════════════════════════════════════
+def _chamadas_por_medicao(cronometro: timeit.Timer, tempo_minimo: float) -> int:
+    """
+    Como timeit.Timer.autorange, mas até `tempo_minimo` segundos: tenta 1,
+    2, 5, 10, 20, ... chamadas até a medição somar o tempo mínimo. Estimar
+    pelo tempo de uma única chamada subestimava as rápidas (a primeira ainda
+    paga imports e caches).
+    """
+    i = 1
+    while True:
+        for j in (1, 2, 5):
+            chamadas = i * j
+            if cronometro.timeit(chamadas) >= tempo_minimo:
+                return chamadas
+        i *= 10
+
+
+def medir_caso(caso: dict, repeticoes: int = REPETICOES,
+               tempo_minimo: float = TEMPO_MINIMO) -> dict:
+    """
+    Tempo por chamada (menor de `repeticoes` medições de pelo menos
+    `tempo_minimo` segundos cada), ruído relativo entre as medições
+    ((mediana - menor) / menor) e pico de memória em MB.
+    """
+    funcao = caso["funcao"]
+    cronometro = timeit.Timer(funcao)
+    chamadas = _chamadas_por_medicao(cronometro, tempo_minimo)   # também aquece
+    tempos = np.array(cronometro.repeat(repeticoes, chamadas)) / chamadas
+    segundos = float(tempos.min())
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "segundos": segundos,
+        "ruido": float(np.median(tempos)) / segundos - 1,
+        "chamadas": chamadas,
+        "replicacao_dias": caso["replicacao_dias"],
+        "replicacao_dias_por_s": caso["replicacao_dias"] / segundos if segundos else None,
+        "pico_memoria_mb": pico / 2**20,
+    }
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_benchmarks(casos: list[dict], repeticoes: int = REPETICOES,
+                        rapido: bool = False) -> dict:
+    """Mede todos os casos e devolve o documento JSON (meta + casos)."""
+    resultados = {}
+    for caso in casos:
+        resultados[caso["nome"]] = r = medir_caso(caso, repeticoes)
+        vazao = r["replicacao_dias_por_s"]
+        print(f"  {caso['nome']:<38} {r['segundos']*1e3:>10.2f} ms"
+              f"  {vazao or 0:>14,.0f} rep-dia/s  {r['pico_memoria_mb']:>8.1f} MB"
+              f"  +-{r['ruido']*100:.0f}%")
+    return {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeticoes": repeticoes,
+            "rapido": rapido,
+        },
+        "casos": resultados,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. COMPARAÇÃO ENTRE EXECUÇÕES
+# ══════════════════════════════════════════════════════════════════════════════
+def comparar(base: dict, atual: dict, limite: float = LIMITE_REGRESSAO) -> list[dict]:
+    """
+    Compara os casos presentes nas duas execuções. Um caso regrediu se o
+    tempo atual passou de base × (1 + limite + ruído da base + ruído atual):
+    a variação entre medições de cada execução alarga a tolerância do caso.
+    Sem veredito (regressao=None) se alguma das execuções usou --rapido.
+    """
+    com_veredito = not (base["meta"].get("rapido") or atual["meta"].get("rapido"))
+    linhas = []
+    for nome, r in atual["casos"].items():
+        b = base["casos"].get(nome)
+        if b is None:
+            continue
+        razao = r["segundos"] / b["segundos"]
+        tolerancia = limite + b.get("ruido", 0.0) + r.get("ruido", 0.0)
+        linhas.append({"nome": nome, "base": b["segundos"], "atual": r["segundos"],
+                       "razao": razao, "tolerancia": tolerancia,
+                       "regressao": razao > 1 + tolerancia if com_veredito else None})
+    return linhas
+
+
+def imprimir_comparacao(linhas: list[dict], limite: float):
+    print(f"\n{'-'*72}")
+    if linhas and linhas[0]["regressao"] is None:
+        print("  COMPARACAO COM A BASE (--rapido: sem veredito de regressao)")
+    else:
+        print(f"  COMPARACAO COM A BASE (regressao se > +{limite*100:.0f}% + ruido)")
+    print(f"{'-'*72}")
+    for l in linhas:
+        marca = "  REGRESSAO" if l["regressao"] else ""
+        print(f"  {l['nome']:<38} {l['base']*1e3:>9.2f} -> {l['atual']*1e3:>9.2f} ms"
+              f"  x{l['razao']:.2f} (tol. +{l['tolerancia']*100:.0f}%){marca}")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. LINHA DE COMANDO
+# ══════════════════════════════════════════════════════════════════════════════
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks da simulação de estoque.")
+    parser.add_argument("--saida", default=None, help="JSON com os resultados desta execução")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior (base)")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO,
+                        help="aumento relativo de tempo tolerado (0.20 = +20%%)")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--grupos", nargs="+", choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument("--filtro", default=None, help="só casos cujo nome contém o texto")
+    parser.add_argument("--rapido", action="store_true",
+                        help="tamanhos menores (horizonte até 10 mil dias); compara sem veredito")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="processos das varreduras (padrao 1, ver docstring)")
+    args = parser.parse_args(argv)
+
+    casos = montar_casos(args.grupos, args.rapido, args.processos)
+    if args.filtro:
+        casos = [c for c in casos if args.filtro in c["nome"]]
+    print(f"{len(casos)} casos ({args.repeticoes} repeticoes, menor tempo)")
+    documento = executar_benchmarks(casos, args.repeticoes, args.rapido)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(documento, f, indent=2)
+        print(f"Resultados salvos em: {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        linhas = comparar(base, documento, args.limite)
+        imprimir_comparacao(linhas, args.limite)
+        if any(l["regressao"] for l in linhas):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
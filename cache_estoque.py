@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Cache persistente de resultados de simulação, endereçado pelo conteúdo.
+
+  • A chave é o sha256 do nome do cálculo, dos parâmetros (semente incluída)
+    e da versão do motor: o hash do código-fonte dos módulos que fazem a
+    conta, então qualquer mudança no núcleo invalida as entradas antigas
+  • Cada entrada é um .npz sem pickle: os arrays (inclusive tabelas
+    estruturadas) em formato binário do NumPy e o resto da estrutura
+    (dicts, listas, tuplas, escalares) num JSON guardado junto
+  • Escrita atômica (arquivo temporário + os.replace): vários processos
+    podem gravar e ler ao mesmo tempo sem nunca ver uma entrada pela metade
+  • Despejo por tamanho: passando do limite, as entradas usadas há mais
+    tempo são apagadas (a leitura atualiza a data do arquivo)
+
+Uso:
+    cache = CacheResultados()
+    cenarios = cache.memorizar("cenarios", {"seed": 111}, calcular, ("nucleo_estoque",))
+"""
+
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+
+PASTA_CACHE = os.environ.get("ESTOQUE_CACHE_DIR", ".cache_simulacao")
+LIMITE_BYTES = 512 * 2**20         # tamanho máximo da pasta do cache
+VERSAO_FORMATO = 1                 # muda quando o formato das entradas mudar
+IDADE_TEMPORARIO = 3600            # segundos até um .tmp órfão ser apagado
+EXTENSAO = ".npz"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. CHAVES
+# ══════════════════════════════════════════════════════════════════════════════
+@functools.lru_cache(maxsize=None)
+def versao_motor(modulos: tuple = ("nucleo_estoque",)) -> str:
+    """Hash do código-fonte dos módulos (lido uma vez por processo)."""
+    h = hashlib.sha256()
+    for modulo in modulos:
+        with open(importlib.util.find_spec(modulo).origin, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _normalizar(obj):
+    """Tipos NumPy → tipos JSON, para a chave."""
+    if isinstance(obj, np.ndarray):
+        return {"dtype": obj.dtype.str, "valores": obj.tolist()}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Parâmetro sem representação para a chave do cache: {type(obj)}")
+
+
+def chave(nome: str, parametros: dict, modulos: tuple = ("nucleo_estoque",)) -> str:
+    """sha256 do nome, dos parâmetros e da versão do motor e do formato."""
+    conteudo = json.dumps({"nome": nome, "parametros": parametros,
+                           "motor": versao_motor(tuple(modulos)),
+                           "formato": VERSAO_FORMATO},
+                          sort_keys=True, default=_normalizar)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. SERIALIZAÇÃO (SEM PICKLE)
+# ══════════════════════════════════════════════════════════════════════════════
+def _codificar(obj, arrays: dict):
+    """Estrutura → JSON; cada array vai para `arrays` e vira uma referência."""
+    if isinstance(obj, dict):
+        return {"t": "dict", "v": {str(k): _codificar(v, arrays) for k, v in obj.items()}}
+    if isinstance(obj, (list, tuple)):
+        return {"t": type(obj).__name__, "v": [_codificar(v, arrays) for v in obj]}
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            raise TypeError("Arrays de objetos não vão para o cache")
+        nome = f"a{len(arrays)}"
+        arrays[nome] = obj
+        return {"t": "array", "v": nome}
+    if isinstance(obj, np.generic):
+        # Preserva o tipo (np.float64 ≠ float no repr, usado no hash das figuras)
+        return {"t": "escalar", "dtype": obj.dtype.str, "v": obj.item()}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    raise TypeError(f"Tipo sem serialização no cache: {type(obj)}")
+
+
+def _decodificar(obj, arrays):
+    if not isinstance(obj, dict):
+        return obj
+    tipo, valor = obj["t"], obj["v"]
+    if tipo == "dict":
+        return {k: _decodificar(v, arrays) for k, v in valor.items()}
+    if tipo == "list":
+        return [_decodificar(v, arrays) for v in valor]
+    if tipo == "tuple":
+        return tuple(_decodificar(v, arrays) for v in valor)
+    if tipo == "array":
+        return arrays[valor]
+    return np.dtype(obj["dtype"]).type(valor)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. CACHE EM DISCO
+# ══════════════════════════════════════════════════════════════════════════════
+class CacheResultados:
+    """Pasta de entradas <chave>.npz com despejo LRU por tamanho."""
+
+    def __init__(self, pasta: str = PASTA_CACHE, limite_bytes: int = LIMITE_BYTES):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+
+    def _caminho(self, chave_: str) -> str:
+        return os.path.join(self.pasta, chave_ + EXTENSAO)
+
+    def obter(self, chave_: str):
+        """Valor guardado em `chave_` ou None (ausente, apagado ou ilegível)."""
+        caminho = self._caminho(chave_)
+        try:
+            with np.load(caminho, allow_pickle=False) as dados:
+                arrays = {nome: dados[nome] for nome in dados.files}
+            estrutura = json.loads(str(arrays.pop("__estrutura__")))
+            valor = _decodificar(estrutura, arrays)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, EOFError, zipfile.BadZipFile):
+            # Entrada truncada ou corrompida: conta como falha e sai do disco
+            # (senão falharia de novo em toda execução)
+            _apagar(caminho)
+            return None
+        os.utime(caminho)  # marca o uso para o despejo LRU
+        return valor
+
+    def guardar(self, chave_: str, valor) -> bool:
+        """
+        Grava `valor` de forma atômica. Retorna False (sem gravar) se o valor
+        tiver tipos que não serializam sem pickle.
+        """
+        arrays = {}
+        try:
+            estrutura = _codificar(valor, arrays)
+        except TypeError:
+            return False
+        os.makedirs(self.pasta, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, __estrutura__=np.array(json.dumps(estrutura)), **arrays)
+            os.replace(temporario, self._caminho(chave_))
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        self.despejar()
+        return True
+
+    def entradas(self) -> list[tuple]:
+        """(caminho, bytes, último uso) de cada entrada, da mais antiga à mais recente."""
+        lista = []
+        try:
+            nomes = os.listdir(self.pasta)
+        except FileNotFoundError:
+            return lista
+        for nome in nomes:
+            caminho = os.path.join(self.pasta, nome)
+            try:
+                info = os.stat(caminho)
+            except FileNotFoundError:
+                continue  # apagado por outro processo
+            if nome.endswith(EXTENSAO):
+                lista.append((caminho, info.st_size, info.st_mtime))
+            elif nome.endswith(".tmp") and time.time() - info.st_mtime > IDADE_TEMPORARIO:
+                _apagar(caminho)  # sobra de um processo interrompido
+        return sorted(lista, key=lambda e: e[2])
+
+    def tamanho(self) -> int:
+        return sum(b for _, b, _ in self.entradas())
+
+    def despejar(self):
+        """Apaga as entradas menos usadas até a pasta caber no limite."""
+        entradas = self.entradas()
+        total = sum(b for _, b, _ in entradas)
+        for caminho, tamanho, _ in entradas:
+            if total <= self.limite_bytes:
+                break
+            _apagar(caminho)
+            total -= tamanho
+
+    def limpar(self) -> int:
+        """Apaga todas as entradas; retorna quantas eram."""
+        entradas = self.entradas()
+        for caminho, _, _ in entradas:
+            _apagar(caminho)
+        return len(entradas)
+
+    def memorizar(self, nome: str, parametros: dict, calcular,
+                  modulos: tuple = ("nucleo_estoque",)):
+        """
+        Devolve o resultado guardado para (nome, parametros, versão de
+        `modulos`) ou executa calcular() e guarda o resultado.
+        """
+        chave_ = chave(nome, parametros, modulos)
+        valor = self.obter(chave_)
+        if valor is not None:
+            instr.contar("cache:resultados:acerto")
+            return valor
+        instr.contar("cache:resultados:falha")
+        valor = calcular()
+        self.guardar(chave_, valor)
+        return valor
+
+
+def _apagar(caminho: str):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
@@ -1,3 +1,9 @@
+import heapq
+import json
+import os
+import threading
+import time
+
 import streamlit as st
 import numpy as np
 import pandas as pd
@@ -7,6 +13,12 @@ from scipy.stats import norm
 import plotly.express as px
 import plotly.graph_objects as go
 
+import instrumentacao_estoque as instr
+from aleatorio_estoque import GERADORES, FluxoNormais
+from reducao_estoque import MAX_PONTOS, FaixasPercentis, decimar_min_max, lttb
+
+_T0_EXECUCAO = time.perf_counter()  # cada interação reexecuta o script inteiro
+
 # Configuração da Página
 st.set_page_config(
     page_title="Simulação de Estoque - Engenharia Logística",
@@ -38,7 +50,19 @@ CUSTO_FALTA = st.sidebar.number_input("Custo de Falta (R$/un)", value=20.0, step
 st.sidebar.subheader("Política de Estoque")
 NIVEL_SERVICO_ALVO = st.sidebar.slider("Nível de Serviço Alvo (%)", 80.0, 99.9, 95.0, 0.1) / 100.0
 SEED = st.sidebar.number_input("Semente (Seed) - Reprodutibilidade", value=111, step=1)
+GERADOR = st.sidebar.selectbox("Gerador Aleatório", GERADORES, index=0,
+                               help="legado = RandomState (números históricos); pcg64 = Generator/PCG64")
 HORIZONTE = 365
+CACHE_MAX_ENTRADAS = 64  # simulações guardadas em memória (LRU)
+LIMIAR_WEBGL = 1000      # acima disso o traço vai para o WebGL (Scattergl)
+
+st.sidebar.subheader("Diagnóstico")
+MOSTRAR_TEMPOS = st.sidebar.checkbox("⏱️ Mostrar tempos de execução", value=False,
+                                     help="Mede fases e acertos do cache só nesta sessão")
+# O estado global da instrumentação é do processo (todas as sessões e as tarefas
+# em segundo plano): cada sessão mede no seu próprio Coletor, só nesta thread
+COLETOR_TEMPOS = st.session_state.setdefault("coletor_tempos", instr.Coletor())
+instr.usar_coletor(COLETOR_TEMPOS if MOSTRAR_TEMPOS else None)
 
 # --- FUNÇÕES DE CÁLCULO (Backend) ---
 
@@ -61,19 +85,25 @@ def calcular_parametros(demanda_media, desvio_demanda, lead_media, desvio_lead,
     
     return int(round(EOQ)), int(round(ROP_A)), int(round(ROP_B)), int(round(SS)), round(Z, 4)
 
-def simular_estoque(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, custo_falta, seed=None):
-    if seed:
-        np.random.seed(seed)
+def _simular_trajetoria(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed=None,
+                        gerador="legado"):
+    """
+    Parte física da simulação: trajetória e estatísticas que não dependem dos
+    custos. Os custos são lineares nessas estatísticas (ver precificar).
+    Usa um fluxo próprio (nada de np.random.seed global, que vaza entre as
+    sessões do servidor); seed=None sorteia, seed=0 é uma semente como outra.
+    """
+    fluxo = FluxoNormais(seed, gerador)
     
     # Gerar vetores aleatórios para o ano todo
-    demandas_diarias = np.maximum(0, np.random.normal(demanda_media, desvio_demanda, HORIZONTE)).astype(int)
+    demandas_diarias = np.maximum(0, demanda_media + desvio_demanda * fluxo.normais(HORIZONTE)).astype(int)
     
-    estoque_fisico = [Q] # Começa com estoque cheio
-    estoque_posicao = [Q]
-    pedidos_em_transito = [] # Lista de (dia_chegada, qtd)
+    estoque_fisico = Q # Começa com estoque cheio (só o valor atual: o histórico fica em nivel_estoque_hist)
+    pedidos_em_transito = [] # Heap de (dia_chegada, qtd): o próximo a chegar fica no topo
+    em_transito_qtd = 0 # Total em trânsito, atualizado a cada emissão/chegada
     
     total_pedidos = 0
-    total_custo_falta = 0
+    unidades_falta = 0
     ciclos_com_ruptura = 0
     ciclos_totais = 0
     teve_ruptura_neste_ciclo = False
@@ -81,11 +111,11 @@ def simular_estoque(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_le
     nivel_estoque_hist = []
     
     for dia in range(HORIZONTE):
-        # 1. Recebimento de Pedidos
-        pedidos_chegando = [p for p in pedidos_em_transito if p[0] == dia]
-        for p in pedidos_chegando:
-            estoque_fisico[-1] += p[1]
-            pedidos_em_transito.remove(p)
+        # 1. Recebimento de Pedidos (O(log k) por pedido, k = pedidos em aberto)
+        while pedidos_em_transito and pedidos_em_transito[0][0] <= dia:
+            _, qtd = heapq.heappop(pedidos_em_transito)
+            em_transito_qtd -= qtd
+            estoque_fisico += qtd
             # Fim de um ciclo de ressuprimento
             ciclos_totais += 1
             if not teve_ruptura_neste_ciclo:
@@ -96,40 +126,38 @@ def simular_estoque(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_le
 
         # 2. Consumo
         demanda = demandas_diarias[dia]
-        estoque_atual = estoque_fisico[-1] - demanda
+        estoque_atual = estoque_fisico - demanda
         
         # 3. Penalidade por Falta
         if estoque_atual < 0:
-            total_custo_falta += abs(estoque_atual) * custo_falta
+            unidades_falta += abs(estoque_atual)
             teve_ruptura_neste_ciclo = True
         
-        estoque_fisico.append(estoque_atual)
+        estoque_fisico = estoque_atual
         nivel_estoque_hist.append(estoque_atual)
         
         # 4. Revisão (Gatilho de Pedido)
         # Atualiza estoque de posição: Fisico + O que vai chegar
-        em_transito_qtd = sum([p[1] for p in pedidos_em_transito])
         estoque_posicao_atual = estoque_atual + em_transito_qtd
-        estoque_posicao.append(estoque_posicao_atual)
         
-        # Se posição <= ROP e não pedimos hoje (simplificação: 1 pedido por vez por ciclo)
-        # Na verdade, se posição <= ROP, pede Q.
+        # Se posição <= ROP, pede lotes de Q suficientes para voltar acima do ROP.
+        # Vários pedidos podem ficar em aberto ao mesmo tempo (lead time longo ou
+        # Q pequeno), mas a posição nunca fica <= ROP depois da emissão, então
+        # não se emite um pedido novo por dia enquanto o anterior não chega.
         if estoque_posicao_atual <= ROP:
+            lotes = (ROP - estoque_posicao_atual) // max(Q, 1) + 1
+            qtd_pedido = lotes * Q
             # Sorteia Lead Time
-            lead_time_real = int(max(1, round(np.random.normal(lead_media, desvio_lead))))
+            lead_time_real = int(max(1, round(lead_media + desvio_lead * fluxo.proximo())))
             dia_chegada = dia + lead_time_real
             if dia_chegada >= HORIZONTE: dia_chegada = HORIZONTE - 1 # Limita ao horizonte
             
-            pedidos_em_transito.append((dia_chegada, Q))
+            heapq.heappush(pedidos_em_transito, (dia_chegada, qtd_pedido))
+            em_transito_qtd += qtd_pedido
             total_pedidos += 1
-            # Atualiza posição imediatamente
-            estoque_posicao[-1] += Q
 
     # Métricas Finais
     estoque_medio = np.mean([max(0, x) for x in nivel_estoque_hist])
-    custo_manutencao_total = (estoque_medio * CUSTO_MANUTENCAO) # unidade/ano já
-    custo_pedido_total = total_pedidos * CUSTO_PEDIDO
-    custo_total = custo_manutencao_total + custo_pedido_total + total_custo_falta
     
     # Nivel de Serviço (Count Fill Rate ou Cycle Service Level aproximado)
     # A métrica do usuário era: Ciclos sem ruptura / Total Ciclos.
@@ -148,22 +176,116 @@ def simular_estoque(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_le
     return {
         "hist_estoque": nivel_estoque_hist,
         "hist_demanda": demandas_diarias,
-        "custo_total": custo_total,
+        "estoque_medio": estoque_medio,
+        "unidades_falta": unidades_falta,
+        "nivel_servico": nivel_servico_tempo, # Usando proxy temporal para o gráfico
+        "total_pedidos": total_pedidos
+    }
+
+# Cache LRU limitado, compartilhado por todas as sessões do servidor. A chave são
+# os parâmetros de demanda, lead time, política (Q, ROP), a seed e o gerador: mudar só os
+# custos não simula de novo, apenas reprecifica a trajetória guardada.
+# Execuções reais (falhas do cache) por thread: cada sessão roda o script na sua thread
+_execucoes = threading.local()
+
+def _simular_trajetoria_medida(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed=None,
+                               gerador="legado"):
+    _execucoes.n = getattr(_execucoes, "n", 0) + 1
+    with instr.fase("dashboard:trajetoria"):
+        return _simular_trajetoria(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed, gerador)
+
+_simular_trajetoria_cache = st.cache_data(max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)(_simular_trajetoria_medida)
+
+def simular_trajetoria(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed=None,
+                       gerador="legado"):
+    if seed is None:
+        # Sem seed cada execução é um sorteio novo: não faz sentido guardar
+        return _simular_trajetoria_medida(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed,
+                                          gerador)
+    antes = getattr(_execucoes, "n", 0)
+    resultado = _simular_trajetoria_cache(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed,
+                                          gerador)
+    instr.contar("cache:trajetoria:falha" if getattr(_execucoes, "n", 0) != antes else "cache:trajetoria:acerto")
+    return resultado
+
+def precificar(trajetoria, custo_pedido, custo_manutencao, custo_falta):
+    """Custos a partir das estatísticas da trajetória (sem simular)."""
+    custo_manutencao_total = trajetoria["estoque_medio"] * custo_manutencao # unidade/ano já
+    custo_pedido_total = trajetoria["total_pedidos"] * custo_pedido
+    total_custo_falta = trajetoria["unidades_falta"] * custo_falta
+    return {
+        "custo_total": custo_manutencao_total + custo_pedido_total + total_custo_falta,
         "custo_pedido": custo_pedido_total,
         "custo_manutencao": custo_manutencao_total,
         "custo_falta": total_custo_falta,
-        "nivel_servico": nivel_servico_tempo, # Usando proxy temporal para o gráfico
-        "total_pedidos": total_pedidos
     }
 
+def simular_estoque(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, custo_falta, seed=None,
+                    gerador="legado"):
+    trajetoria = simular_trajetoria(Q, ROP, demanda_media, desvio_demanda, lead_media, desvio_lead, seed, gerador)
+    return {**trajetoria, **precificar(trajetoria, CUSTO_PEDIDO, CUSTO_MANUTENCAO, custo_falta)}
+
+def _traco(x, y, **kwargs):
+    # Scatter (SVG) fica lento com dezenas de milhares de pontos; Scattergl desenha pela GPU
+    tipo = go.Scattergl if len(x) > LIMIAR_WEBGL else go.Scatter
+    return tipo(x=x, y=y, mode="lines", **kwargs)
+
+def figura_trajetorias(series, cores):
+    """Uma linha por cenário, reduzida por mínimo/máximo (as rupturas continuam visíveis)."""
+    fig = go.Figure()
+    for nome, niveis in series.items():
+        dias, valores = decimar_min_max(niveis)
+        fig.add_trace(_traco(dias, valores, name=nome, line=dict(color=cores[nome])))
+    fig.add_hline(y=0, line_dash="dash", line_color="black", annotation_text="Zero Estoque")
+    fig.update_layout(xaxis_title="Dia", yaxis_title="Unidades em Estoque", hovermode="x unified")
+    return fig
+
+@st.cache_data(max_entries=8, show_spinner="Simulando as réplicas...")
+def calcular_faixas(Q, ROP, n_replicacoes, horizonte, demanda_media, desvio_demanda, lead_media, desvio_lead,
+                    seed=None, gerador="legado"):
+    # Motor em fluxo: só um trecho de dias (réplicas × TAMANHO_TRECHO) existe por vez;
+    # cada trecho vira percentis por dia e a réplica 0 é guardada para o exemplo
+    from nucleo_estoque import simular_estoque_fluxo
+    acumulador = FaixasPercentis(horizonte)
+    exemplo = np.empty(horizonte)
+
+    def ao_trecho(ini, dia_ini, niveis):
+        acumulador.atualizar(dia_ini, niveis)
+        exemplo[dia_ini:dia_ini + niveis.shape[1]] = niveis[0]
+
+    # Um único bloco de réplicas: cada trecho traz todas as réplicas dos seus dias
+    simular_estoque_fluxo(Q, ROP, n_replicacoes, horizonte=horizonte, demanda_media=demanda_media,
+                          demanda_desvio=desvio_demanda, lt_media=lead_media, lt_desvio=desvio_lead,
+                          seed=None if seed is None else int(seed), tamanho_bloco=n_replicacoes,
+                          gerador=gerador, ao_trecho=ao_trecho)
+    faixas = acumulador.reduzir()
+    faixas["exemplo"] = decimar_min_max(exemplo)
+    faixas["mediana"] = lttb(faixas[50], x=faixas["dias"])
+    return faixas
+
+def figura_faixas(faixas):
+    """Faixas P5–P95 e P25–P75, mediana (LTTB) e a réplica 0 (mínimo/máximo por balde)."""
+    fig = go.Figure()
+    for inferior, superior, opacidade in ((5, 95, 0.15), (25, 75, 0.3)):
+        fig.add_trace(_traco(faixas["dias"], faixas[inferior], line=dict(width=0), showlegend=False,
+                             hoverinfo="skip"))
+        fig.add_trace(_traco(faixas["dias"], faixas[superior], line=dict(width=0), fill="tonexty",
+                             fillcolor=f"rgba(0, 128, 0, {opacidade})", name=f"P{inferior}–P{superior}"))
+    fig.add_trace(_traco(*faixas["mediana"], name="Mediana", line=dict(color="green")))
+    fig.add_trace(_traco(*faixas["exemplo"], name="Réplica 0", line=dict(color="gray", width=1)))
+    fig.add_hline(y=0, line_dash="dash", line_color="black", annotation_text="Zero Estoque")
+    fig.update_layout(xaxis_title="Dia", yaxis_title="Unidades em Estoque", hovermode="x unified")
+    return fig
+
 # --- PROCESSAMENTO ---
 
 # Calcular Parâmetros
 EOQ, ROP_A, ROP_B, SS, Z = calcular_parametros(MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, CUSTO_PEDIDO, CUSTO_MANUTENCAO, NIVEL_SERVICO_ALVO)
 
 # Rodar Simulações
-res_A = simular_estoque(EOQ, ROP_A, MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, CUSTO_FALTA, seed=SEED)
-res_B = simular_estoque(EOQ, ROP_B, MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, CUSTO_FALTA, seed=SEED)
+with instr.fase("dashboard:simulacao"):
+    res_A = simular_estoque(EOQ, ROP_A, MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, CUSTO_FALTA, seed=SEED, gerador=GERADOR)
+    res_B = simular_estoque(EOQ, ROP_B, MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, CUSTO_FALTA, seed=SEED, gerador=GERADOR)
 
 # --- DASHBOARD LAYOUT ---
 
@@ -182,25 +304,28 @@ c2.metric("Custo Total (B - Estocástico)", f"R$ {res_B['custo_total']:,.2f}", d
 c3.metric("Nível de Serviço Real (B)", f"{res_B['nivel_servico']:.1%}", help="Taxa de dias com saldo positivo")
 
 # TABs
-tab1, tab2, tab3 = st.tabs(["📈 Evolução do Estoque", "📊 Análise de Custos", "🎲 Histogramas"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Evolução do Estoque", "📊 Análise de Custos", "🎲 Histogramas",
+                                        "🧊 Sensibilidade", "📉 Trade-off (Monte Carlo)"])
 
 with tab1:
-    st.markdown("#### Evolução do Nível de Estoque (365 dias)")
-    
-    # Criar DataFrame para Plotly
-    df_estoque = pd.DataFrame({
-        "Dia": list(range(HORIZONTE)),
-        "Cenário A": res_A["hist_estoque"],
-        "Cenário B": res_B["hist_estoque"]
-    })
-    
-    fig_evol = px.line(df_estoque, x="Dia", y=["Cenário A", "Cenário B"], 
-                       color_discrete_map={"Cenário A": "red", "Cenário B": "green"})
-    fig_evol.add_hline(y=0, line_dash="dash", line_color="black", annotation_text="Zero Estoque")
-    fig_evol.update_layout(yaxis_title="Unidades em Estoque", hovermode="x unified")
+    st.markdown(f"#### Evolução do Nível de Estoque ({HORIZONTE} dias)")
     
+    # Traços já reduzidos no servidor: o navegador nunca recebe mais que MAX_PONTOS por linha
+    fig_evol = figura_trajetorias({"Cenário A": res_A["hist_estoque"], "Cenário B": res_B["hist_estoque"]},
+                                  {"Cenário A": "red", "Cenário B": "green"})
     st.plotly_chart(fig_evol, use_container_width=True)
 
+    st.markdown("#### Faixas de Percentis do Cenário B (horizonte longo)")
+    st.caption("As réplicas são simuladas e resumidas no servidor: o gráfico recebe só as faixas "
+               f"de percentis e uma trajetória de exemplo, com no máximo {MAX_PONTOS} pontos por traço.")
+    col_f1, col_f2 = st.columns(2)
+    anos_faixas = col_f1.slider("Horizonte (anos)", 1, 20, 5)
+    replicacoes_faixas = col_f2.select_slider("Réplicas", [50, 100, 200, 500, 1000], value=200)
+    with instr.fase("dashboard:faixas"):
+        faixas = calcular_faixas(EOQ, ROP_B, replicacoes_faixas, anos_faixas * HORIZONTE, MEDIA_DEMANDA,
+                                 DESVIO_DEMANDA, MEDIA_LEAD_TIME, DESVIO_LEAD_TIME, seed=SEED, gerador=GERADOR)
+    st.plotly_chart(figura_faixas(faixas), use_container_width=True)
+
 with tab2:
     st.markdown("#### Decomposição dos Custos")
     
@@ -236,6 +361,143 @@ with tab3:
         # Como não guardamos o histórico de Lead Times sorteados na função simples, explicamos aqui.
         # Poderíamos alterar a função para retornar, mas para o dashboard rápido, isso basta.
 
+with tab4:
+    st.markdown("#### Sensibilidade (cubo pré-calculado)")
+    # O cubo é lido do disco (memmap) e só fatiado aqui: nada é simulado
+    from sensibilidade_estoque import PASTA_CUBO, METRICAS_CUBO, CuboSensibilidade
+
+    @st.cache_resource
+    def abrir_cubo(pasta, versao):
+        return CuboSensibilidade(pasta)
+
+    indice_cubo = os.path.join(PASTA_CUBO, "indice.json")
+    if not os.path.exists(indice_cubo):
+        st.info("Nenhum cubo encontrado. Gere um com: "
+                f"`python sensibilidade_estoque.py {PASTA_CUBO} --eixo demanda_desvio 10 20 30 --eixo lt_desvio 0.5 1.5 2.5`")
+    else:
+        cubo = abrir_cubo(PASTA_CUBO, os.path.getmtime(indice_cubo))
+        if cubo.tipo != "fatorial":
+            st.warning("O cubo em disco é um hipercubo latino: só cubos fatoriais podem ser fatiados.")
+        else:
+            valores_painel = {
+                "demanda_media": MEDIA_DEMANDA, "demanda_desvio": DESVIO_DEMANDA,
+                "lt_media": MEDIA_LEAD_TIME, "lt_desvio": DESVIO_LEAD_TIME,
+                "custo_pedido": CUSTO_PEDIDO, "custo_manutencao": CUSTO_MANUTENCAO,
+                "custo_falta": CUSTO_FALTA, "nivel_servico": NIVEL_SERVICO_ALVO,
+            }
+            col_s1, col_s2 = st.columns(2)
+            eixo_x = col_s1.selectbox("Eixo horizontal", cubo.nomes_eixos)
+            metrica = col_s2.selectbox("Métrica", METRICAS_CUBO, index=METRICAS_CUBO.index("custo_total"))
+
+            # Demais eixos fixos no valor da grade mais próximo do painel lateral
+            fixos = {n: valores_painel[n] for n in cubo.nomes_eixos if n != eixo_x}
+            _, curva = cubo.fatia(metrica, **fixos)
+            fig_cubo = px.line(x=cubo.eixos[eixo_x], y=curva, markers=True,
+                               labels={"x": eixo_x, "y": metrica})
+            st.plotly_chart(fig_cubo, use_container_width=True)
+
+            usados = {n: cubo.eixos[n][cubo.posicao(n, v)] for n, v in fixos.items()}
+            fixos_cubo = {**cubo.base, **usados}
+            st.caption("Valores usados no cubo: " + ", ".join(f"{n} = {v:g}" for n, v in fixos_cubo.items())
+                       + f" · {cubo.indice['n_replicacoes']} réplicas por célula, cenário {cubo.indice['cenario']}")
+            if not cubo.completo:
+                st.warning("O cubo ainda tem células sem resultado (aparecem como lacunas).")
+
+with tab5:
+    st.markdown("#### Curva de Trade-off por Monte Carlo (Fig 6)")
+    st.caption("A varredura roda em segundo plano, num pool compartilhado por todas as sessões: "
+               "os pontos aparecem à medida que ficam prontos e a tela continua respondendo.")
+    from varredura_estoque import rop_para_alvo
+
+    @st.cache_resource
+    def gerenciador_tarefas():
+        # Um pool por servidor; cada sessão só submete e consulta as suas tarefas
+        from tarefas_estoque import GerenciadorTarefas
+        return GerenciadorTarefas()
+
+    col_t1, col_t2 = st.columns(2)
+    faixa_alvo = col_t1.slider("Faixa do Nível de Serviço Alvo (%)", 80.0, 99.5, (80.0, 99.0), 0.5)
+    n_pontos_curva = col_t1.slider("Pontos da Curva", 5, 40, 20)
+    replicacoes_curva = col_t2.select_slider("Réplicas por Ponto", [200, 500, 1000, 2000, 5000, 10000], value=1000)
+
+    niveis_curva = np.linspace(faixa_alvo[0], faixa_alvo[1], n_pontos_curva) / 100
+    pontos_curva = [
+        {"Q": EOQ, "ROP": rop_para_alvo(ns, DESVIO_LEAD_TIME, MEDIA_DEMANDA, DESVIO_DEMANDA, MEDIA_LEAD_TIME)[1],
+         "demanda_media": MEDIA_DEMANDA, "demanda_desvio": DESVIO_DEMANDA,
+         "lt_media": MEDIA_LEAD_TIME, "lt_desvio": DESVIO_LEAD_TIME,
+         "custo_pedido": CUSTO_PEDIDO, "custo_manutencao": CUSTO_MANUTENCAO, "custo_falta": CUSTO_FALTA}
+        for ns in niveis_curva]
+    # Identifica as entradas da tarefa: se mudarem, a curva em andamento fica obsoleta
+    rotulo_curva = repr((pontos_curva, replicacoes_curva, SEED, GERADOR))
+
+    def submeter_curva():
+        return gerenciador_tarefas().submeter(pontos_curva, n_replicacoes=replicacoes_curva, seed=int(SEED),
+                                              gerador=GERADOR, rotulo=rotulo_curva)
+
+    tarefa = st.session_state.get("tarefa_tradeoff")
+    col_b1, col_b2 = st.columns(2)
+    if col_b1.button("▶️ Calcular em segundo plano"):
+        if tarefa is not None:
+            tarefa.cancelar()
+        tarefa = submeter_curva()
+    elif tarefa is not None and tarefa.rotulo != rotulo_curva:
+        tarefa.cancelar()
+        tarefa = submeter_curva()
+    if col_b2.button("⏹️ Cancelar", disabled=tarefa is None or not tarefa.ativa):
+        tarefa.cancelar()
+    st.session_state["tarefa_tradeoff"] = tarefa
+
+    def mostrar_curva():
+        estado = tarefa.instantaneo()
+        if estado["estado"] == "rodando":
+            st.progress(estado["progresso"], text=f"Simulando... {estado['progresso']:.0%} "
+                                                  f"({len(estado['resultados'])}/{len(pontos_curva)} pontos, "
+                                                  f"{estado['segundos']:.1f} s)")
+        elif estado["estado"] == "erro":
+            st.error(f"A varredura falhou: {estado['erro']}")
+        elif estado["estado"] == "cancelada":
+            st.warning("Varredura cancelada.")
+        else:
+            st.success(f"{len(pontos_curva)} pontos × {replicacoes_curva} réplicas em {estado['segundos']:.1f} s.")
+        if estado["resultados"]:
+            df_curva = pd.DataFrame([{
+                "Alvo (%)": niveis_curva[r["indice"]] * 100,
+                "ROP": r["parametros"]["ROP"],
+                "Custo Total Médio (R$)": r["resumo"]["custo_total"]["media"],
+                "IC 95% (± R$)": r["resumo"]["custo_total"]["media"] - r["resumo"]["custo_total"]["ic95"][0],
+                "Serviço Obtido (%)": r["resumo"]["nivel_servico"]["media"] * 100,
+            } for r in estado["resultados"]])
+            fig_curva = px.line(df_curva, x="Alvo (%)", y="Custo Total Médio (R$)", markers=True,
+                                error_y="IC 95% (± R$)", hover_data=["ROP", "Serviço Obtido (%)"])
+            fig_curva.update_xaxes(range=[faixa_alvo[0] - 0.5, faixa_alvo[1] + 0.5])
+            st.plotly_chart(fig_curva, use_container_width=True)
+        if estado["estado"] != "rodando" and st.session_state.get("curva_em_andamento"):
+            # A tarefa acabou: uma última execução completa desliga a atualização periódica
+            st.session_state["curva_em_andamento"] = False
+            st.rerun()
+
+    if tarefa is None:
+        st.info("Clique em Calcular para simular a curva com os parâmetros da barra lateral.")
+    else:
+        st.session_state["curva_em_andamento"] = tarefa.ativa
+        # Só o fragmento é reexecutado a cada segundo enquanto a tarefa roda
+        st.fragment(run_every=1.0 if tarefa.ativa else None)(mostrar_curva)()
+
 # Rodapé
 st.divider()
 st.caption("Desenvolvido por Felipe Sousa Mendes. Projeto 1 - Turma de Verão 2026.")
+
+# Painel de tempos (desta sessão, acumulados desde o último "Zerar")
+if MOSTRAR_TEMPOS:
+    instr.registrar("dashboard:execucao", time.perf_counter() - _T0_EXECUCAO, _T0_EXECUCAO)
+    relatorio_tempos = instr.relatorio(COLETOR_TEMPOS)
+    st.sidebar.dataframe(pd.DataFrame([
+        {"Fase": nome, "Total (ms)": r["segundos"] * 1000, "Chamadas": r["chamadas"], "Média (ms)": r["media"] * 1000}
+        for nome, r in relatorio_tempos["fases"].items()
+    ]), hide_index=True)
+    for nome, valor in relatorio_tempos["derivados"].items():
+        st.sidebar.caption(f"{nome.replace('_', ' ')}: {valor:.1%}" if nome.startswith("taxa_") else f"{nome.replace('_', ' ')}: {valor:,.0f}")
+    st.sidebar.download_button("Baixar traço (JSON)", json.dumps(relatorio_tempos, indent=2),
+                               file_name="perfil_dashboard.json", mime="application/json")
+    if st.sidebar.button("Zerar tempos"):
+        COLETOR_TEMPOS.zerar()
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Figuras do relatório (Fig 1 a Fig 7).
+
+Este é o único módulo que importa matplotlib/seaborn: a linha de comando
+só o carrega quando algum gráfico é pedido.
+
+  • As figuras são salvas com o backend Agg, em paralelo num pool de processos
+  • Cada PNG tem um hash dos seus dados de entrada, das constantes, do
+    código da figura e do estilo: se o arquivo existe com o mesmo hash, a
+    figura não é desenhada de novo
+"""
+
+import hashlib
+import inspect
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+import instrumentacao_estoque as instr
+from nucleo_estoque import (
+    HORIZONTE, DEMANDA_MEDIA, LEAD_TIME_MEDIO, ROP_A, ROP_B, SS_B,
+)
+
+PASTA_GRAFICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graficos")
+ARQUIVO_CACHE = ".cache_graficos.json"   # hash de cada PNG, dentro da pasta
+DPI = 300
+ESTILO = {"style": "whitegrid", "palette": "muted", "font_scale": 1.05}
+
+# Globais lidas pelas funções de figura: entram no hash de todas
+CONSTANTES_FIGURAS = {"HORIZONTE": HORIZONTE, "DEMANDA_MEDIA": DEMANDA_MEDIA,
+                      "LEAD_TIME_MEDIO": LEAD_TIME_MEDIO, "ROP_A": ROP_A,
+                      "ROP_B": ROP_B, "SS_B": SS_B}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BLOCO 1: Entendendo a Incerteza
+# ══════════════════════════════════════════════════════════════════════════════
+def fig1_histograma_demanda(resultado_A: dict):
+    """Fig 1 — Histograma da demanda simulada."""
+    fig1, ax1 = plt.subplots(figsize=(10, 5))
+    sns.histplot(resultado_A["demandas"], bins=30, kde=True, color="steelblue",
+                 edgecolor="white", ax=ax1)
+    ax1.axvline(DEMANDA_MEDIA, color="crimson", ls="--", lw=2,
+                label=f"μ = {DEMANDA_MEDIA}")
+    ax1.set_title("Fig 1 — Distribuição da Demanda Diária Simulada", fontsize=14,
+                  fontweight="bold")
+    ax1.set_xlabel("Demanda (unidades)")
+    ax1.set_ylabel("Frequência")
+    ax1.legend()
+    return fig1
+
+
+def fig2_histograma_lead_time(resultado_A: dict, resultado_B: dict):
+    """Fig 2 — Histograma do lead time simulado (cenários A e B juntos)."""
+    todos_lt = resultado_A["lead_times"] + resultado_B["lead_times"]
+    fig2, ax2 = plt.subplots(figsize=(10, 5))
+    sns.histplot(todos_lt, bins=range(0, max(todos_lt) + 2), kde=False,
+                 color="darkorange", edgecolor="white", ax=ax2)
+    ax2.axvline(LEAD_TIME_MEDIO, color="crimson", ls="--", lw=2,
+                label=f"μ = {LEAD_TIME_MEDIO} dias")
+    ax2.set_title("Fig 2 — Distribuição do Lead Time Simulado", fontsize=14,
+                  fontweight="bold")
+    ax2.set_xlabel("Lead Time (dias)")
+    ax2.set_ylabel("Frequência")
+    ax2.legend()
+    return fig2
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BLOCO 2: Comparação de Desempenho (Evolução Temporal)
+# ══════════════════════════════════════════════════════════════════════════════
+def _barras_nivel(ax, niveis):
+    """
+    Uma barra de largura 1 por dia (azul se ≥ 0, vermelha se < 0), desenhada
+    como duas áreas em degrau: 2 polígonos em vez de um retângulo por dia.
+    """
+    bordas = np.arange(len(niveis) + 1) - 0.5
+    ax.stairs(np.maximum(niveis, 0), bordas, baseline=0, fill=True,
+              color="steelblue", linewidth=0)
+    ax.stairs(np.minimum(niveis, 0), bordas, baseline=0, fill=True,
+              color="crimson", linewidth=0)
+
+
+def fig3_estoque_cenario_A(resultado_A: dict):
+    """Fig 3 — Nível de estoque diário, cenário A."""
+    dias = np.arange(HORIZONTE)
+    fig3, ax3 = plt.subplots(figsize=(14, 5))
+    niveis_A = resultado_A["niveis"]
+
+    _barras_nivel(ax3, niveis_A)
+    ax3.axhline(0, color="black", lw=0.8)
+    ax3.axhline(ROP_A, color="green", ls="--", lw=1.2, label=f"ROP = {ROP_A}")
+    ax3.fill_between(dias, niveis_A, 0, where=niveis_A < 0,
+                     color="crimson", alpha=0.3, label="Ruptura (estoque < 0)")
+    ax3.set_title("Fig 3 — Nível de Estoque Diário — Cenário A (Determinístico)",
+                  fontsize=14, fontweight="bold")
+    ax3.set_xlabel("Dia")
+    ax3.set_ylabel("Estoque (unidades)")
+    ax3.legend(loc="upper right")
+    return fig3
+
+
+def fig4_estoque_cenario_B(resultado_B: dict):
+    """Fig 4 — Nível de estoque diário, cenário B (com SS)."""
+    dias = np.arange(HORIZONTE)
+    fig4, ax4 = plt.subplots(figsize=(14, 5))
+    niveis_B = resultado_B["niveis"]
+
+    _barras_nivel(ax4, niveis_B)
+    ax4.axhline(0, color="black", lw=0.8)
+    ax4.axhline(ROP_B, color="green", ls="--", lw=1.2, label=f"ROP = {ROP_B}")
+    ax4.axhline(SS_B, color="orange", ls=":", lw=1.5,
+                label=f"Estoque de Segurança = {SS_B}")
+    ax4.fill_between(dias, niveis_B, 0, where=niveis_B < 0,
+                     color="crimson", alpha=0.3, label="Ruptura (estoque < 0)")
+    ax4.set_title("Fig 4 — Nível de Estoque Diário — Cenário B (Estocástico, 95%)",
+                  fontsize=14, fontweight="bold")
+    ax4.set_xlabel("Dia")
+    ax4.set_ylabel("Estoque (unidades)")
+    ax4.legend(loc="upper right")
+    return fig4
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BLOCO 3: Análise Econômica e Sensibilidade
+# ══════════════════════════════════════════════════════════════════════════════
+def fig5_comparacao_custos(resultado_A: dict, resultado_B: dict):
+    """Fig 5 — Comparação de custos (barras agrupadas)."""
+    fig5, ax5 = plt.subplots(figsize=(10, 6))
+    categorias = ["Custo de Pedido", "Custo de Manutenção", "Custo de Falta", "Custo Total"]
+    valores_A = [resultado_A["custo_pedido"], resultado_A["custo_manut"],
+                 resultado_A["custo_falta"], resultado_A["custo_total"]]
+    valores_B = [resultado_B["custo_pedido"], resultado_B["custo_manut"],
+                 resultado_B["custo_falta"], resultado_B["custo_total"]]
+
+    x = np.arange(len(categorias))
+    largura = 0.35
+    barras_A = ax5.bar(x - largura/2, valores_A, largura, label="Cenário A",
+                       color="salmon", edgecolor="white")
+    barras_B = ax5.bar(x + largura/2, valores_B, largura, label="Cenário B",
+                       color="mediumseagreen", edgecolor="white")
+
+    ax5.set_title("Fig 5 — Comparação de Custos: Cenário A vs B", fontsize=14,
+                  fontweight="bold")
+    ax5.set_ylabel("Custo (R$)")
+    ax5.set_xticks(x)
+    ax5.set_xticklabels(categorias, rotation=15, ha="right")
+    ax5.legend()
+
+    # Adicionar valores sobre as barras
+    for barra in list(barras_A) + list(barras_B):
+        h = barra.get_height()
+        ax5.annotate(f"R${h:,.0f}", xy=(barra.get_x() + barra.get_width()/2, h),
+                     xytext=(0, 5), textcoords="offset points",
+                     ha="center", va="bottom", fontsize=8)
+    return fig5
+
+
+def fig6_tradeoff_servico_custo(tradeoff: dict):
+    """Fig 6 — Curva de trade-off (fronteira eficiente), ver estudo_tradeoff."""
+    niveis_alvo = tradeoff["niveis_alvo"]
+    custos_tradeoff = tradeoff["custos"]
+    servicos_obtidos = tradeoff["servicos"]
+
+    fig6, ax6 = plt.subplots(figsize=(10, 6))
+    ax6.plot(servicos_obtidos, custos_tradeoff, "o-", color="darkorchid",
+             markersize=6, linewidth=2)
+    ax6.set_title("Fig 6 — Curva de Trade-off: Nível de Serviço vs Custo Total",
+                  fontsize=14, fontweight="bold")
+    ax6.set_xlabel("Nível de Serviço Obtido (%)")
+    ax6.set_ylabel("Custo Total (R$)")
+    ax6.grid(True, alpha=0.3)
+
+    # Destacar o ponto 95%
+    idx_95 = np.argmin(np.abs(np.array(niveis_alvo) - 0.95))
+    ax6.annotate(f"  95% -> R${custos_tradeoff[idx_95]:,.0f}",
+                 xy=(servicos_obtidos[idx_95], custos_tradeoff[idx_95]),
+                 fontsize=10, color="crimson", fontweight="bold")
+    ax6.plot(servicos_obtidos[idx_95], custos_tradeoff[idx_95], "s",
+             color="crimson", markersize=10, zorder=5)
+    return fig6
+
+
+def fig7_impacto_incerteza_fornecedor(sensibilidade: dict):
+    """Fig 7 — σ_L vs SS e custo total, ver estudo_sigma_lead_time."""
+    sigma_L_range = sensibilidade["sigma_L"]
+    ss_necessarios = sensibilidade["ss"]
+    custos_sigma = sensibilidade["custos"]
+
+    fig7, ax7a = plt.subplots(figsize=(10, 6))
+    color_ss = "teal"
+    color_custo = "tomato"
+
+    ax7a.plot(sigma_L_range, ss_necessarios, "s-", color=color_ss,
+              linewidth=2, markersize=6, label="Estoque de Segurança (SS)")
+    ax7a.set_xlabel("Desvio Padrão do Lead Time — σ_L (dias)")
+    ax7a.set_ylabel("Estoque de Segurança (unidades)", color=color_ss)
+    ax7a.tick_params(axis="y", labelcolor=color_ss)
+
+    ax7b = ax7a.twinx()
+    ax7b.plot(sigma_L_range, custos_sigma, "o--", color=color_custo,
+              linewidth=2, markersize=5, label="Custo Total")
+    ax7b.set_ylabel("Custo Total (R$)", color=color_custo)
+    ax7b.tick_params(axis="y", labelcolor=color_custo)
+
+    ax7a.set_title("Fig 7 — Impacto da Incerteza do Fornecedor no Estoque de Segurança",
+                   fontsize=14, fontweight="bold")
+
+    # Combinar legendas
+    lines_1, labels_1 = ax7a.get_legend_handles_labels()
+    lines_2, labels_2 = ax7b.get_legend_handles_labels()
+    ax7a.legend(lines_1 + lines_2, labels_1 + labels_2, loc="upper left")
+    return fig7
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GERAÇÃO DE TODAS AS FIGURAS
+# ══════════════════════════════════════════════════════════════════════════════
+def _entradas_figuras(cenarios: dict, tradeoff: dict, sensibilidade: dict) -> list:
+    """
+    (arquivo, nome da função, argumentos) de cada figura, só com os dados
+    que a figura lê: é o que vai para o processo filho e para o hash.
+    """
+    res_A, res_B = cenarios["resultado_A"], cenarios["resultado_B"]
+    return [
+        ("fig1_histograma_demanda.png", "fig1_histograma_demanda",
+         ({"demandas": res_A["demandas"]},)),
+        ("fig2_histograma_lead_time.png", "fig2_histograma_lead_time",
+         ({"lead_times": res_A["lead_times"]}, {"lead_times": res_B["lead_times"]})),
+        ("fig3_estoque_cenario_A.png", "fig3_estoque_cenario_A",
+         ({"niveis": res_A["niveis"]},)),
+        ("fig4_estoque_cenario_B.png", "fig4_estoque_cenario_B",
+         ({"niveis": res_B["niveis"]},)),
+        ("fig5_comparacao_custos.png", "fig5_comparacao_custos",
+         tuple({c: r[c] for c in ("custo_pedido", "custo_manut", "custo_falta", "custo_total")}
+               for r in (res_A, res_B))),
+        ("fig6_tradeoff_servico_custo.png", "fig6_tradeoff_servico_custo",
+         ({c: tradeoff[c] for c in ("niveis_alvo", "custos", "servicos")},)),
+        ("fig7_impacto_incerteza_fornecedor.png", "fig7_impacto_incerteza_fornecedor",
+         ({c: sensibilidade[c] for c in ("sigma_L", "ss", "custos")},)),
+    ]
+
+
+def _atualizar_hash(h, obj):
+    """Alimenta o hash com o conteúdo de obj (arrays pelos bytes, dict ordenado)."""
+    if isinstance(obj, dict):
+        for chave in sorted(obj):
+            h.update(repr(chave).encode())
+            _atualizar_hash(h, obj[chave])
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        arr = np.asarray(obj)
+        if arr.dtype == object:
+            for item in obj:
+                _atualizar_hash(h, item)
+        else:
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(np.ascontiguousarray(arr).tobytes())
+    else:
+        h.update(repr(obj).encode())
+
+
+def hash_figura(nome_funcao: str, argumentos, dpi: int = DPI) -> str:
+    """Hash dos dados, do código da figura, das constantes e do estilo."""
+    h = hashlib.sha256()
+    h.update(inspect.getsource(globals()[nome_funcao]).encode())
+    if nome_funcao in ("fig3_estoque_cenario_A", "fig4_estoque_cenario_B"):
+        h.update(inspect.getsource(_barras_nivel).encode())
+    _atualizar_hash(h, argumentos)
+    _atualizar_hash(h, {"constantes": CONSTANTES_FIGURAS, "estilo": ESTILO, "dpi": dpi,
+                        "matplotlib": matplotlib.__version__, "seaborn": sns.__version__})
+    return h.hexdigest()
+
+
+def _renderizar(nome_funcao: str, argumentos, caminho: str, dpi: int = DPI) -> str:
+    """Desenha e salva uma figura, sem abrir janela."""
+    with instr.fase(f"figura:{os.path.basename(caminho)}"):
+        sns.set_theme(**ESTILO)
+        fig = globals()[nome_funcao](*argumentos)
+        fig.tight_layout()
+        fig.savefig(caminho, dpi=dpi, bbox_inches="tight")
+        plt.close(fig)
+    return caminho
+
+
+def _renderizar_no_filho(instrumentar: bool, *argumentos):
+    """
+    _renderizar no processo filho, com o backend Agg (sem interface gráfica);
+    devolve também o que a instrumentação mediu.
+    """
+    plt.switch_backend("Agg")
+    if instrumentar:
+        instr.ativar()
+    return _renderizar(*argumentos), instr.coletar()
+
+
+def _ler_cache(pasta: str) -> dict:
+    try:
+        with open(os.path.join(pasta, ARQUIVO_CACHE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def gerar_graficos(cenarios: dict, tradeoff: dict, sensibilidade: dict,
+                   pasta: str = PASTA_GRAFICOS, exibir: bool = True,
+                   n_processos: int | None = None, forcar: bool = False) -> list[str]:
+    """
+    Gera e salva as 7 figuras (dpi=300) em `pasta`.
+
+    `cenarios` vem de simulacaoestoque.executar_cenarios; `tradeoff` e
+    `sensibilidade` de varredura_estoque.estudo_tradeoff/estudo_sigma_lead_time.
+    Figuras cujo PNG já existe com o mesmo hash são puladas (forcar=True
+    redesenha todas); as demais são salvas em paralelo (n_processos=1 ou
+    uma figura só: sem pool). Com exibir=True as figuras são desenhadas de novo na tela.
+    Retorna os caminhos salvos.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    cache = {} if forcar else _ler_cache(pasta)
+
+    figuras = _entradas_figuras(cenarios, tradeoff, sensibilidade)
+    hashes = {nome: hash_figura(funcao, argumentos) for nome, funcao, argumentos in figuras}
+    pendentes = [(funcao, argumentos, os.path.join(pasta, nome))
+                 for nome, funcao, argumentos in figuras
+                 if cache.get(nome) != hashes[nome]
+                 or not os.path.exists(os.path.join(pasta, nome))]
+
+    n = min(len(pendentes), n_processos or os.cpu_count() or 1)
+    if n > 1:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            for _, medido in pool.map(_renderizar_no_filho, itertools.repeat(instr.ativo()),
+                                      *zip(*pendentes)):
+                instr.mesclar(medido)
+    else:
+        for pendente in pendentes:
+            _renderizar(*pendente)
+
+    instr.contar("cache:graficos:acerto", len(figuras) - len(pendentes))
+    instr.contar("cache:graficos:falha", len(pendentes))
+    cache.update(hashes)
+    with open(os.path.join(pasta, ARQUIVO_CACHE), "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+    print(f"{len(pendentes)} de {len(figuras)} graficos desenhados "
+          f"({len(figuras) - len(pendentes)} sem mudancas)")
+    print(f"Todos os graficos foram salvos em: {pasta}")
+    if exibir:
+        print("Exibindo...")
+        sns.set_theme(**ESTILO)
+        for _, funcao, argumentos in figuras:
+            globals()[funcao](*argumentos).tight_layout()
+        plt.show()
+    return [os.path.join(pasta, nome) for nome, _, _ in figuras]
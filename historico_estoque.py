@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Demanda histórica: séries diárias por SKU lidas de exportações CSV/Parquet
+grandes, no lugar da demanda normal sintética.
+
+  • converter_historico lê o arquivo em pedaços (pandas chunksize ou lotes
+    do pyarrow) e grava as séries de todos os SKUs num .npy contíguo, um
+    trecho por SKU em ordem de data; nenhum passo carrega o arquivo inteiro
+  • HistoricoDemanda abre esse armazenamento com mmap: serie(sku) é uma
+    visão do arquivo, lida do disco sob demanda
+  • BootstrapBlocos gera réplicas por bootstrap de blocos móveis (blocos de
+    dias consecutivos sorteados do histórico, preservando sazonalidade
+    semanal e autocorrelação curta); é indexado como uma matriz
+    (réplicas × dias) que só existe no trecho pedido; os inícios dos blocos
+    vêm de um ramo próprio de SeedSequence(seed), independente dos
+    sorteios de lead time do motor
+  • Os motores recebem a demanda pelo parâmetro demanda_externa
+    (simular_estoque, simular_estoque_lote e simular_estoque_fluxo)
+
+Uso:
+    python historico_estoque.py converter vendas.csv historico --sku sku --data data --demanda qtd
+    python historico_estoque.py simular historico --sku A123 --replicacoes 1000
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from nucleo_estoque import (
+    SEED, HORIZONTE, N_REPLICACOES, LEAD_TIME_MEDIO, LEAD_TIME_DESVIO,
+    CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA, NIVEL_SERVICO_ALVO,
+    calcular_parametros_lote, simular_estoque_lote, simular_estoque_fluxo,
+)
+from aleatorio_estoque import sementes_replicacoes
+
+TAMANHO_PEDACO = 1_000_000         # linhas do arquivo lidas por vez
+TAMANHO_BLOCO_BOOTSTRAP = 7        # dias por bloco (uma semana)
+SKU_UNICO = "serie"                # nome do SKU quando o arquivo não tem coluna de SKU
+
+ARQUIVO_INDICE = "indice.json"
+ARQUIVO_DEMANDA = "demanda.npy"
+ARQUIVO_DIAS = "dias.npy"
+ARQUIVO_INICIOS = "inicios.npy"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. CONVERSÃO PARA O ARMAZENAMENTO EM MEMMAP
+# ══════════════════════════════════════════════════════════════════════════════
+def _ler_em_pedacos(caminho: str, colunas: list[str], tamanho_pedaco: int):
+    """DataFrames sucessivos com `colunas`, de um CSV ou Parquet (pela extensão)."""
+    if os.path.splitext(caminho)[1].lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_pedaco, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, usecols=colunas, chunksize=tamanho_pedaco)
+
+
+def _dias_desde_epoca(datas: pd.Series) -> np.ndarray:
+    """Datas (texto ou datetime) como dias inteiros desde 1970-01-01."""
+    return pd.to_datetime(datas).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def converter_historico(origem: str, pasta: str, coluna_demanda: str = "demanda",
+                        coluna_sku: str | None = "sku",
+                        coluna_data: str | None = "data",
+                        tamanho_pedaco: int = TAMANHO_PEDACO,
+                        verbose: bool = True) -> "HistoricoDemanda":
+    """
+    Converte um histórico longo (uma linha por SKU e dia) em `pasta`:
+        - demanda.npy : demandas (float32) de todos os SKUs, SKU a SKU
+        - dias.npy    : data de cada demanda (dias desde 1970), se houver data
+        - inicios.npy : início do trecho de cada SKU (n_skus + 1 posições)
+        - indice.json : SKUs, origem e dias faltantes por SKU
+
+    Duas leituras em pedaços: a primeira conta as linhas de cada SKU, a
+    segunda grava cada linha na posição do seu SKU. Com coluna de data,
+    cada trecho é então ordenado por data. Sem coluna de SKU o arquivo é
+    uma série única (SKU_UNICO); sem coluna de data vale a ordem do arquivo.
+    Dias ausentes do arquivo não são inventados: são só contados.
+    """
+    colunas = [c for c in (coluna_sku, coluna_data, coluna_demanda) if c]
+
+    def skus_do_pedaco(pedaco):
+        if coluna_sku is None:
+            return pd.Series(SKU_UNICO, index=pedaco.index)
+        return pedaco[coluna_sku].astype(str)
+
+    # 1ª leitura: linhas por SKU
+    contagem = {}
+    for pedaco in _ler_em_pedacos(origem, colunas, tamanho_pedaco):
+        for sku, n in skus_do_pedaco(pedaco).value_counts(sort=False).items():
+            contagem[sku] = contagem.get(sku, 0) + int(n)
+    skus = sorted(contagem)
+    tamanhos = np.array([contagem[s] for s in skus], dtype=np.int64)
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)])
+    total = int(inicios[-1])
+    if verbose:
+        print(f"  {total} linhas, {len(skus)} SKU(s)")
+
+    # 2ª leitura: cada linha vai para o trecho do seu SKU
+    os.makedirs(pasta, exist_ok=True)
+    demanda = np.lib.format.open_memmap(os.path.join(pasta, ARQUIVO_DEMANDA),
+                                        mode="w+", dtype=np.float32, shape=(total,))
+    dias = (np.lib.format.open_memmap(os.path.join(pasta, ARQUIVO_DIAS),
+                                      mode="w+", dtype=np.int64, shape=(total,))
+            if coluna_data else None)
+    preenchidos = np.zeros(len(skus), dtype=np.int64)
+    categorias = pd.CategoricalDtype(skus)
+    for pedaco in _ler_em_pedacos(origem, colunas, tamanho_pedaco):
+        codigos = skus_do_pedaco(pedaco).astype(categorias).cat.codes.to_numpy()
+        # Posição = início do SKU + linhas já gravadas + ordem dentro do pedaço
+        ordem = pd.Series(codigos).groupby(codigos).cumcount().to_numpy()
+        posicoes = inicios[codigos] + preenchidos[codigos] + ordem
+        demanda[posicoes] = pedaco[coluna_demanda].to_numpy(dtype=np.float32)
+        if dias is not None:
+            dias[posicoes] = _dias_desde_epoca(pedaco[coluna_data])
+        preenchidos += np.bincount(codigos, minlength=len(skus))
+
+    # Ordenação por data dentro de cada SKU (um trecho por vez na memória)
+    faltantes = [0] * len(skus)
+    if dias is not None:
+        for k in range(len(skus)):
+            a, b = inicios[k], inicios[k + 1]
+            d = np.array(dias[a:b])  # cópia: o trecho é regravado abaixo
+            if np.any(np.diff(d) < 0):
+                ordem = np.argsort(d, kind="stable")
+                dias[a:b] = d[ordem]
+                demanda[a:b] = np.asarray(demanda[a:b])[ordem]
+                d = d[ordem]
+            if b > a:
+                faltantes[k] = int(d[-1] - d[0] + 1 - (b - a))
+        dias.flush()
+    demanda.flush()
+    np.save(os.path.join(pasta, ARQUIVO_INICIOS), inicios)
+
+    indice = {"versao": 1, "origem": os.path.abspath(origem),
+              "coluna_demanda": coluna_demanda, "tem_datas": dias is not None,
+              "skus": skus, "dias_faltantes": faltantes}
+    with open(os.path.join(pasta, ARQUIVO_INDICE), "w", encoding="utf-8") as f:
+        json.dump(indice, f)
+    del demanda, dias
+    return HistoricoDemanda(pasta)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. LEITURA
+# ══════════════════════════════════════════════════════════════════════════════
+class HistoricoDemanda:
+    """
+    Histórico gravado por converter_historico, aberto com mmap (só leitura):
+    abrir não lê as demandas e cada série é uma visão do arquivo.
+    """
+
+    def __init__(self, pasta: str):
+        with open(os.path.join(pasta, ARQUIVO_INDICE), encoding="utf-8") as f:
+            self.indice = json.load(f)
+        self.pasta = pasta
+        self.skus = self.indice["skus"]
+        self._posicao = {sku: k for k, sku in enumerate(self.skus)}
+        self.inicios = np.load(os.path.join(pasta, ARQUIVO_INICIOS))
+        self.demanda = np.load(os.path.join(pasta, ARQUIVO_DEMANDA), mmap_mode="r")
+        self.dias = (np.load(os.path.join(pasta, ARQUIVO_DIAS), mmap_mode="r")
+                     if self.indice["tem_datas"] else None)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def __contains__(self, sku) -> bool:
+        return str(sku) in self._posicao
+
+    def _trecho(self, sku) -> slice:
+        try:
+            k = self._posicao[str(sku)]
+        except KeyError:
+            raise KeyError(f"SKU {sku!r} não está no histórico") from None
+        return slice(int(self.inicios[k]), int(self.inicios[k + 1]))
+
+    def serie(self, sku=SKU_UNICO) -> np.ndarray:
+        """Demandas diárias do SKU em ordem de data (visão do memmap)."""
+        return self.demanda[self._trecho(sku)]
+
+    def datas(self, sku=SKU_UNICO) -> np.ndarray | None:
+        """Datas (datetime64[D]) da série do SKU, se o arquivo tinha datas."""
+        if self.dias is None:
+            return None
+        return self.dias[self._trecho(sku)].astype("datetime64[D]")
+
+    def estimar_parametros(self, sku=SKU_UNICO) -> dict:
+        """Média e desvio da demanda diária do SKU (para EOQ, SS e ROP)."""
+        serie = np.asarray(self.serie(sku), dtype=float)
+        return {"demanda_media": float(serie.mean()),
+                "demanda_desvio": float(serie.std(ddof=1)) if len(serie) > 1 else 0.0}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. BOOTSTRAP DE BLOCOS
+# ══════════════════════════════════════════════════════════════════════════════
+def sementes_bootstrap(n_replicacoes: int, seed: int | None) -> np.ndarray:
+    """
+    Semente do bootstrap de cada réplica: filhos do ramo 1 de
+    SeedSequence(seed). Nunca coincidem com as do motor (seed, seed+1, ...
+    no legado; filhos da raiz no pcg64), então os inícios dos blocos e os
+    lead times vêm de fluxos independentes.
+    """
+    ramo = np.random.SeedSequence(seed).spawn(2)[1]
+    return np.array([f.generate_state(1, np.uint64)[0] >> np.uint64(1) for f in ramo.spawn(n_replicacoes)],
+                    dtype=np.int64)
+
+
+class BootstrapBlocos:
+    """
+    Matriz virtual (n_replicacoes × horizonte) de demandas: cada linha é uma
+    sequência de blocos de `tamanho_bloco` dias consecutivos da série, com
+    inícios sorteados pelo PCG64(sementes[i]) da linha (um sorteio de 64
+    bits por bloco; por padrão as sementes vêm de sementes_bootstrap).
+
+    Nada é pré-gerado: indexar com fatias (bootstrap[ini:fim, d0:d1]) sorteia
+    os blocos só dessas linhas e lê da série só os dias usados. Cada linha
+    guarda o seu gerador e pula direto para o bloco k0 (PCG64.advance), então
+    ler o horizonte em trechos custa o mesmo que de uma vez. A linha i é
+    sempre a mesma, qualquer que seja o recorte pedido.
+    """
+
+    def __init__(self, serie, n_replicacoes: int = N_REPLICACOES,
+                 horizonte: int = HORIZONTE,
+                 tamanho_bloco: int = TAMANHO_BLOCO_BOOTSTRAP,
+                 seed: int | None = SEED, sementes=None):
+        if len(serie) < tamanho_bloco:
+            raise ValueError(f"A série tem {len(serie)} dias, menos que um bloco "
+                             f"({tamanho_bloco})")
+        if sementes is None:
+            sementes = sementes_bootstrap(n_replicacoes, seed)
+        self.serie = serie
+        self.sementes = np.asarray(sementes, dtype=np.int64)
+        self.horizonte = horizonte
+        self.tamanho_bloco = tamanho_bloco
+        self._fluxos = {}                 # linha → [Generator, blocos já sorteados]
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.sementes), self.horizonte)
+
+    def __len__(self) -> int:
+        return len(self.sementes)
+
+    def _sortear(self, linha: int, k0: int, k1: int) -> np.ndarray:
+        """Sorteios (uniformes) dos blocos k0..k1-1 da linha."""
+        fluxo = self._fluxos.get(linha)
+        if fluxo is None or fluxo[1] > k0:
+            fluxo = self._fluxos[linha] = [np.random.Generator(np.random.PCG64(int(self.sementes[linha]))), 0]
+        gerador, posicao = fluxo
+        gerador.bit_generator.advance(k0 - posicao)   # random() consome um sorteio por valor
+        fluxo[1] = k1
+        if k1 * self.tamanho_bloco >= self.horizonte:
+            del self._fluxos[linha]                   # linha lida até o fim
+        return gerador.random(k1 - k0)
+
+    def __getitem__(self, chave) -> np.ndarray:
+        linhas, colunas = chave if isinstance(chave, tuple) else (chave, slice(None))
+        if not (isinstance(linhas, slice) and isinstance(colunas, slice)):
+            raise TypeError("BootstrapBlocos só aceita fatias: b[ini:fim, d0:d1]")
+        linhas = range(len(self.sementes))[linhas]
+        d0, d1, passo = colunas.indices(self.horizonte)
+        if passo != 1:
+            raise TypeError("BootstrapBlocos não aceita fatias com passo")
+        d1 = max(d0, d1)
+
+        b = self.tamanho_bloco
+        k0, k1 = d0 // b, -(-d1 // b)       # blocos que cobrem os dias pedidos
+        n_inicios = len(self.serie) - b + 1
+        indices = np.empty((len(linhas), (k1 - k0) * b), dtype=np.int64)
+        for i, linha in enumerate(linhas):
+            inicios = (self._sortear(linha, k0, k1) * n_inicios).astype(np.int64)
+            indices[i] = (inicios[:, None] + np.arange(b)).ravel()
+        indices = indices[:, d0 - k0 * b:d1 - k0 * b]
+        return np.asarray(self.serie[indices.ravel()], dtype=float).reshape(indices.shape)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. SIMULAÇÃO A PARTIR DO HISTÓRICO
+# ══════════════════════════════════════════════════════════════════════════════
+def simular_historico(historico: HistoricoDemanda, sku=SKU_UNICO,
+                      Q: int | None = None, ROP: int | None = None,
+                      n_replicacoes: int = N_REPLICACOES,
+                      horizonte: int = HORIZONTE,
+                      tamanho_bloco: int = TAMANHO_BLOCO_BOOTSTRAP,
+                      cenario: str = "B",
+                      nivel_servico: float = NIVEL_SERVICO_ALVO,
+                      lt_media: float = LEAD_TIME_MEDIO,
+                      lt_desvio: float = LEAD_TIME_DESVIO,
+                      custo_pedido: float = CUSTO_PEDIDO,
+                      custo_manutencao: float = CUSTO_MANUTENCAO,
+                      custo_falta: float = CUSTO_FALTA,
+                      seed: int | None = SEED, em_fluxo: bool = False) -> dict:
+    """
+    Simula o SKU com demanda por bootstrap de blocos do seu histórico.
+
+    Sem Q/ROP a política vem das fórmulas da seção 2 com a média e o desvio
+    do histórico (ROP do cenário A ou B). em_fluxo=True usa
+    simular_estoque_fluxo (horizontes longos, memória constante). Retorna o
+    resultado do motor mais "Q", "ROP" e os parâmetros estimados.
+    """
+    estimados = historico.estimar_parametros(sku)
+    if Q is None or ROP is None:
+        politica = calcular_parametros_lote(
+            estimados["demanda_media"], estimados["demanda_desvio"], lt_media,
+            lt_desvio, custo_pedido, custo_manutencao, nivel_servico,
+            horizonte=horizonte)
+        Q = max(1, int(politica["EOQ"])) if Q is None else Q
+        if ROP is None:
+            ROP = int(politica["ROP_A"] if cenario == "A" else politica["ROP_B"])
+
+    bootstrap = BootstrapBlocos(historico.serie(sku), n_replicacoes, horizonte,
+                                tamanho_bloco, seed=seed)
+    motor = simular_estoque_fluxo if em_fluxo else simular_estoque_lote
+    resultado = motor(Q, ROP, horizonte=horizonte, lt_media=lt_media,
+                      lt_desvio=lt_desvio, custo_pedido=custo_pedido,
+                      custo_manutencao=custo_manutencao, custo_falta=custo_falta,
+                      sementes=sementes_replicacoes(n_replicacoes, seed), demanda_externa=bootstrap)
+    resultado.update({"Q": Q, "ROP": ROP, **estimados})
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 5. LINHA DE COMANDO
+# ══════════════════════════════════════════════════════════════════════════════
+def main():
+    parser = argparse.ArgumentParser(description="Demanda historica por SKU para a simulacao.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("converter", help="CSV/Parquet -> armazenamento em memmap")
+    p.add_argument("origem")
+    p.add_argument("pasta")
+    p.add_argument("--demanda", default="demanda", help="coluna da demanda diaria")
+    p.add_argument("--sku", default="sku", help="coluna do SKU ('' = serie unica)")
+    p.add_argument("--data", default="data", help="coluna da data ('' = ordem do arquivo)")
+    p.add_argument("--pedaco", type=int, default=TAMANHO_PEDACO, help="linhas lidas por vez")
+
+    p = sub.add_parser("simular", help="bootstrap de blocos do historico de um SKU")
+    p.add_argument("pasta")
+    p.add_argument("--sku", default=SKU_UNICO)
+    p.add_argument("--replicacoes", type=int, default=N_REPLICACOES)
+    p.add_argument("--horizonte", type=int, default=HORIZONTE)
+    p.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_BOOTSTRAP,
+                   help="dias por bloco do bootstrap")
+    p.add_argument("--cenario", choices=("A", "B"), default="B")
+    p.add_argument("--seed", type=int, default=SEED)
+    p.add_argument("--fluxo", action="store_true", help="motor em fluxo (horizontes longos)")
+    args = parser.parse_args()
+
+    if args.comando == "converter":
+        print(f"Convertendo {args.origem}...")
+        historico = converter_historico(args.origem, args.pasta, args.demanda,
+                                        args.sku or None, args.data or None,
+                                        tamanho_pedaco=args.pedaco)
+        print(f"Historico salvo em: {args.pasta} ({len(historico)} SKU(s))")
+        return
+
+    historico = HistoricoDemanda(args.pasta)
+    res = simular_historico(historico, args.sku, n_replicacoes=args.replicacoes,
+                            horizonte=args.horizonte, tamanho_bloco=args.bloco,
+                            cenario=args.cenario, seed=args.seed, em_fluxo=args.fluxo)
+    r = res["resumo"]
+    print(f"SKU {args.sku}: demanda media {res['demanda_media']:.2f}, "
+          f"desvio {res['demanda_desvio']:.2f} -> Q={res['Q']}, ROP={res['ROP']}")
+    print(f"Custo total: R$ {r['custo_total']['media']:,.2f} "
+          f"+- {r['custo_total']['erro_padrao']:,.2f}")
+    print(f"Nivel de servico: {r['nivel_servico']['media']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Instrumentação leve dos caminhos quentes: cronômetros por fase e contadores.
+
+  • Desligada por padrão: fase() devolve um contexto vazio compartilhado e
+    contar() retorna na primeira linha, então o custo é de uma chamada de
+    função por bloco de réplicas (nunca por dia simulado)
+  • Ligada com ativar() ou com a variável de ambiente ESTOQUE_INSTRUMENTAR=1
+  • Fases acumulam tempo total, número de chamadas e a maior duração; os
+    eventos individuais (início e duração) ficam num traço limitado
+  • relatorio() soma os derivados: réplicas e dias simulados por segundo e
+    a taxa de acerto de cada cache (contadores "cache:<nome>:acerto/falha")
+  • exportar() grava o relatório em JSON ou as fases e contadores em CSV
+
+O estado é por processo: tarefas de pools devolvem o que mediram com
+coletar() e o processo pai soma com mesclar() (os tempos das fases viram
+tempo somado dos processos, não tempo de relógio). Um servidor com várias
+sessões (o dashboard) não liga o estado global: cada execução instala o
+Coletor da sua sessão com usar_coletor(), que vale só para a thread atual.
+
+Uso:
+    import instrumentacao_estoque as instr
+    instr.ativar()
+    with instr.fase("sorteios"):
+        ...
+    instr.contar("pedidos", 24)
+    instr.exportar("perfil.json")
+"""
+
+import contextlib
+import csv
+import json
+import os
+import threading
+import time
+
+MAX_EVENTOS = 100_000              # eventos guardados no traço (os mais antigos ficam)
+FASES_SIMULACAO = ("sorteios", "laco_diario", "custos")   # base de réplicas/s
+
+ATIVO = os.environ.get("ESTOQUE_INSTRUMENTAR", "") not in ("", "0")
+
+_NULO = contextlib.nullcontext()
+
+
+class Coletor:
+    """Fases, contadores e eventos de um escopo (o global do processo ou o de uma sessão)."""
+    __slots__ = ("fases", "contadores", "eventos", "inicio")
+
+    def __init__(self):
+        self.fases: dict[str, list] = {}         # nome → [segundos, chamadas, maior]
+        self.contadores: dict[str, float] = {}
+        self.eventos: list[tuple] = []           # (fase, início relativo, duração)
+        self.inicio = time.perf_counter()
+
+    def zerar(self):
+        self.fases.clear()
+        self.contadores.clear()
+        self.eventos.clear()
+        self.inicio = time.perf_counter()
+
+
+_global = Coletor()
+_local = threading.local()         # .coletor: escopo instalado na thread atual
+
+
+def _atual() -> Coletor | None:
+    """Coletor que recebe as medições desta thread (None: desligado)."""
+    coletor = getattr(_local, "coletor", None)
+    if coletor is not None:
+        return coletor
+    return _global if ATIVO else None
+
+
+def ativar():
+    global ATIVO
+    ATIVO = True
+
+
+def desativar():
+    global ATIVO
+    ATIVO = False
+
+
+def ativo() -> bool:
+    """Se as medições desta thread estão sendo coletadas (global ou por escopo)."""
+    return _atual() is not None
+
+
+def usar_coletor(coletor: Coletor | None):
+    """
+    Envia as medições da thread atual para `coletor` (None volta ao estado
+    global). Não afeta outras threads nem o ligado/desligado global.
+    """
+    _local.coletor = coletor
+
+
+def zerar():
+    """Descarta fases, contadores e eventos do estado global (o ligado/desligado fica)."""
+    _global.zerar()
+
+
+def coletar() -> dict | None:
+    """Fases e contadores acumulados (zerando-os), para mandar ao processo pai."""
+    coletor = _atual()
+    if coletor is None:
+        return None
+    bruto = {"fases": {n: list(v) for n, v in coletor.fases.items()},
+             "contadores": dict(coletor.contadores)}
+    coletor.fases.clear()
+    coletor.contadores.clear()
+    return bruto
+
+
+def mesclar(bruto: dict | None):
+    """Soma o resultado de coletar() de outro processo (eventos não vêm junto)."""
+    coletor = _atual()
+    if coletor is None or not bruto:
+        return
+    for nome, (s, n, m) in bruto["fases"].items():
+        acumulado = coletor.fases.setdefault(nome, [0.0, 0, 0.0])
+        acumulado[0] += s
+        acumulado[1] += n
+        acumulado[2] = max(acumulado[2], m)
+    for nome, valor in bruto["contadores"].items():
+        coletor.contadores[nome] = coletor.contadores.get(nome, 0) + valor
+
+
+class _Cronometro:
+    __slots__ = ("nome", "t0")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nome, time.perf_counter() - self.t0, self.t0)
+        return False
+
+
+def fase(nome: str):
+    """Contexto que cronometra `nome` (vazio e sem custo se desligado)."""
+    if _atual() is None:
+        return _NULO
+    return _Cronometro(nome)
+
+
+def registrar(nome: str, segundos: float, t0: float | None = None):
+    """Acumula uma duração medida fora de fase() (ex.: uma execução inteira)."""
+    coletor = _atual()
+    if coletor is None:
+        return
+    acumulado = coletor.fases.get(nome)
+    if acumulado is None:
+        coletor.fases[nome] = [segundos, 1, segundos]
+    else:
+        acumulado[0] += segundos
+        acumulado[1] += 1
+        if segundos > acumulado[2]:
+            acumulado[2] = segundos
+    if len(coletor.eventos) < MAX_EVENTOS:
+        inicio = (t0 if t0 is not None else time.perf_counter() - segundos) - coletor.inicio
+        coletor.eventos.append((nome, inicio, segundos))
+
+
+def contar(nome: str, valor: float = 1):
+    """Soma `valor` ao contador `nome` (nada se desligado)."""
+    coletor = _atual()
+    if coletor is None:
+        return
+    coletor.contadores[nome] = coletor.contadores.get(nome, 0) + valor
+
+
+def cronometrado(nome: str | None = None):
+    """Decorador: cada chamada da função vira uma fase (nome da função por padrão)."""
+    def decorar(funcao):
+        rotulo = nome or funcao.__name__
+
+        def envolvida(*args, **kwargs):
+            if _atual() is None:
+                return funcao(*args, **kwargs)
+            with _Cronometro(rotulo):
+                return funcao(*args, **kwargs)
+
+        envolvida.__name__ = funcao.__name__
+        envolvida.__doc__ = funcao.__doc__
+        envolvida.__wrapped__ = funcao
+        return envolvida
+    return decorar
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RELATÓRIO E EXPORTAÇÃO
+# ══════════════════════════════════════════════════════════════════════════════
+def relatorio(coletor: Coletor | None = None) -> dict:
+    """
+    Relatório de `coletor` (padrão: o da thread atual, ou o global).
+    Fases ({nome: segundos, chamadas, media, maior}), contadores e derivados:
+        - replicas_por_segundo / dias_por_segundo: contadores "replicas" e
+          "dias_simulados" sobre o tempo das FASES_SIMULACAO
+        - taxa_acerto_<cache>: acertos / (acertos + falhas)
+    """
+    coletor = coletor or _atual() or _global
+    medidas, contadores = coletor.fases, coletor.contadores
+    fases = {nome: {"segundos": s, "chamadas": n, "media": s / n, "maior": m}
+             for nome, (s, n, m) in sorted(medidas.items(), key=lambda f: -f[1][0])}
+    derivados = {}
+    tempo_simulacao = sum(medidas[f][0] for f in FASES_SIMULACAO if f in medidas)
+    if tempo_simulacao > 0:
+        for contador, derivado in (("replicas", "replicas_por_segundo"),
+                                   ("dias_simulados", "dias_por_segundo")):
+            if contador in contadores:
+                derivados[derivado] = contadores[contador] / tempo_simulacao
+    caches = {c.split(":")[1] for c in contadores if c.startswith("cache:")}
+    for cache in sorted(caches):
+        acertos = contadores.get(f"cache:{cache}:acerto", 0)
+        falhas = contadores.get(f"cache:{cache}:falha", 0)
+        if acertos + falhas:
+            derivados[f"taxa_acerto_{cache}"] = acertos / (acertos + falhas)
+    return {
+        "ativo": coletor is _atual(),
+        "duracao": time.perf_counter() - coletor.inicio,
+        "fases": fases,
+        "contadores": dict(sorted(contadores.items())),
+        "derivados": derivados,
+        "eventos_no_traco": len(coletor.eventos),
+    }
+
+
+def exportar(caminho: str, eventos: bool = True) -> str:
+    """
+    Grava o relatório em `caminho`: JSON (relatório e, com eventos=True, o
+    traço de eventos) ou CSV (uma linha por fase, contador e derivado).
+    """
+    coletor = _atual() or _global
+    rel = relatorio(coletor)
+    if os.path.splitext(caminho)[1].lower() == ".csv":
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["tipo", "nome", "valor", "chamadas", "media", "maior"])
+            for nome, r in rel["fases"].items():
+                escritor.writerow(["fase", nome, r["segundos"], r["chamadas"], r["media"], r["maior"]])
+            for nome, valor in rel["contadores"].items():
+                escritor.writerow(["contador", nome, valor, "", "", ""])
+            for nome, valor in rel["derivados"].items():
+                escritor.writerow(["derivado", nome, valor, "", "", ""])
+    else:
+        if eventos:
+            rel["eventos"] = [{"fase": n, "inicio": i, "duracao": d} for n, i, d in coletor.eventos]
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(rel, f, indent=2)
+    return caminho
+
+
+def imprimir_relatorio():
+    """Resumo das fases e derivados no console."""
+    rel = relatorio()
+    print(f"\n  {'Fase':<28} {'Total (s)':>10} {'Chamadas':>9} {'Media (ms)':>11}")
+    for nome, r in rel["fases"].items():
+        print(f"  {nome:<28} {r['segundos']:>10.3f} {r['chamadas']:>9} {r['media']*1000:>11.2f}")
+    for nome, valor in rel["contadores"].items():
+        print(f"  {nome:<28} {valor:>10,.0f}")
+    for nome, valor in rel["derivados"].items():
+        print(f"  {nome:<28} {valor:>10,.3f}" if valor < 10 else f"  {nome:<28} {valor:>10,.0f}")
@@ -0,0 +1,1033 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Núcleo da simulação de estoque: parâmetros, fórmulas analíticas
+(EOQ, SS, ROP) e os motores de simulação da política (Q, ROP).
+
+  • simular_estoque         – laço dia a dia (referência)
+  • simular_estoque_lote    – N réplicas vetorizadas em NumPy
+  • simular_estoque_eventos – avanço de evento em evento
+  • simular_estoque_fluxo   – réplicas em trechos de dias, sem guardar a
+                              trajetória (memória constante no horizonte;
+                              estatísticas online e amostra da trajetória)
+
+Resultados compactos (seção 3e):
+  • tabela_resultados       – tabela colunar pré-alocada (32 bytes por
+                              réplica), preenchida pelos motores via `saida`
+  • ResultadoSimulacao      – resultado de uma trajetória com tipos
+                              compactos (compactar_resultado), lido por
+                              chave como o dicionário de simular_estoque
+
+Só depende de NumPy e da biblioteca padrão: pode ser importado por
+processos trabalhadores e serviços sem carregar matplotlib/seaborn/scipy.
+O relatório e a linha de comando ficam em simulacaoestoque.py.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from statistics import NormalDist
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from aleatorio_estoque import (GERADOR_PADRAO, FluxoNormais, FluxosNormais,
+                               como_sementes, criar_gerador, normais_em_bloco,
+                               rotulos_sementes, sementes_replicacoes)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. PARÂMETROS GLOBAIS
+# ══════════════════════════════════════════════════════════════════════════════
+SEED = 111
+
+HORIZONTE = 365                    # dias
+DEMANDA_MEDIA = 100                # μ_d (unidades/dia)
+DEMANDA_DESVIO = 20                # σ_d
+
+LEAD_TIME_MEDIO = 5                # μ_L (dias)
+LEAD_TIME_DESVIO = 1.5             # σ_L
+
+CUSTO_PEDIDO = 150.0               # S  (R$/pedido)
+CUSTO_MANUTENCAO = 5.0             # H  (R$/un/ano)
+CUSTO_FALTA = 20.0                 # Shortage (R$/un perdida)
+
+NIVEL_SERVICO_ALVO = 0.95          # Para cenário B
+
+
+def quantil_normal(p):
+    """Inversa da normal padrão (escalar ou array), sem depender do scipy."""
+    inv_cdf = NormalDist().inv_cdf
+    if np.ndim(p) == 0:
+        return inv_cdf(float(p))
+    return np.vectorize(inv_cdf, otypes=[float])(p)
+
+
+Z_SCORE = quantil_normal(NIVEL_SERVICO_ALVO)   # ≈ 1.645
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. CÁLCULOS ANALÍTICOS (EOQ, ROP, SS)
+# ══════════════════════════════════════════════════════════════════════════════
+demanda_anual = DEMANDA_MEDIA * HORIZONTE  # D anual
+
+# EOQ clássico: Q* = sqrt(2·D·S / H)
+EOQ = np.sqrt(2 * demanda_anual * CUSTO_PEDIDO / CUSTO_MANUTENCAO)
+EOQ = round(EOQ)
+
+# ── Cenário A: ROP determinístico (sem segurança) ──────────────────────────
+ROP_A = DEMANDA_MEDIA * LEAD_TIME_MEDIO                       # = 500 un
+
+# ── Cenário B: ROP com estoque de segurança ─────────────────────────────────
+SS_B = Z_SCORE * np.sqrt(
+    LEAD_TIME_MEDIO * DEMANDA_DESVIO**2
+    + DEMANDA_MEDIA**2 * LEAD_TIME_DESVIO**2
+)
+SS_B = round(SS_B)
+ROP_B = DEMANDA_MEDIA * LEAD_TIME_MEDIO + SS_B
+
+
+
+def calcular_parametros_lote(demanda_media, demanda_desvio, lt_media, lt_desvio,
+                             custo_pedido=CUSTO_PEDIDO,
+                             custo_manutencao=CUSTO_MANUTENCAO,
+                             nivel_servico=NIVEL_SERVICO_ALVO,
+                             horizonte: int = HORIZONTE) -> dict:
+    """
+    EOQ, SS e ROP (cenários A e B) para vários SKUs de uma vez.
+
+    Aceita escalares ou arrays de mesmo tamanho e aplica as mesmas fórmulas
+    da seção 2. Retorna dicionário de arrays int64 (EOQ, ROP_A, SS, ROP_B) e
+    o Z de cada SKU.
+    """
+    demanda_media = np.asarray(demanda_media, dtype=float)
+    demanda_desvio = np.asarray(demanda_desvio, dtype=float)
+    lt_media = np.asarray(lt_media, dtype=float)
+    lt_desvio = np.asarray(lt_desvio, dtype=float)
+
+    eoq = np.rint(np.sqrt(2 * demanda_media * horizonte * np.asarray(custo_pedido)
+                          / np.asarray(custo_manutencao)))
+    z = quantil_normal(nivel_servico)
+    ss = np.rint(z * np.sqrt(lt_media * demanda_desvio**2
+                             + demanda_media**2 * lt_desvio**2))
+    ss = np.maximum(ss, 0)  # alvos < 50% não geram estoque de segurança negativo
+    rop_a = np.rint(demanda_media * lt_media)
+
+    return {
+        "EOQ": eoq.astype(np.int64),
+        "ROP_A": rop_a.astype(np.int64),
+        "SS": ss.astype(np.int64),
+        "ROP_B": (rop_a + ss).astype(np.int64),
+        "Z": np.broadcast_to(z, eoq.shape).copy(),
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. FUNÇÃO DE SIMULAÇÃO DIA-A-DIA
+# ══════════════════════════════════════════════════════════════════════════════
+def simular_estoque(Q: int, ROP: int, horizonte: int = HORIZONTE,
+                    demanda_media: float = DEMANDA_MEDIA,
+                    demanda_desvio: float = DEMANDA_DESVIO,
+                    lt_media: float = LEAD_TIME_MEDIO,
+                    lt_desvio: float = LEAD_TIME_DESVIO,
+                    custo_pedido: float = CUSTO_PEDIDO,
+                    custo_manutencao: float = CUSTO_MANUTENCAO,
+                    custo_falta: float = CUSTO_FALTA,
+                    seed: int | None = None,
+                    guardar_niveis: bool = True,
+                    demanda_externa=None,
+                    gerador: str = GERADOR_PADRAO) -> dict:
+    """
+    Simula o estoque dia a dia com política (Q, ROP).
+
+    As normais vêm de um buffer sorteado em blocos (aleatorio_estoque.
+    FluxoNormais) do `gerador` ("legado" = RandomState, "pcg64").
+
+    Com `demanda_externa` (sequência com ≥ horizonte demandas diárias, ex.: um
+    histórico, ver historico_estoque) a demanda do dia vem dela em vez do
+    sorteio normal; os lead times continuam sorteados.
+
+    Retorna dicionário com:
+        - niveis       : array de nível de estoque real por dia
+                         (None se guardar_niveis=False)
+        - demandas     : array de demandas geradas (idem)
+        - lead_times   : lista de lead-times realizados
+        - custo_pedido : custo total de pedidos
+        - custo_manut  : custo total de manutenção
+        - custo_falta  : custo total de falta
+        - custo_total  : soma dos três custos
+        - nivel_servico: fração de ciclos sem ruptura
+    """
+    fluxo = FluxoNormais(seed, gerador)
+
+    # Estado inicial
+    estoque = Q + ROP  # começar com estoque confortável
+    estoque_posicao = estoque  # posição = real + em trânsito
+    pedido_pendente = False
+    dia_chegada = -1
+
+    niveis = np.zeros(horizonte) if guardar_niveis else None
+    demandas = np.zeros(horizonte) if guardar_niveis else None
+    lead_times_list = []
+
+    total_custo_pedido = 0.0
+    total_custo_falta = 0.0
+    unidades_em_estoque_dia = 0.0   # para custo de manutenção
+
+    ciclos_total = 0
+    ciclos_sem_ruptura = 0
+    ruptura_no_ciclo = False
+
+    for dia in range(horizonte):
+        # 3a. Gerar demanda do dia
+        d = demanda_media + demanda_desvio * fluxo.proximo()
+        if demanda_externa is not None:
+            # O sorteio é descartado: os lead times seguem o mesmo fluxo do motor em lote
+            d = float(demanda_externa[dia])
+        d = max(0, round(d))
+        if guardar_niveis:
+            demandas[dia] = d
+
+        # 3b. Consumir estoque
+        estoque -= d
+        estoque_posicao -= d
+
+        # 3c. Verificar chegada de pedido
+        if pedido_pendente and dia >= dia_chegada:
+            estoque += Q
+            estoque_posicao += Q  # posição já tinha sido somada na emissão?
+            # Nota: estoque_posicao foi incrementado no momento da emissão,
+            # mas devemos corrigir: re-sincronizar
+            pedido_pendente = False
+
+            # Fechar ciclo
+            ciclos_total += 1
+            if not ruptura_no_ciclo:
+                ciclos_sem_ruptura += 1
+            ruptura_no_ciclo = False
+
+        # 3d. Registrar ruptura
+        if estoque < 0:
+            total_custo_falta += abs(estoque) * custo_falta
+            ruptura_no_ciclo = True
+
+        # 3e. Manutenção (apenas estoque ≥ 0)
+        if estoque > 0:
+            unidades_em_estoque_dia += estoque
+
+        # 3f. Emitir novo pedido se necessário
+        # Usa estoque virtual (posição) = estoque real + pedido em trânsito
+        estoque_virtual = estoque + (Q if pedido_pendente else 0)
+        if estoque_virtual <= ROP and not pedido_pendente:
+            pedido_pendente = True
+            lt = lt_media + lt_desvio * fluxo.proximo()
+            lt = max(1, round(lt))
+            lead_times_list.append(lt)
+            dia_chegada = dia + lt
+            total_custo_pedido += custo_pedido
+
+        if guardar_niveis:
+            niveis[dia] = estoque
+
+    # Fechar último ciclo se havia pedido pendente
+    if ciclos_total == 0:
+        ciclos_total = 1  # evitar divisão por zero
+
+    # Custo de manutenção anual → proporcional
+    total_custo_manut = (unidades_em_estoque_dia / horizonte) * custo_manutencao
+
+    nivel_servico = ciclos_sem_ruptura / ciclos_total if ciclos_total > 0 else 1.0
+
+    return {
+        "niveis": niveis,
+        "demandas": demandas,
+        "lead_times": lead_times_list,
+        "custo_pedido": total_custo_pedido,
+        "custo_manut": total_custo_manut,
+        "custo_falta": total_custo_falta,
+        "custo_total": total_custo_pedido + total_custo_manut + total_custo_falta,
+        "nivel_servico": nivel_servico,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3b. MOTOR VETORIZADO (N REPLICAÇÕES EM PARALELO)
+# ══════════════════════════════════════════════════════════════════════════════
+N_REPLICACOES = 1000               # réplicas de Monte Carlo por cenário
+TAMANHO_BLOCO_REPLICACOES = 4096   # réplicas processadas por vez (limita memória)
+
+
+def _sementes_replicacoes(n_replicacoes: int, seed: int | None,
+                          gerador: str = GERADOR_PADRAO) -> np.ndarray:
+    """
+    Semente de cada réplica: seed, seed+1, ... no legado, fluxos filhos de
+    SeedSequence(seed) no pcg64, ou aleatórias se seed=None.
+    """
+    return sementes_replicacoes(n_replicacoes, seed, gerador)
+
+
+def normais_replicacoes(sementes, n_sorteios: int,
+                        gerador: str = GERADOR_PADRAO) -> np.ndarray:
+    """
+    Matriz (N, n_sorteios) de normais padrão, linha i gerada pelo fluxo de
+    sementes[i] — a mesma sequência consumida por
+    `simular_estoque(seed=sementes[i], gerador=gerador)`.
+    """
+    with instr.fase("sorteios"):
+        return normais_em_bloco(sementes, n_sorteios, gerador)
+
+
+def _estado_inicial(n, Q, ROP) -> dict:
+    """Estado de N réplicas no dia 0: arrays de forma (N,)."""
+    return {
+        "estoque": np.broadcast_to(np.asarray(Q + ROP, dtype=np.int64), (n,)).copy(),
+        "pedido_pendente": np.zeros(n, dtype=bool),
+        "dia_chegada": np.full(n, -1, dtype=np.int64),
+        "ruptura_no_ciclo": np.zeros(n, dtype=bool),
+        "n_pedidos": np.zeros(n, dtype=np.int64),
+        "ciclos_total": np.zeros(n, dtype=np.int64),
+        "ciclos_sem_ruptura": np.zeros(n, dtype=np.int64),
+        "unidades_em_estoque_dia": np.zeros(n, dtype=np.int64),
+        "total_custo_pedido": np.zeros(n),
+        "total_custo_falta": np.zeros(n),
+    }
+
+
+def _avancar_dias(estado, Q, ROP, z, coluna0, dia_ini, dia_fim,
+                  demanda_media, demanda_desvio, lt_media, lt_desvio,
+                  custo_pedido, custo_falta, niveis=None, demandas=None,
+                  lead_times=None, demanda_externa=None):
+    """
+    Avança as réplicas do dia `dia_ini` até a véspera de `dia_fim`.
+
+    A coluna j de `z` é o sorteio coluna0 + j do fluxo de cada réplica. Se
+    dados, `niveis` e `demandas` (N, dia_fim - dia_ini) recebem a trajetória
+    do trecho e `lead_times` (lista) os lead times sorteados.
+    `demanda_externa` (N, dia_fim - dia_ini) substitui a demanda sorteada;
+    o sorteio continua sendo consumido, como em simular_estoque.
+    """
+    n = z.shape[0]
+    linhas = np.arange(n)
+    estoque = estado["estoque"]
+    pedido_pendente = estado["pedido_pendente"]
+    dia_chegada = estado["dia_chegada"]
+    ruptura_no_ciclo = estado["ruptura_no_ciclo"]
+    n_pedidos = estado["n_pedidos"]
+    ciclos_total = estado["ciclos_total"]
+    ciclos_sem_ruptura = estado["ciclos_sem_ruptura"]
+    unidades_em_estoque_dia = estado["unidades_em_estoque_dia"]
+    total_custo_pedido = estado["total_custo_pedido"]
+    total_custo_falta = estado["total_custo_falta"]
+
+    for dia in range(dia_ini, dia_fim):
+        # Cada dia consome 1 sorteio de demanda e cada pedido 1 de lead time,
+        # na mesma ordem do laço escalar: o cursor é dia + pedidos emitidos.
+        cursor = dia + n_pedidos - coluna0
+
+        if demanda_externa is None:
+            d = np.maximum(np.rint(demanda_media + demanda_desvio * z[linhas, cursor]), 0)
+        else:
+            d = np.maximum(np.rint(demanda_externa[:, dia - dia_ini]), 0)
+        estoque -= d.astype(np.int64)
+
+        chegou = pedido_pendente & (dia >= dia_chegada)
+        estoque += Q * chegou
+        pedido_pendente &= ~chegou
+        ciclos_total += chegou
+        ciclos_sem_ruptura += chegou & ~ruptura_no_ciclo
+        ruptura_no_ciclo &= ~chegou
+
+        falta = estoque < 0
+        total_custo_falta += np.where(falta, -estoque * custo_falta, 0.0)
+        ruptura_no_ciclo |= falta
+
+        unidades_em_estoque_dia += np.maximum(estoque, 0)
+
+        pedir = ~pedido_pendente & (estoque <= ROP)
+        if pedir.any():
+            lt = np.rint(lt_media + lt_desvio * z[linhas, cursor + 1])
+            lt = np.maximum(1, lt).astype(np.int64)
+            dia_chegada[:] = np.where(pedir, dia + lt, dia_chegada)
+            pedido_pendente |= pedir
+            n_pedidos += pedir
+            total_custo_pedido += np.where(pedir, custo_pedido, 0.0)
+            if lead_times is not None:
+                lead_times.append(lt[pedir])
+
+        if niveis is not None:
+            niveis[:, dia - dia_ini] = estoque
+        if demandas is not None:
+            demandas[:, dia - dia_ini] = d
+
+
+def _fechar_estado(estado, horizonte, custo_manutencao) -> dict:
+    """Métricas finais por réplica a partir dos acumuladores do estado."""
+    ciclos_total = np.maximum(estado["ciclos_total"], 1)  # evitar divisão por zero
+    total_custo_manut = (estado["unidades_em_estoque_dia"] / horizonte) * custo_manutencao
+    total_custo_pedido = estado["total_custo_pedido"]
+    total_custo_falta = estado["total_custo_falta"]
+    return {
+        "n_pedidos": estado["n_pedidos"],
+        "custo_pedido": total_custo_pedido,
+        "custo_manut": total_custo_manut,
+        "custo_falta": total_custo_falta,
+        "custo_total": total_custo_pedido + total_custo_manut + total_custo_falta,
+        "nivel_servico": estado["ciclos_sem_ruptura"] / ciclos_total,
+    }
+
+
+def _trecho_demanda(demanda_externa, ini, fim, dia_ini, dia_fim) -> np.ndarray:
+    """Linhas ini:fim e dias dia_ini:dia_fim de uma demanda externa, em float."""
+    trecho = np.asarray(demanda_externa[ini:fim, dia_ini:dia_fim], dtype=float)
+    if trecho.shape != (fim - ini, dia_fim - dia_ini):
+        raise ValueError(f"demanda_externa cobre {trecho.shape} (réplicas × dias); "
+                         f"esperado {(fim - ini, dia_fim - dia_ini)}")
+    return trecho
+
+
+def _contar_bloco(n, horizonte, n_pedidos):
+    """Contadores de um bloco simulado (só chamado com a instrumentação ligada)."""
+    instr.contar("replicas", n)
+    instr.contar("dias_simulados", n * horizonte)
+    instr.contar("pedidos", int(np.sum(n_pedidos)))
+
+
+def _simular_bloco(Q, ROP, z, horizonte, demanda_media, demanda_desvio,
+                   lt_media, lt_desvio, custo_pedido, custo_manutencao,
+                   custo_falta, guardar_niveis, dtype_niveis=np.float64,
+                   demanda_externa=None):
+    """Avança um bloco de réplicas (linhas de `z`) ao longo do horizonte."""
+    n = z.shape[0]
+    estado = _estado_inicial(n, Q, ROP)
+    niveis = np.zeros((n, horizonte), dtype=dtype_niveis) if guardar_niveis else None
+    with instr.fase("laco_diario"):
+        _avancar_dias(estado, Q, ROP, z, 0, 0, horizonte, demanda_media,
+                      demanda_desvio, lt_media, lt_desvio, custo_pedido,
+                      custo_falta, niveis=niveis, demanda_externa=demanda_externa)
+    with instr.fase("custos"):
+        metricas = _fechar_estado(estado, horizonte, custo_manutencao)
+    if instr.ativo():
+        _contar_bloco(n, horizonte, metricas["n_pedidos"])
+    return {"niveis": niveis, **metricas}
+
+
+def simular_estoque_lote(Q: int, ROP: int, n_replicacoes: int = N_REPLICACOES,
+                         horizonte: int = HORIZONTE,
+                         demanda_media: float = DEMANDA_MEDIA,
+                         demanda_desvio: float = DEMANDA_DESVIO,
+                         lt_media: float = LEAD_TIME_MEDIO,
+                         lt_desvio: float = LEAD_TIME_DESVIO,
+                         custo_pedido: float = CUSTO_PEDIDO,
+                         custo_manutencao: float = CUSTO_MANUTENCAO,
+                         custo_falta: float = CUSTO_FALTA,
+                         seed: int | None = None,
+                         sementes=None,
+                         guardar_niveis: bool = False,
+                         tamanho_bloco: int = TAMANHO_BLOCO_REPLICACOES,
+                         saida: np.ndarray | None = None,
+                         dtype_niveis=np.float64,
+                         demanda_externa=None,
+                         gerador: str = GERADOR_PADRAO) -> dict:
+    """
+    Simula N réplicas da política (Q, ROP) ao mesmo tempo, com o estado de
+    todas as réplicas em arrays NumPy.
+
+    A réplica i usa a semente `sementes[i]` (por padrão seed + i no legado,
+    um fluxo filho de SeedSequence(seed) no pcg64) e reproduz exatamente
+    `simular_estoque(..., seed=sementes[i], gerador=gerador)`. Q, ROP e os
+    parâmetros de demanda, lead time e custo aceitam escalares ou arrays de
+    forma (N,) — um valor por réplica (ex.: um SKU por linha).
+
+    Retorna dicionário com arrays de forma (N,):
+        - custo_pedido, custo_manut, custo_falta, custo_total
+        - nivel_servico: fração de ciclos sem ruptura
+        - n_pedidos    : pedidos emitidos
+        - sementes     : semente de cada réplica (no pcg64 o índice do
+                         filho de SeedSequence, ver rotulos_sementes)
+        - niveis       : matriz (N, horizonte) de `dtype_niveis`, só se
+                         guardar_niveis=True
+        - resumo       : estatísticas de cada métrica (ver resumir_replicacoes)
+
+    Com `saida` (ver tabela_resultados, N linhas) cada bloco é gravado
+    direto na tabela e as métricas devolvidas são vistas das suas colunas.
+
+    `demanda_externa` é uma matriz (N, ≥ horizonte) de demandas diárias que
+    substitui o sorteio normal (demanda_media/desvio são ignorados). Só as
+    linhas de cada bloco são lidas (`demanda_externa[ini:fim, :horizonte]`),
+    então serve um memmap ou um gerador preguiçoso como
+    historico_estoque.BootstrapBlocos.
+    """
+    if sementes is None:
+        sementes = _sementes_replicacoes(n_replicacoes, seed, gerador)
+    sementes = como_sementes(sementes)
+
+    parametros = [Q, ROP, demanda_media, demanda_desvio, lt_media, lt_desvio,
+                  custo_pedido, custo_manutencao, custo_falta]
+
+    blocos = []
+    for ini in range(0, len(sementes), tamanho_bloco):
+        fim = ini + tamanho_bloco
+        (Q_b, ROP_b, dm_b, dd_b, ltm_b, ltd_b, cp_b, cm_b, cf_b) = [
+            p[ini:fim] if np.ndim(p) else p for p in parametros]
+        z = normais_replicacoes(sementes[ini:fim], 2 * horizonte, gerador)
+        externa_b = (None if demanda_externa is None else
+                     _trecho_demanda(demanda_externa, ini, ini + len(z), 0, horizonte))
+        bloco = _simular_bloco(
+            Q_b, ROP_b, z, horizonte, dm_b, dd_b, ltm_b, ltd_b,
+            cp_b, cm_b, cf_b, guardar_niveis, dtype_niveis, externa_b)
+        if saida is not None:
+            _gravar_bloco(saida, ini, bloco, sementes[ini:fim])
+            bloco = {"niveis": bloco["niveis"]}
+        blocos.append(bloco)
+
+    resultado = {
+        chave: (np.concatenate([b[chave] for b in blocos])
+                if blocos[0][chave] is not None else None)
+        for chave in blocos[0]
+    }
+    if saida is not None:
+        resultado.update({campo: saida[campo] for campo in CAMPOS_RESULTADO})
+    resultado["sementes"] = rotulos_sementes(sementes)
+    resultado["resumo"] = resumir_replicacoes(resultado)
+    return resultado
+
+
+def resumir_replicacoes(resultado: dict) -> dict:
+    """
+    Estatísticas de Monte Carlo das métricas por réplica: média, desvio,
+    erro padrão, IC 95% da média e percentis 5/50/95.
+    """
+    z_ic = quantil_normal(0.975)
+    resumo = {}
+    for chave in ("custo_pedido", "custo_manut", "custo_falta",
+                  "custo_total", "nivel_servico"):
+        valores = np.asarray(resultado[chave], dtype=float)
+        n = len(valores)
+        media = valores.mean()
+        desvio = valores.std(ddof=1) if n > 1 else 0.0
+        erro_padrao = desvio / np.sqrt(n)
+        p05, p50, p95 = np.percentile(valores, [5, 50, 95])
+        resumo[chave] = {
+            "media": media,
+            "desvio": desvio,
+            "erro_padrao": erro_padrao,
+            "ic95": (media - z_ic * erro_padrao, media + z_ic * erro_padrao),
+            "p05": p05,
+            "p50": p50,
+            "p95": p95,
+        }
+    return resumo
+
+
+def simular_politicas(Q, ROP, z: np.ndarray, horizonte: int = HORIZONTE,
+                      demanda_media: float = DEMANDA_MEDIA,
+                      demanda_desvio: float = DEMANDA_DESVIO,
+                      lt_media: float = LEAD_TIME_MEDIO,
+                      lt_desvio: float = LEAD_TIME_DESVIO,
+                      custo_pedido: float = CUSTO_PEDIDO,
+                      custo_manutencao: float = CUSTO_MANUTENCAO,
+                      custo_falta: float = CUSTO_FALTA,
+                      tamanho_bloco: int = TAMANHO_BLOCO_REPLICACOES) -> dict:
+    """
+    Avalia M políticas (Q[m], ROP[m]) sobre as mesmas N trajetórias
+    aleatórias `z` (matriz de normais_replicacoes): números aleatórios comuns.
+
+    Como todas as políticas enfrentam exatamente a mesma demanda e os mesmos
+    lead times, a diferença de custo entre elas tem variância bem menor que
+    com sorteios independentes. Retorna arrays (M, N) de cada métrica.
+    """
+    Q = np.atleast_1d(np.asarray(Q, dtype=np.int64))
+    ROP = np.atleast_1d(np.asarray(ROP, dtype=np.int64))
+    m, n = len(Q), z.shape[0]
+    if z.shape[1] < 2 * horizonte:
+        raise ValueError("z precisa de pelo menos 2·horizonte sorteios por réplica")
+
+    # Linhas = (política, réplica); as réplicas se repetem para cada política
+    linhas_por_bloco = max(n, tamanho_bloco - tamanho_bloco % n)
+    politicas_por_bloco = linhas_por_bloco // n
+    blocos = []
+    for ini in range(0, m, politicas_por_bloco):
+        Q_b = np.repeat(Q[ini:ini + politicas_por_bloco], n)
+        ROP_b = np.repeat(ROP[ini:ini + politicas_por_bloco], n)
+        z_b = np.tile(z, (len(Q_b) // n, 1))
+        blocos.append(_simular_bloco(
+            Q_b, ROP_b, z_b, horizonte, demanda_media, demanda_desvio,
+            lt_media, lt_desvio, custo_pedido, custo_manutencao, custo_falta,
+            guardar_niveis=False))
+
+    return {
+        chave: np.concatenate([b[chave] for b in blocos]).reshape(m, n)
+        for chave in ("n_pedidos", "custo_pedido", "custo_manut",
+                      "custo_falta", "custo_total", "nivel_servico")
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3c. NÚCLEO POR EVENTOS (AVANÇO AO PRÓXIMO EVENTO)
+# ══════════════════════════════════════════════════════════════════════════════
+# A política só muda de estado na emissão e na chegada de pedidos. Entre dois
+# eventos o estoque apenas cai com a demanda, então o dia do cruzamento do ROP,
+# as unidades em estoque e as unidades em falta do intervalo saem direto das
+# somas acumuladas da demanda:
+#     S1[i] = g[0] + ... + g[i-1]        (demanda acumulada)
+#     S2[i] = S1[0] + ... + S1[i-1]      (soma das demandas acumuladas)
+# onde g é a demanda (arredondada, ≥ 0) de cada sorteio do fluxo aleatório.
+# O dia t consome o sorteio t + k, sendo k o número de pedidos já emitidos
+# (cada pedido consome um sorteio de lead time logo após a demanda do dia).
+
+def _positivo_e_falta(S1, S2, base, E, i_ini, i_fim):
+    """
+    Soma de max(nível, 0) e de max(-nível, 0) para os sorteios i_ini..i_fim,
+    com nível(i) = E - (S1[i + 1] - base). Retorna (unidades, falta, último nível).
+    """
+    if i_fim < i_ini:
+        return 0, 0, E
+    limite = base + E
+    # nível > 0  ⇔  S1[i + 1] < limite
+    j_pos = bisect_left(S1, limite, i_ini + 1, i_fim + 2)
+    n_pos = j_pos - (i_ini + 1)
+    unidades = n_pos * limite - (S2[j_pos] - S2[i_ini + 1])
+    # nível < 0  ⇔  S1[i + 1] > limite
+    j_neg = bisect_right(S1, limite, i_ini + 1, i_fim + 2)
+    n_neg = i_fim + 2 - j_neg
+    falta = (S2[i_fim + 2] - S2[j_neg]) - n_neg * limite
+    return unidades, falta, E - (S1[i_fim + 1] - base)
+
+
+def simular_estoque_eventos(Q: int, ROP: int, horizonte: int = HORIZONTE,
+                            demanda_media: float = DEMANDA_MEDIA,
+                            demanda_desvio: float = DEMANDA_DESVIO,
+                            lt_media: float = LEAD_TIME_MEDIO,
+                            lt_desvio: float = LEAD_TIME_DESVIO,
+                            custo_pedido: float = CUSTO_PEDIDO,
+                            custo_manutencao: float = CUSTO_MANUTENCAO,
+                            custo_falta: float = CUSTO_FALTA,
+                            seed: int | None = None,
+                            guardar_niveis: bool = False,
+                            gerador: str = GERADOR_PADRAO) -> dict:
+    """
+    Mesma política (Q, ROP) de `simular_estoque`, avançando de evento em
+    evento (emissão → chegada → próxima emissão) em vez de dia a dia.
+
+    O custo por réplica cresce com o número de ciclos de pedido, não com o
+    horizonte. Com a mesma seed reproduz os níveis, lead times, unidades em
+    falta/estoque e o nível de serviço do laço diário.
+
+    Retorna as mesmas chaves de `simular_estoque` mais `n_pedidos`;
+    `niveis` e `demandas` só são montados se guardar_niveis=True.
+    """
+    rng = criar_gerador(seed, gerador)
+
+    # Bloco de sorteios: 1 por dia + no máximo 1 por pedido (≤ 1 pedido/dia).
+    # As somas viram listas de int: bisect e aritmética escalar em Python são
+    # bem mais baratos por evento que escalares NumPy.
+    z = rng.standard_normal(2 * horizonte)
+    g = np.maximum(np.rint(demanda_media + demanda_desvio * z), 0).astype(np.int64)
+    S1 = [0] + list(accumulate(g.tolist()))
+    S2 = [0] + list(accumulate(S1))
+    z = z.tolist()
+
+    E = Q + ROP                     # estoque ao fim do último dia processado
+    dia = 0                         # próximo dia a processar
+    k = 0                           # pedidos emitidos (deslocamento no fluxo)
+    pedido_pendente = False
+    dia_chegada = -1
+
+    unidades_em_estoque_dia = 0
+    unidades_falta = 0
+    lead_times_list = []
+    dias_pedido = []
+    ciclos_total = 0
+    ciclos_sem_ruptura = 0
+    ruptura_no_ciclo = False
+
+    def emitir_pedido(t):
+        nonlocal k, pedido_pendente, dia_chegada
+        lt = max(1, round(lt_media + lt_desvio * z[t + k + 1]))
+        lead_times_list.append(lt)
+        dias_pedido.append(t)
+        k += 1
+        pedido_pendente = True
+        dia_chegada = t + lt
+
+    while dia < horizonte:
+        base = S1[dia + k]
+        if pedido_pendente:
+            # Intervalo até a véspera da chegada: só consumo
+            ultimo = min(dia_chegada, horizonte) - 1
+            u, f, E = _positivo_e_falta(S1, S2, base, E, dia + k, ultimo + k)
+            unidades_em_estoque_dia += u
+            unidades_falta += f
+            ruptura_no_ciclo |= f > 0
+            if dia_chegada >= horizonte:
+                break
+
+            # Dia da chegada: consome, recebe Q e fecha o ciclo
+            E = E - (S1[dia_chegada + k + 1] - S1[dia_chegada + k]) + Q
+            pedido_pendente = False
+            ciclos_total += 1
+            if not ruptura_no_ciclo:
+                ciclos_sem_ruptura += 1
+            ruptura_no_ciclo = E < 0
+            unidades_em_estoque_dia += max(E, 0)
+            unidades_falta += max(-E, 0)
+            dia = dia_chegada + 1
+            if E <= ROP:
+                emitir_pedido(dia_chegada)
+        else:
+            # Primeiro dia em que E - demanda acumulada ≤ ROP
+            j = bisect_left(S1, base + E - ROP, dia + k + 1)
+            t = min(j - k - 1, horizonte - 1)
+            u, f, E = _positivo_e_falta(S1, S2, base, E, dia + k, t + k)
+            unidades_em_estoque_dia += u
+            unidades_falta += f
+            ruptura_no_ciclo |= f > 0
+            dia = t + 1
+            if E <= ROP:
+                emitir_pedido(t)
+
+    if ciclos_total == 0:
+        ciclos_total = 1  # evitar divisão por zero
+
+    total_custo_pedido = len(lead_times_list) * custo_pedido
+    total_custo_manut = (unidades_em_estoque_dia / horizonte) * custo_manutencao
+    total_custo_falta = unidades_falta * custo_falta
+
+    resultado = {
+        "niveis": None,
+        "demandas": None,
+        "lead_times": lead_times_list,
+        "n_pedidos": len(lead_times_list),
+        "custo_pedido": total_custo_pedido,
+        "custo_manut": total_custo_manut,
+        "custo_falta": total_custo_falta,
+        "custo_total": total_custo_pedido + total_custo_manut + total_custo_falta,
+        "nivel_servico": ciclos_sem_ruptura / ciclos_total,
+    }
+    if guardar_niveis:
+        # Reconstrói a trajetória diária a partir dos eventos
+        dias = np.arange(horizonte)
+        deslocamento = np.searchsorted(np.asarray(dias_pedido, dtype=np.int64), dias, "left")
+        demandas = g[dias + deslocamento]
+        chegadas = np.asarray(dias_pedido, dtype=np.int64) + np.asarray(lead_times_list, dtype=np.int64)
+        recebido = Q * np.searchsorted(np.sort(chegadas), dias, "right")
+        resultado["demandas"] = demandas.astype(float)
+        resultado["niveis"] = (Q + ROP - np.cumsum(demandas) + recebido).astype(float)
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3d. MODO EM FLUXO (HORIZONTES LONGOS, MEMÓRIA CONSTANTE)
+# ══════════════════════════════════════════════════════════════════════════════
+TAMANHO_TRECHO = 512               # dias processados por vez no modo em fluxo
+BLOCO_REPLICACOES_FLUXO = 1024     # réplicas por vez no modo em fluxo
+
+
+class EstatisticasOnline:
+    """
+    Média/variância (Welford, combinando trechos pela fórmula de Chan),
+    mínimo, máximo e um histograma para quantis, atualizados por trechos.
+
+    O histograma usa caixas de largura `largura` (1 = quantis exatos para
+    valores inteiros, como níveis, demandas e lead times): a memória depende
+    da amplitude dos valores, não de quantos foram vistos.
+    """
+
+    def __init__(self, largura: float = 1.0):
+        self.largura = largura
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._contagens = np.zeros(0, dtype=np.int64)
+        self._caixa0 = 0
+
+    def atualizar(self, valores):
+        valores = np.asarray(valores, dtype=float).ravel()
+        n_b = len(valores)
+        if n_b == 0:
+            return
+        media_b = valores.mean()
+        m2_b = ((valores - media_b) ** 2).sum()
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self._m2 += m2_b + delta**2 * self.n * n_b / n
+        self.n = n
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+        caixas = np.floor(valores / self.largura).astype(np.int64)
+        c_min, c_max = caixas.min(), caixas.max()
+        if not len(self._contagens):
+            self._caixa0 = c_min
+        # Estende o histograma para os lados se chegaram valores novos
+        ini = min(self._caixa0, c_min)
+        fim = max(self._caixa0 + len(self._contagens), c_max + 1)
+        if ini != self._caixa0 or fim != self._caixa0 + len(self._contagens):
+            novas = np.zeros(fim - ini, dtype=np.int64)
+            desloc = self._caixa0 - ini
+            novas[desloc:desloc + len(self._contagens)] = self._contagens
+            self._contagens, self._caixa0 = novas, ini
+        self._contagens += np.bincount(caixas - self._caixa0, minlength=len(self._contagens))
+
+    @property
+    def variancia(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def quantil(self, p):
+        """Quantil p (escalar ou array) pelo histograma: limite inferior da caixa."""
+        acumulado = np.cumsum(self._contagens)
+        alvo = np.ceil(np.asarray(p) * self.n).clip(1, self.n)
+        return (self._caixa0 + np.searchsorted(acumulado, alvo)) * self.largura
+
+    def resumo(self) -> dict:
+        if self.n == 0:
+            return {"n": 0}
+        p05, p50, p95 = self.quantil([0.05, 0.50, 0.95])
+        return {
+            "n": self.n,
+            "media": self.media,
+            "desvio": np.sqrt(self.variancia),
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "p05": p05,
+            "p50": p50,
+            "p95": p95,
+        }
+
+
+def _repor_normais(z, coluna0, cursor, fluxos):
+    """
+    Descarta de cada linha de `z` os sorteios já consumidos (antes de
+    `cursor`) e completa a linha com a continuação do fluxo da réplica.
+    """
+    largura = z.shape[1]
+    for i, usados in enumerate((cursor - coluna0).tolist()):
+        if usados == 0:
+            continue
+        z[i, :largura - usados] = z[i, usados:]
+        z[i, largura - usados:] = fluxos.continuar(i, usados)
+    coluna0[:] = cursor
+
+
+def _amostrar_trajetoria(amostra, niveis, dia_ini, max_pontos):
+    """
+    Acrescenta os dias múltiplos do passo atual; se passar de `max_pontos`,
+    descarta um ponto a cada dois e dobra o passo (memória limitada).
+    """
+    dias = np.arange(dia_ini, dia_ini + niveis.shape[1])
+    sel = dias % amostra["passo"] == 0
+    amostra["dias"] = np.concatenate([amostra["dias"], dias[sel]])
+    amostra["niveis"] = np.concatenate([amostra["niveis"], niveis[:, sel]], axis=1)
+    while len(amostra["dias"]) > max_pontos:
+        amostra["passo"] *= 2
+        manter = amostra["dias"] % amostra["passo"] == 0
+        amostra["dias"] = amostra["dias"][manter]
+        amostra["niveis"] = amostra["niveis"][:, manter]
+
+
+def simular_estoque_fluxo(Q: int, ROP: int, n_replicacoes: int = 1,
+                          horizonte: int = HORIZONTE,
+                          demanda_media: float = DEMANDA_MEDIA,
+                          demanda_desvio: float = DEMANDA_DESVIO,
+                          lt_media: float = LEAD_TIME_MEDIO,
+                          lt_desvio: float = LEAD_TIME_DESVIO,
+                          custo_pedido: float = CUSTO_PEDIDO,
+                          custo_manutencao: float = CUSTO_MANUTENCAO,
+                          custo_falta: float = CUSTO_FALTA,
+                          seed: int | None = None,
+                          sementes=None,
+                          pontos_trajetoria: int | None = None,
+                          tamanho_trecho: int = TAMANHO_TRECHO,
+                          tamanho_bloco: int = BLOCO_REPLICACOES_FLUXO,
+                          saida: np.ndarray | None = None,
+                          demanda_externa=None,
+                          gerador: str = GERADOR_PADRAO,
+                          ao_trecho=None) -> dict:
+    """
+    Mesmo modelo de `simular_estoque_lote`, percorrendo o horizonte em
+    trechos de `tamanho_trecho` dias sem guardar a trajetória.
+
+    Cada réplica guarda só o estado do seu gerador e uma janela de
+    2·tamanho_trecho sorteios, então a memória não cresce com o horizonte.
+    Os resultados por réplica são idênticos aos de `simular_estoque_lote`
+    (e de `simular_estoque`) com as mesmas sementes.
+
+    Retorna as métricas por réplica de `simular_estoque_lote` (sem niveis)
+    e, agregados sobre todas as réplicas e dias:
+        - estatisticas: resumo (ver EstatisticasOnline.resumo) de "nivel",
+                        "demanda" e "lead_time"
+        - trajetoria  : {"dias", "niveis" (N, ≤ pontos_trajetoria)}, só se
+                        pontos_trajetoria for dado (passo dobra quando enche)
+
+    `saida` e `demanda_externa` funcionam como em simular_estoque_lote; da
+    demanda externa só o trecho de dias em andamento é lido. `ao_trecho`,
+    se dado, é chamado como ao_trecho(ini, dia_ini, niveis) a cada trecho,
+    com os níveis (n, dias do trecho) das réplicas ini, ini+1, ... — para
+    resumir a trajetória inteira sem guardá-la.
+    """
+    if sementes is None:
+        sementes = _sementes_replicacoes(n_replicacoes, seed, gerador)
+    sementes = como_sementes(sementes)
+    parametros = [Q, ROP, demanda_media, demanda_desvio, lt_media, lt_desvio,
+                  custo_pedido, custo_manutencao, custo_falta]
+
+    estatisticas = {"nivel": EstatisticasOnline(), "demanda": EstatisticasOnline(),
+                    "lead_time": EstatisticasOnline()}
+    largura = 2 * tamanho_trecho    # ≤ 1 sorteio de demanda + 1 de lead time por dia
+    blocos, amostras = [], []
+
+    for ini in range(0, len(sementes), tamanho_bloco):
+        fim = ini + tamanho_bloco
+        (Q_b, ROP_b, dm_b, dd_b, ltm_b, ltd_b, cp_b, cm_b, cf_b) = [
+            p[ini:fim] if np.ndim(p) else p for p in parametros]
+        sementes_b = sementes[ini:fim]
+        n = len(sementes_b)
+
+        # Janela inicial de sorteios e fluxo (continuável) de cada réplica
+        with instr.fase("sorteios"):
+            fluxos = FluxosNormais(sementes_b, gerador)
+            z = np.empty((n, largura))
+            for i in range(n):
+                z[i] = fluxos.continuar(i, largura)
+        coluna0 = np.zeros(n, dtype=np.int64)
+
+        estado = _estado_inicial(n, Q_b, ROP_b)
+        amostra = {"passo": 1, "dias": np.zeros(0, dtype=np.int64),
+                   "niveis": np.zeros((n, 0))}
+        for dia_ini in range(0, horizonte, tamanho_trecho):
+            dia_fim = min(dia_ini + tamanho_trecho, horizonte)
+            if dia_ini:
+                with instr.fase("sorteios"):
+                    _repor_normais(z, coluna0, dia_ini + estado["n_pedidos"], fluxos)
+            niveis = np.empty((n, dia_fim - dia_ini))
+            demandas = np.empty((n, dia_fim - dia_ini))
+            lead_times = []
+            externa = (None if demanda_externa is None else
+                       _trecho_demanda(demanda_externa, ini, ini + n, dia_ini, dia_fim))
+            with instr.fase("laco_diario"):
+                _avancar_dias(estado, Q_b, ROP_b, z, coluna0, dia_ini, dia_fim,
+                              dm_b, dd_b, ltm_b, ltd_b, cp_b, cf_b,
+                              niveis=niveis, demandas=demandas, lead_times=lead_times,
+                              demanda_externa=externa)
+
+            with instr.fase("estatisticas_online"):
+                estatisticas["nivel"].atualizar(niveis)
+                estatisticas["demanda"].atualizar(demandas)
+                if lead_times:
+                    estatisticas["lead_time"].atualizar(np.concatenate(lead_times))
+            if pontos_trajetoria:
+                _amostrar_trajetoria(amostra, niveis, dia_ini, pontos_trajetoria)
+            if ao_trecho is not None:
+                ao_trecho(ini, dia_ini, niveis)
+
+        with instr.fase("custos"):
+            bloco = _fechar_estado(estado, horizonte, cm_b)
+        if instr.ativo():
+            _contar_bloco(n, horizonte, bloco["n_pedidos"])
+        if saida is not None:
+            _gravar_bloco(saida, ini, bloco, sementes_b)
+            bloco = {}
+        blocos.append(bloco)
+        amostras.append(amostra)
+
+    if saida is not None:
+        resultado = {campo: saida[campo] for campo in CAMPOS_RESULTADO}
+    else:
+        resultado = {chave: np.concatenate([b[chave] for b in blocos]) for chave in blocos[0]}
+    resultado["sementes"] = rotulos_sementes(sementes)
+    resultado["resumo"] = resumir_replicacoes(resultado)
+    resultado["estatisticas"] = {nome: e.resumo() for nome, e in estatisticas.items()}
+    if pontos_trajetoria:
+        # Todos os blocos percorrem os mesmos dias, então o passo final é o mesmo
+        resultado["trajetoria"] = {
+            "dias": amostras[0]["dias"],
+            "niveis": np.concatenate([a["niveis"] for a in amostras]),
+        }
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3e. RESULTADOS COMPACTOS
+# ══════════════════════════════════════════════════════════════════════════════
+# Para guardar muitos resultados de uma vez: uma tabela colunar (array
+# estruturado) pré-alocada em vez de uma lista de dicionários de float64.
+# Com os tipos padrão cada réplica ocupa 32 bytes (1 milhão ≈ 30 MB).
+CAMPOS_RESULTADO = ("n_pedidos", "custo_pedido", "custo_manut", "custo_falta",
+                    "custo_total", "nivel_servico")
+
+
+def dtype_resultados(dtype_custo=np.float32, dtype_contagem=np.int32) -> np.dtype:
+    """Tipo de uma linha da tabela: semente, n_pedidos, custos e nível de serviço."""
+    return np.dtype([("semente", np.int64), ("n_pedidos", dtype_contagem)]
+                    + [(c, dtype_custo) for c in CAMPOS_RESULTADO[1:]])
+
+
+def tabela_resultados(forma, dtype_custo=np.float32, dtype_contagem=np.int32) -> np.ndarray:
+    """Tabela zerada de resultados por réplica (forma N ou (pontos, N))."""
+    return np.zeros(forma, dtype=dtype_resultados(dtype_custo, dtype_contagem))
+
+
+def _gravar_bloco(saida: np.ndarray, ini: int, bloco: dict, sementes):
+    fim = ini + len(sementes)
+    saida["semente"][ini:fim] = rotulos_sementes(sementes)
+    for campo in CAMPOS_RESULTADO:
+        saida[campo][ini:fim] = bloco[campo]
+
+
+class ResultadoSimulacao:
+    """
+    Resultado de uma trajetória com tipos compactos (ver compactar_resultado).
+
+    Aceita acesso por chave (`res["custo_total"]`) como o dicionário de
+    simular_estoque, então pode substituí-lo em quem só lê o resultado.
+    """
+
+    __slots__ = ("n_pedidos", "custo_pedido", "custo_manut", "custo_falta",
+                 "custo_total", "nivel_servico", "niveis", "demandas", "lead_times")
+
+    def __init__(self, **campos):
+        for nome in self.__slots__:
+            setattr(self, nome, campos.get(nome))
+
+    def __getitem__(self, chave):
+        try:
+            return getattr(self, chave)
+        except AttributeError:
+            raise KeyError(chave) from None
+
+    def __repr__(self):
+        return (f"ResultadoSimulacao(custo_total={self.custo_total:.2f}, "
+                f"nivel_servico={self.nivel_servico:.4f}, n_pedidos={self.n_pedidos})")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes das trajetórias guardadas (os escalares são desprezíveis)."""
+        return sum(getattr(self, c).nbytes for c in ("niveis", "demandas", "lead_times")
+                   if getattr(self, c) is not None)
+
+
+def compactar_resultado(resultado: dict, guardar_trajetoria: bool = True,
+                        dtype_nivel=np.int32, dtype_custo=np.float32) -> ResultadoSimulacao:
+    """
+    Converte o dicionário de simular_estoque/simular_estoque_eventos: níveis,
+    demandas e lead times em inteiros de `dtype_nivel` (os motores só
+    produzem valores inteiros), custos em `dtype_custo`. Sem
+    guardar_trajetoria ficam só as métricas.
+    """
+    def trajetoria(chave):
+        valores = resultado.get(chave)
+        if not guardar_trajetoria or valores is None:
+            return None
+        return np.asarray(valores).astype(dtype_nivel)
+
+    lead_times = trajetoria("lead_times")
+    n_pedidos = resultado.get("n_pedidos", len(resultado["lead_times"]))
+    return ResultadoSimulacao(
+        n_pedidos=int(n_pedidos),
+        nivel_servico=dtype_custo(resultado["nivel_servico"]),
+        niveis=trajetoria("niveis"),
+        demandas=trajetoria("demandas"),
+        lead_times=lead_times,
+        **{c: dtype_custo(resultado[c])
+           for c in ("custo_pedido", "custo_manut", "custo_falta", "custo_total")},
+    )
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Otimização da política (Q, ROP) por simulação.
+
+  • Minimiza o custo total esperado de simular_estoque, opcionalmente com
+    um nível de serviço mínimo (fração de ciclos sem ruptura)
+  • Números aleatórios comuns: todas as políticas candidatas de um SKU são
+    avaliadas sobre as mesmas N trajetórias de demanda e lead time, então
+    poucas réplicas já bastam para ordenar candidatos próximos
+  • Busca por padrões (Hooke-Jeeves) na grade inteira (Q, ROP), partindo do
+    ótimo da avaliação analítica (analitico_estoque) ou do EOQ e do ROP do
+    cenário B, e reduzindo o passo pela metade quando nenhum vizinho melhora
+  • Vizinhos que a avaliação analítica marca como instáveis (Q abaixo da
+    demanda do lead time) não são simulados
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analitico_estoque import avaliar_politicas, otimizar_analitico
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    NIVEL_SERVICO_ALVO, calcular_parametros_lote, normais_replicacoes,
+    simular_politicas,
+)
+
+REPLICACOES_OTIMIZACAO = 200       # trajetórias comuns por SKU
+MAX_AVALIACOES = 300               # políticas simuladas por SKU, no máximo
+
+
+def _chave_ordenacao(avaliacao: dict, nivel_servico_min: float | None):
+    """
+    Ordem de preferência: políticas viáveis primeiro (menor custo); entre as
+    inviáveis, a que fica mais perto do nível de serviço mínimo.
+    """
+    if nivel_servico_min is None:
+        return (0, avaliacao["custo_total"])
+    deficit = nivel_servico_min - avaliacao["nivel_servico"]
+    if deficit <= 0:
+        return (0, avaliacao["custo_total"])
+    return (1, deficit)
+
+
+def otimizar_politica(demanda_media: float = DEMANDA_MEDIA,
+                      demanda_desvio: float = DEMANDA_DESVIO,
+                      lt_media: float = LEAD_TIME_MEDIO,
+                      lt_desvio: float = LEAD_TIME_DESVIO,
+                      custo_pedido: float = CUSTO_PEDIDO,
+                      custo_manutencao: float = CUSTO_MANUTENCAO,
+                      custo_falta: float = CUSTO_FALTA,
+                      nivel_servico_min: float | None = None,
+                      n_replicacoes: int = REPLICACOES_OTIMIZACAO,
+                      horizonte: int = HORIZONTE,
+                      seed: int | None = SEED, sementes=None,
+                      Q0: int | None = None, ROP0: int | None = None,
+                      partida: str = "analitica",
+                      max_avaliacoes: int = MAX_AVALIACOES) -> dict:
+    """
+    Busca o (Q, ROP) de menor custo total médio nas trajetórias comuns.
+
+    Sem Q0/ROP0 parte do ótimo da avaliação analítica (partida="analitica")
+    ou do EOQ e do ROP_B da fórmula (partida="formula"), com o nível de
+    serviço mínimo como alvo (ou NIVEL_SERVICO_ALVO). Retorna dicionário com
+    a política ótima (Q, ROP, custo_total, erro_padrao, nivel_servico), a
+    inicial (Q0, ROP0, custo_inicial, servico_inicial), n_avaliacoes e o
+    historico de centros visitados.
+    """
+    parametros = dict(horizonte=horizonte, demanda_media=demanda_media,
+                      demanda_desvio=demanda_desvio, lt_media=lt_media,
+                      lt_desvio=lt_desvio, custo_pedido=custo_pedido,
+                      custo_manutencao=custo_manutencao, custo_falta=custo_falta)
+    if partida == "analitica":
+        inicio = otimizar_analitico(nivel_servico_min=nivel_servico_min, **parametros)
+        Q_ini, ROP_ini = inicio["Q"], inicio["ROP"]
+    elif partida == "formula":
+        formula = calcular_parametros_lote(
+            demanda_media, demanda_desvio, lt_media, lt_desvio, custo_pedido,
+            custo_manutencao, nivel_servico_min or NIVEL_SERVICO_ALVO,
+            horizonte=horizonte)
+        Q_ini, ROP_ini = max(1, int(formula["EOQ"])), int(formula["ROP_B"])
+    else:
+        raise ValueError("partida deve ser 'analitica' ou 'formula'")
+    Q0 = Q_ini if Q0 is None else int(Q0)
+    ROP0 = ROP_ini if ROP0 is None else int(ROP0)
+
+    if sementes is None:
+        sementes = (seed if seed is not None else 0) + np.arange(n_replicacoes)
+    z = normais_replicacoes(sementes, 2 * horizonte)
+
+    avaliadas = {}
+
+    def avaliar(politicas):
+        # Triagem: políticas instáveis pela avaliação analítica não são simuladas
+        if len(politicas) > 1:
+            estavel = avaliar_politicas([q for q, _ in politicas], [r for _, r in politicas],
+                                        **parametros)["estavel"]
+            politicas = [p for p, ok in zip(politicas, estavel) if ok] or politicas[:1]
+        novas = [p for p in dict.fromkeys(politicas) if p not in avaliadas]
+        if novas:
+            res = simular_politicas([q for q, _ in novas], [r for _, r in novas],
+                                    z, **parametros)
+            for k, p in enumerate(novas):
+                ct = res["custo_total"][k]
+                avaliadas[p] = {
+                    "custo_total": ct.mean(),
+                    "erro_padrao": ct.std(ddof=1) / np.sqrt(len(ct)) if len(ct) > 1 else 0.0,
+                    "nivel_servico": res["nivel_servico"][k].mean(),
+                }
+        return min(politicas, key=lambda p: _chave_ordenacao(avaliadas[p], nivel_servico_min))
+
+    # Passos iniciais: ¼ do lote e 1 desvio da demanda no lead time
+    passo_Q = max(1, Q0 // 4)
+    passo_ROP = max(1, int(round(np.sqrt(lt_media * demanda_desvio**2
+                                         + demanda_media**2 * lt_desvio**2))))
+    centro = avaliar([(Q0, ROP0)])
+    historico = [centro]
+
+    while (passo_Q or passo_ROP) and len(avaliadas) < max_avaliacoes:
+        q, r = centro
+        vizinhos = [(q, r)]
+        if passo_Q:
+            vizinhos += [(q + passo_Q, r), (max(1, q - passo_Q), r)]
+        if passo_ROP:
+            vizinhos += [(q, r + passo_ROP), (q, max(0, r - passo_ROP))]
+        melhor = avaliar(vizinhos)
+
+        if melhor != centro:
+            # Passo exploratório: insistir na direção que melhorou
+            dq, dr = melhor[0] - q, melhor[1] - r
+            alem = (max(1, melhor[0] + dq), max(0, melhor[1] + dr))
+            centro = avaliar([melhor, alem])
+            historico.append(centro)
+        else:
+            passo_Q //= 2
+            passo_ROP //= 2
+
+    otimo = avaliadas[centro]
+    inicial = avaliadas[(Q0, ROP0)]
+    return {
+        "Q": centro[0],
+        "ROP": centro[1],
+        "custo_total": otimo["custo_total"],
+        "erro_padrao": otimo["erro_padrao"],
+        "nivel_servico": otimo["nivel_servico"],
+        "viavel": _chave_ordenacao(otimo, nivel_servico_min)[0] == 0,
+        "Q0": Q0,
+        "ROP0": ROP0,
+        "custo_inicial": inicial["custo_total"],
+        "servico_inicial": inicial["nivel_servico"],
+        "n_avaliacoes": len(avaliadas),
+        "historico": historico,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PORTFÓLIO: UM PROBLEMA DE OTIMIZAÇÃO POR SKU, EM PARALELO
+# ══════════════════════════════════════════════════════════════════════════════
+def _otimizar_sku(argumentos):
+    sku, parametros, sementes, opcoes = argumentos
+    res = otimizar_politica(**parametros, sementes=sementes, **opcoes)
+    res.pop("historico")
+    return {"sku": sku, **res}
+
+
+def otimizar_portfolio(portfolio, nivel_servico_min: float | None = None,
+                       n_replicacoes: int = REPLICACOES_OTIMIZACAO,
+                       horizonte: int = HORIZONTE, seed: int | None = SEED,
+                       n_processos: int | None = None,
+                       max_avaliacoes: int = MAX_AVALIACOES):
+    """
+    Otimiza cada SKU de um portfólio (ver portfolio_estoque.preparar_portfolio)
+    num pool de processos. Cada SKU tem seu próprio fluxo aleatório
+    (SeedSequence), comum a todos os seus candidatos. Retorna um DataFrame.
+    """
+    import pandas as pd
+    from varredura_estoque import sementes_dos_pontos
+
+    colunas = ("demanda_media", "demanda_desvio", "lt_media", "lt_desvio",
+               "custo_pedido", "custo_manutencao", "custo_falta")
+    opcoes = dict(nivel_servico_min=nivel_servico_min, horizonte=horizonte,
+                  max_avaliacoes=max_avaliacoes)
+    sementes = sementes_dos_pontos(len(portfolio), n_replicacoes, seed)
+    tarefas = [(linha.sku, {c: float(getattr(linha, c)) for c in colunas}, s, opcoes)
+               for linha, s in zip(portfolio.itertuples(index=False), sementes)]
+
+    if n_processos == 1:
+        linhas = list(map(_otimizar_sku, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos or os.cpu_count()) as pool:
+            linhas = list(pool.map(_otimizar_sku, tarefas, chunksize=8))
+    return pd.DataFrame(linhas)
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Políticas de reposição intercambiáveis, avaliadas em lote.
+
+  • Uma política decide, a cada dia de revisão, quanto pedir para cada
+    réplica a partir do estoque físico e da posição de estoque (físico +
+    em trânsito); o motor cuida de demanda, chegadas, custos e ciclos
+  • Núcleos vetorizados: (Q, ROP) contínua com um pedido por vez (a regra
+    de simular_estoque), (s, S), revisão periódica (R, S) e estoque base
+  • Mais de um pedido pode estar em trânsito: os pedidos pendentes ficam
+    em arrays (réplicas × vagas) que crescem quando necessário
+  • Políticas periódicas só são consultadas nos dias de revisão
+  • comparar_politicas passa todas as políticas pelas mesmas matrizes de
+    sorteios (normais_replicacoes), como simular_politicas: números
+    aleatórios comuns, na mesma convenção do fluxo do núcleo (o dia t usa o
+    sorteio t + pedidos já emitidos, o lead time o seguinte)
+"""
+
+import copy
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from aleatorio_estoque import como_sementes, rotulos_sementes
+from nucleo_estoque import (
+    HORIZONTE, N_REPLICACOES, TAMANHO_BLOCO_REPLICACOES, DEMANDA_MEDIA,
+    DEMANDA_DESVIO, LEAD_TIME_MEDIO, LEAD_TIME_DESVIO, CUSTO_PEDIDO,
+    CUSTO_MANUTENCAO, CUSTO_FALTA, NIVEL_SERVICO_ALVO, quantil_normal,
+    calcular_parametros_lote, normais_replicacoes, resumir_replicacoes,
+    _sementes_replicacoes, _fechar_estado, _contar_bloco, GERADOR_PADRAO,
+)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. INTERFACE E NÚCLEOS
+# ══════════════════════════════════════════════════════════════════════════════
+class Politica(ABC):
+    """
+    Interface das políticas. Subclasses definem `estoque_inicial` e
+    `pedidos` (abstratos: sem eles a subclasse não é instanciável); os parâmetros (escalares ou arrays (N,), um valor por réplica)
+    ficam em `self.parametros`.
+
+    Atributos de classe:
+        periodo, fase : consulta só nos dias com dia % periodo == fase
+        um_pedido     : True = não pede com pedido em trânsito
+    """
+    periodo = 1
+    fase = 0
+    um_pedido = False
+
+    def __init__(self, **parametros):
+        self.parametros = {k: np.asarray(v, dtype=np.int64) for k, v in parametros.items()}
+
+    def __repr__(self):
+        valores = [f"{k}={v.tolist() if v.ndim == 0 else '...'}"
+                   for k, v in self.parametros.items()]
+        if self.periodo != 1:
+            valores.insert(0, f"R={self.periodo}")
+        valores = ", ".join(valores)
+        return f"{type(self).__name__}({valores})"
+
+    def bloco(self, ini: int, fim: int) -> "Politica":
+        """A mesma política restrita às réplicas ini:fim."""
+        parte = copy.copy(self)
+        parte.parametros = {k: v[ini:fim] if v.ndim else v for k, v in self.parametros.items()}
+        return parte
+
+    def revisa(self, dia: int) -> bool:
+        return dia % self.periodo == self.fase
+
+    @abstractmethod
+    def estoque_inicial(self) -> np.ndarray:
+        """Estoque no dia 0 por réplica (escalar ou array (N,))."""
+
+    @abstractmethod
+    def pedidos(self, estoque: np.ndarray, posicao: np.ndarray,
+                pendentes: np.ndarray) -> np.ndarray:
+        """Quantidade pedida por réplica (0 = não pede), arrays (N,)."""
+
+
+class PoliticaQROP(Politica):
+    """(Q, ROP) contínua com um pedido por vez: a regra de simular_estoque."""
+    um_pedido = True
+
+    def __init__(self, Q, ROP):
+        super().__init__(Q=Q, ROP=ROP)
+
+    def estoque_inicial(self):
+        return self.parametros["Q"] + self.parametros["ROP"]
+
+    def pedidos(self, estoque, posicao, pendentes):
+        p = self.parametros
+        return np.where((pendentes == 0) & (posicao <= p["ROP"]), p["Q"], 0)
+
+
+class PoliticaSS(Politica):
+    """(s, S) contínua: posição ≤ s → pede até S."""
+
+    def __init__(self, s, S):
+        super().__init__(s=s, S=S)
+
+    def estoque_inicial(self):
+        return self.parametros["S"]
+
+    def pedidos(self, estoque, posicao, pendentes):
+        p = self.parametros
+        return np.where(posicao <= p["s"], p["S"] - posicao, 0)
+
+
+class PoliticaRevisaoPeriodica(Politica):
+    """(R, S): a cada R dias pede o que falta para a posição chegar a S."""
+
+    def __init__(self, R: int, S, fase: int = 0):
+        super().__init__(S=S)
+        self.periodo = int(R)
+        self.fase = int(fase) % self.periodo
+
+    def estoque_inicial(self):
+        return self.parametros["S"]
+
+    def pedidos(self, estoque, posicao, pendentes):
+        return np.maximum(self.parametros["S"] - posicao, 0)
+
+
+class PoliticaEstoqueBase(PoliticaRevisaoPeriodica):
+    """Estoque base: repõe todo dia o consumo, mantendo a posição em S."""
+
+    def __init__(self, S):
+        super().__init__(1, S)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. MOTOR
+# ══════════════════════════════════════════════════════════════════════════════
+def _avancar_politica(politica: Politica, z, horizonte, demanda_media,
+                      demanda_desvio, lt_media, lt_desvio, custo_pedido,
+                      custo_falta) -> dict:
+    """
+    Percorre o horizonte para as réplicas de `z` (linhas) e devolve o estado
+    final no formato de _fechar_estado. Mesma ordem do laço de
+    simular_estoque: demanda, chegadas, falta, manutenção e pedido.
+    """
+    n = z.shape[0]
+    linhas = np.arange(n)
+    estoque = np.broadcast_to(politica.estoque_inicial(), (n,)).astype(np.int64)
+    vagas = 1 if politica.um_pedido else 4
+    chegada = np.zeros((n, vagas), dtype=np.int64)
+    pendente = np.zeros((n, vagas), dtype=np.int64)     # quantidade em trânsito (0 = vaga livre)
+    em_transito = np.zeros(n, dtype=np.int64)
+    n_pendentes = np.zeros(n, dtype=np.int64)
+    ruptura_no_ciclo = np.zeros(n, dtype=bool)
+    estado = {
+        "n_pedidos": np.zeros(n, dtype=np.int64),
+        "ciclos_total": np.zeros(n, dtype=np.int64),
+        "ciclos_sem_ruptura": np.zeros(n, dtype=np.int64),
+        "unidades_em_estoque_dia": np.zeros(n, dtype=np.int64),
+        "total_custo_pedido": np.zeros(n),
+        "total_custo_falta": np.zeros(n),
+    }
+    n_pedidos = estado["n_pedidos"]
+
+    for dia in range(horizonte):
+        cursor = dia + n_pedidos
+        d = np.maximum(np.rint(demanda_media + demanda_desvio * z[linhas, cursor]), 0)
+        estoque -= d.astype(np.int64)
+
+        # Chegadas: cada dia com chegada fecha um ciclo
+        if n_pendentes.any():
+            chegou = (pendente > 0) & (chegada <= dia)
+            recebido = np.where(chegou, pendente, 0).sum(axis=1)
+            pendente[chegou] = 0
+            fechou = chegou.any(axis=1)
+            estoque += recebido
+            em_transito -= recebido
+            n_pendentes -= chegou.sum(axis=1)
+            estado["ciclos_total"] += fechou
+            estado["ciclos_sem_ruptura"] += fechou & ~ruptura_no_ciclo
+            ruptura_no_ciclo &= ~fechou
+
+        falta = estoque < 0
+        estado["total_custo_falta"] += np.where(falta, -estoque * custo_falta, 0.0)
+        ruptura_no_ciclo |= falta
+        estado["unidades_em_estoque_dia"] += np.maximum(estoque, 0)
+
+        if not politica.revisa(dia):
+            continue
+        qtd = politica.pedidos(estoque, estoque + em_transito, n_pendentes)
+        pedir = qtd > 0
+        if not pedir.any():
+            continue
+
+        lt = np.maximum(1, np.rint(lt_media + lt_desvio * z[linhas, cursor + 1])).astype(np.int64)
+        livre = pendente == 0
+        if not livre[pedir].any(axis=1).all():
+            # Todas as vagas ocupadas em alguma réplica: dobra o número de vagas
+            pendente = np.hstack([pendente, np.zeros_like(pendente)])
+            chegada = np.hstack([chegada, np.zeros_like(chegada)])
+            livre = pendente == 0
+        quem = np.flatnonzero(pedir)
+        vaga = livre[quem].argmax(axis=1)
+        pendente[quem, vaga] = qtd[quem]
+        chegada[quem, vaga] = dia + lt[quem]
+        em_transito += np.where(pedir, qtd, 0)
+        n_pendentes += pedir
+        n_pedidos += pedir
+        estado["total_custo_pedido"] += np.where(pedir, custo_pedido, 0.0)
+
+    return estado
+
+
+def comparar_politicas(politicas: dict, n_replicacoes: int = N_REPLICACOES,
+                       horizonte: int = HORIZONTE,
+                       demanda_media: float = DEMANDA_MEDIA,
+                       demanda_desvio: float = DEMANDA_DESVIO,
+                       lt_media: float = LEAD_TIME_MEDIO,
+                       lt_desvio: float = LEAD_TIME_DESVIO,
+                       custo_pedido: float = CUSTO_PEDIDO,
+                       custo_manutencao: float = CUSTO_MANUTENCAO,
+                       custo_falta: float = CUSTO_FALTA,
+                       seed: int | None = None, sementes=None,
+                       tamanho_bloco: int = TAMANHO_BLOCO_REPLICACOES,
+                       gerador: str = GERADOR_PADRAO) -> dict:
+    """
+    Simula cada política de {nome: Politica} nas mesmas N réplicas: cada
+    bloco de sorteios é gerado uma vez e passado a todas as políticas.
+
+    Retorna {nome: resultado}, cada resultado com as métricas por réplica de
+    simular_estoque_lote (custo_*, nivel_servico, n_pedidos), sementes e
+    resumo. Parâmetros de demanda, lead time e custo são escalares.
+    PoliticaQROP reproduz exatamente simular_estoque_lote (mesmo `gerador`).
+    """
+    if sementes is None:
+        sementes = _sementes_replicacoes(n_replicacoes, seed, gerador)
+    sementes = como_sementes(sementes)
+
+    blocos = {nome: [] for nome in politicas}
+    for ini in range(0, len(sementes), tamanho_bloco):
+        fim = ini + tamanho_bloco
+        z = normais_replicacoes(sementes[ini:fim], 2 * horizonte, gerador)
+        for nome, politica in politicas.items():
+            with instr.fase("laco_diario"):
+                estado = _avancar_politica(politica.bloco(ini, fim), z, horizonte,
+                                           demanda_media, demanda_desvio, lt_media,
+                                           lt_desvio, custo_pedido, custo_falta)
+            with instr.fase("custos"):
+                blocos[nome].append(_fechar_estado(estado, horizonte, custo_manutencao))
+            if instr.ativo():
+                _contar_bloco(len(z), horizonte, estado["n_pedidos"])
+
+    resultados = {}
+    for nome, partes in blocos.items():
+        resultado = {chave: np.concatenate([p[chave] for p in partes]) for chave in partes[0]}
+        resultado["sementes"] = rotulos_sementes(sementes)
+        resultado["resumo"] = resumir_replicacoes(resultado)
+        resultados[nome] = resultado
+    return resultados
+
+
+def simular_politica(politica: Politica, **kwargs) -> dict:
+    """Uma política só (argumentos de comparar_politicas)."""
+    return comparar_politicas({"politica": politica}, **kwargs)["politica"]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. PARÂMETROS PELAS FÓRMULAS CLÁSSICAS
+# ══════════════════════════════════════════════════════════════════════════════
+def politicas_padrao(demanda_media: float = DEMANDA_MEDIA,
+                     demanda_desvio: float = DEMANDA_DESVIO,
+                     lt_media: float = LEAD_TIME_MEDIO,
+                     lt_desvio: float = LEAD_TIME_DESVIO,
+                     custo_pedido: float = CUSTO_PEDIDO,
+                     custo_manutencao: float = CUSTO_MANUTENCAO,
+                     nivel_servico: float = NIVEL_SERVICO_ALVO,
+                     horizonte: int = HORIZONTE) -> dict:
+    """
+    As quatro políticas com parâmetros das fórmulas da seção 2:
+        - (Q, ROP)  : EOQ e ROP_B
+        - (s, S)    : s = ROP_B, S = ROP_B + EOQ
+        - (R, S)    : R = EOQ / demanda (dias entre pedidos), S cobre R + L
+        - base      : S cobre 1 + L dias (revisão diária)
+    com o estoque de segurança z·σ do período protegido em cada caso.
+    """
+    formula = calcular_parametros_lote(demanda_media, demanda_desvio, lt_media,
+                                       lt_desvio, custo_pedido, custo_manutencao,
+                                       nivel_servico, horizonte=horizonte)
+    eoq, rop = int(formula["EOQ"]), int(formula["ROP_B"])
+    z = quantil_normal(nivel_servico)
+
+    def nivel_ate(periodo):
+        # Demanda média + z·σ durante `periodo` + lead time
+        protegido = periodo + lt_media
+        sigma = np.sqrt(protegido * demanda_desvio**2 + demanda_media**2 * lt_desvio**2)
+        return int(round(demanda_media * protegido + max(0.0, z * sigma)))
+
+    R = max(1, int(round(eoq / demanda_media)))
+    return {
+        "(Q, ROP)": PoliticaQROP(eoq, rop),
+        "(s, S)": PoliticaSS(rop, rop + eoq),
+        f"(R={R}, S)": PoliticaRevisaoPeriodica(R, nivel_ate(R)),
+        "estoque base": PoliticaEstoqueBase(nivel_ate(1)),
+    }
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Simulação de portfólio: a mesma política (Q, ROP) de simulacaoestoque.py
+aplicada a muitos SKUs de uma vez.
+
+  • Parâmetros por SKU vêm de arrays ou de um CSV/Parquet
+  • EOQ, SS e ROP são calculados para todos os SKUs num único passo
+  • Os SKUs são simulados juntos em arrays contíguos, em blocos de tamanho
+    configurável (a memória depende do bloco, não do catálogo)
+
+Uso:
+    python portfolio_estoque.py skus.csv --saida resultados.csv --bloco 2048
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from nucleo_estoque import (
+    HORIZONTE, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA, NIVEL_SERVICO_ALVO,
+    calcular_parametros_lote, simular_estoque_lote,
+)
+
+# Colunas esperadas no arquivo de entrada (uma linha por SKU)
+COLUNAS_OBRIGATORIAS = ("demanda_media", "demanda_desvio", "lt_media", "lt_desvio")
+COLUNAS_OPCIONAIS = {
+    "custo_pedido": CUSTO_PEDIDO,
+    "custo_manutencao": CUSTO_MANUTENCAO,
+    "custo_falta": CUSTO_FALTA,
+    "nivel_servico": NIVEL_SERVICO_ALVO,
+}
+
+TAMANHO_BLOCO_SKUS = 2048          # SKUs × réplicas simulados por vez
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. ENTRADA DO PORTFÓLIO
+# ══════════════════════════════════════════════════════════════════════════════
+def preparar_portfolio(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Valida as colunas, completa custos/nível de serviço ausentes com os
+    valores globais e garante uma coluna `sku`.
+    """
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no portfólio: {faltando}")
+
+    df = df.copy()
+    for coluna, padrao in COLUNAS_OPCIONAIS.items():
+        if coluna not in df.columns:
+            df[coluna] = padrao
+    if "sku" not in df.columns:
+        df.insert(0, "sku", np.arange(len(df)))
+    return df.reset_index(drop=True)
+
+
+def carregar_portfolio(caminho: str) -> pd.DataFrame:
+    """Lê o portfólio de um CSV ou Parquet (pela extensão do arquivo)."""
+    if os.path.splitext(caminho)[1].lower() == ".parquet":
+        df = pd.read_parquet(caminho)
+    else:
+        df = pd.read_csv(caminho)
+    return preparar_portfolio(df)
+
+
+def montar_portfolio(demanda_media, demanda_desvio, lt_media, lt_desvio,
+                     sku=None, **opcionais) -> pd.DataFrame:
+    """Monta o portfólio a partir de arrays por SKU (custos opcionais)."""
+    df = pd.DataFrame({
+        "demanda_media": np.asarray(demanda_media, dtype=float),
+        "demanda_desvio": np.asarray(demanda_desvio, dtype=float),
+        "lt_media": np.asarray(lt_media, dtype=float),
+        "lt_desvio": np.asarray(lt_desvio, dtype=float),
+        **{c: opcionais[c] for c in COLUNAS_OPCIONAIS if c in opcionais},
+    })
+    if sku is not None:
+        df.insert(0, "sku", sku)
+    return preparar_portfolio(df)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. SIMULAÇÃO EM BLOCOS
+# ══════════════════════════════════════════════════════════════════════════════
+def simular_portfolio_em_blocos(portfolio: pd.DataFrame, n_replicacoes: int = 1,
+                                horizonte: int = HORIZONTE, cenario: str = "B",
+                                seed: int | None = None,
+                                tamanho_bloco: int = TAMANHO_BLOCO_SKUS):
+    """
+    Gera uma tabela de resultados por bloco de SKUs.
+
+    O SKU i, réplica r, usa a semente seed + i·n_replicacoes + r, então o
+    resultado não depende do tamanho do bloco. `cenario` escolhe o ROP
+    simulado: "A" (sem SS) ou "B" (com SS).
+    """
+    if cenario not in ("A", "B"):
+        raise ValueError("cenario deve ser 'A' ou 'B'")
+    if seed is None:
+        seed = int(np.random.RandomState().randint(0, 2**31 - 1))
+
+    skus_por_bloco = max(1, tamanho_bloco // n_replicacoes)
+    for ini in range(0, len(portfolio), skus_por_bloco):
+        bloco = portfolio.iloc[ini:ini + skus_por_bloco]
+        n = len(bloco)
+        col = {c: bloco[c].to_numpy() for c in bloco.columns}
+
+        params = calcular_parametros_lote(
+            col["demanda_media"], col["demanda_desvio"],
+            col["lt_media"], col["lt_desvio"],
+            col["custo_pedido"], col["custo_manutencao"], col["nivel_servico"],
+            horizonte=horizonte)
+        rop = params["ROP_A"] if cenario == "A" else params["ROP_B"]
+
+        # Uma linha por (SKU, réplica): repete os parâmetros de cada SKU
+        def rep(v):
+            return np.repeat(v, n_replicacoes)
+
+        primeira = seed + ini * n_replicacoes
+        sementes = primeira + np.arange(n * n_replicacoes, dtype=np.int64)
+        res = simular_estoque_lote(
+            rep(params["EOQ"]), rep(rop), horizonte=horizonte,
+            demanda_media=rep(col["demanda_media"]),
+            demanda_desvio=rep(col["demanda_desvio"]),
+            lt_media=rep(col["lt_media"]), lt_desvio=rep(col["lt_desvio"]),
+            custo_pedido=rep(col["custo_pedido"]),
+            custo_manutencao=rep(col["custo_manutencao"]),
+            custo_falta=rep(col["custo_falta"]),
+            sementes=sementes, tamanho_bloco=len(sementes))
+
+        def por_sku(chave):
+            return res[chave].reshape(n, n_replicacoes)
+
+        tabela = pd.DataFrame({
+            "sku": col["sku"],
+            "EOQ": params["EOQ"],
+            "SS": params["SS"],
+            "ROP": rop,
+            "pedidos": por_sku("n_pedidos").mean(axis=1),
+            "custo_pedido": por_sku("custo_pedido").mean(axis=1),
+            "custo_manut": por_sku("custo_manut").mean(axis=1),
+            "custo_falta": por_sku("custo_falta").mean(axis=1),
+            "custo_total": por_sku("custo_total").mean(axis=1),
+            "nivel_servico": por_sku("nivel_servico").mean(axis=1),
+        })
+        if n_replicacoes > 1:
+            tabela["custo_total_desvio"] = por_sku("custo_total").std(axis=1, ddof=1)
+        yield tabela
+
+
+def simular_portfolio(portfolio: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """Simula o portfólio inteiro e devolve uma linha de resultados por SKU."""
+    return pd.concat(list(simular_portfolio_em_blocos(portfolio, **kwargs)),
+                     ignore_index=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. LINHA DE COMANDO
+# ══════════════════════════════════════════════════════════════════════════════
+def main():
+    parser = argparse.ArgumentParser(description="Simula a política (Q, ROP) para um portfólio de SKUs.")
+    parser.add_argument("entrada", help="CSV ou Parquet com uma linha por SKU")
+    parser.add_argument("--saida", default="resultados_portfolio.csv",
+                        help="CSV de resultados (escrito bloco a bloco)")
+    parser.add_argument("--replicacoes", type=int, default=1)
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE)
+    parser.add_argument("--cenario", choices=("A", "B"), default="B")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_SKUS,
+                        help="SKUs x replicas simulados por vez")
+    args = parser.parse_args()
+
+    portfolio = carregar_portfolio(args.entrada)
+    print(f"Simulando {len(portfolio)} SKUs (cenario {args.cenario}, "
+          f"{args.replicacoes} replica(s) por SKU)...")
+
+    # Cada bloco vai direto para o disco: só um bloco de resultados fica em memória
+    blocos = simular_portfolio_em_blocos(
+        portfolio, n_replicacoes=args.replicacoes, horizonte=args.horizonte,
+        cenario=args.cenario, seed=args.seed, tamanho_bloco=args.bloco)
+    for i, tabela in enumerate(blocos):
+        tabela.to_csv(args.saida, mode="w" if i == 0 else "a",
+                      header=(i == 0), index=False)
+    print(f"Resultados salvos em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
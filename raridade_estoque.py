@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Estimação de rupturas raras por amostragem por importância.
+
+  • Com níveis de serviço de 99% ou mais, rupturas são raras e a média
+    simples de Monte Carlo de nivel_servico e custo_falta precisa de
+    muitas réplicas para estabilizar
+  • Em cada réplica, um ciclo K (ciclos 0..M−1 repartidos entre as
+    réplicas) tem o sorteio do lead time e os de demanda com o pedido em
+    trânsito deslocados para N(θ, 1) — a inclinação exponencial da normal —
+    o que torna a ruptura desse ciclo frequente. A razão de verossimilhança
+    w = Π φ(x) / φ(x − θ) envolve só os sorteios dessa janela; inclinando
+    o ano inteiro ela degenera antes de as rupturas ficarem frequentes
+  • Estimadores não viesados por réplica: w·(M·X_K + Σ_{j≥M} X_j), com X_j a
+    ruptura ou o custo de falta do ciclo j (a cauda j ≥ M é somada sem
+    inclinação, então nenhum ciclo fica de fora)
+  • Estratos: o número de réplicas é arredondado para um múltiplo de M
+    (cada ciclo alvo K recebe o mesmo número de réplicas, no mínimo 2); a
+    média de cada estrato entra com peso 1/M e a variância é a do
+    estimador estratificado, Σ_K s²_K / (M² n_K)
+  • O relatório traz média, variância, IC 95% e tamanho efetivo da amostra
+    (ESS) de cada estimativa, além do ESS de Kish dos próprios pesos da
+    razão de verossimilhança; comparar_com_monte_carlo mede quantas
+    réplicas de Monte Carlo simples dariam o mesmo erro padrão e recomenda
+    o Monte Carlo simples nas métricas em que a importância não reduz a
+    variância
+  • θ = (θ_demanda, θ_lead_time) vem da entropia cruzada em vários níveis,
+    em réplicas-piloto com sementes separadas das da estimativa
+
+Mesma convenção de sorteios do núcleo (o dia t usa o sorteio t + pedidos
+já emitidos, o lead time o seguinte): com θ = (0, 0) as métricas por réplica
+são as de simular_estoque_lote.
+
+Uso:
+    from raridade_estoque import simular_estoque_importancia
+    res = simular_estoque_importancia(Q=1480, ROP=984, n_replicacoes=2000)
+    res["estimativas"]["nivel_servico"]["ic95"], res["ess_pesos"]
+"""
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    TAMANHO_BLOCO_REPLICACOES, quantil_normal, normais_replicacoes,
+    simular_estoque_lote, _sementes_replicacoes, _estado_inicial,
+    _fechar_estado, _contar_bloco,
+)
+
+REPLICACOES_PILOTO = 2000          # réplicas por iteração da entropia cruzada
+ITERACOES_CE = 10                  # máximo de iterações da entropia cruzada
+RHO_CE = 0.1                       # fração de elite de cada nível
+INCLINACAO_MAXIMA = 4.0            # |θ| máximo (evita pesos degenerados)
+NIVEIS_ALVO_RAROS = (0.99, 0.995, 0.999)
+METRICAS_PONDERADAS = ("fracao_ruptura", "custo_falta")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. MOTOR COM UMA JANELA INCLINADA POR RÉPLICA
+# ══════════════════════════════════════════════════════════════════════════════
+def _avancar_inclinado(Q, ROP, z, ciclo_alvo, m_ciclos, inclinacao, horizonte,
+                       demanda_media, demanda_desvio, lt_media, lt_desvio,
+                       custo_pedido, custo_falta) -> dict:
+    """
+    Laço de simular_estoque para as réplicas de `z`, com o ciclo
+    `ciclo_alvo[i]` da réplica i inclinado. Devolve o estado de
+    _estado_inicial mais os acumuladores da janela e da cauda (ciclos ≥
+    m_ciclos) e o log da razão de verossimilhança.
+    """
+    n = z.shape[0]
+    linhas = np.arange(n)
+    theta_d, theta_lt = inclinacao
+    estado = _estado_inicial(n, Q, ROP)
+    estado.update(
+        log_razao=np.zeros(n),
+        soma_z_demanda=np.zeros(n), n_z_demanda=np.zeros(n, dtype=np.int64),
+        z_lead_time=np.zeros(n), pediu_alvo=np.zeros(n, dtype=bool),
+        ruptura_alvo=np.zeros(n, dtype=bool), falta_alvo=np.zeros(n),
+        minimo_alvo=estado["estoque"].copy(),
+        rupturas_cauda=np.zeros(n, dtype=np.int64), falta_cauda=np.zeros(n),
+    )
+    estoque = estado["estoque"]
+    pedido_pendente = estado["pedido_pendente"]
+    dia_chegada = estado["dia_chegada"]
+    ruptura_no_ciclo = estado["ruptura_no_ciclo"]
+    n_pedidos = estado["n_pedidos"]
+    ciclos_total = estado["ciclos_total"]
+    log_razao = estado["log_razao"]
+
+    for dia in range(horizonte):
+        cursor = dia + n_pedidos
+
+        # Demanda: inclinada enquanto o pedido do ciclo alvo está em trânsito
+        janela = pedido_pendente & (n_pedidos == ciclo_alvo + 1)
+        zd = z[linhas, cursor] + theta_d * janela
+        log_razao -= np.where(janela, theta_d * zd - theta_d**2 / 2, 0.0)
+        estado["soma_z_demanda"] += np.where(janela, zd, 0.0)
+        estado["n_z_demanda"] += janela
+        d = np.maximum(np.rint(demanda_media + demanda_desvio * zd), 0)
+        estoque -= d.astype(np.int64)
+
+        chegou = pedido_pendente & (dia >= dia_chegada)
+        rompeu = chegou & ruptura_no_ciclo          # ciclo ciclos_total fechou com ruptura
+        estado["ruptura_alvo"] |= rompeu & (ciclos_total == ciclo_alvo)
+        estado["rupturas_cauda"] += rompeu & (ciclos_total >= m_ciclos)
+        estoque += Q * chegou
+        pedido_pendente &= ~chegou
+        ciclos_total += chegou
+        estado["ciclos_sem_ruptura"] += chegou & ~ruptura_no_ciclo
+        ruptura_no_ciclo &= ~chegou
+
+        falta = estoque < 0
+        custo = np.where(falta, -estoque * custo_falta, 0.0)
+        estado["total_custo_falta"] += custo
+        no_alvo = ciclos_total == ciclo_alvo
+        estado["falta_alvo"] += np.where(no_alvo, custo, 0.0)
+        estado["falta_cauda"] += np.where(ciclos_total >= m_ciclos, custo, 0.0)
+        np.minimum(estado["minimo_alvo"], estoque, out=estado["minimo_alvo"], where=no_alvo)
+        ruptura_no_ciclo |= falta
+
+        estado["unidades_em_estoque_dia"] += np.maximum(estoque, 0)
+
+        pedir = ~pedido_pendente & (estoque <= ROP)
+        if pedir.any():
+            alvo = pedir & (n_pedidos == ciclo_alvo)
+            zl = z[linhas, cursor + 1] + theta_lt * alvo
+            log_razao -= np.where(alvo, theta_lt * zl - theta_lt**2 / 2, 0.0)
+            estado["z_lead_time"] += np.where(alvo, zl, 0.0)
+            estado["pediu_alvo"] |= alvo
+            lt = np.maximum(1, np.rint(lt_media + lt_desvio * zl)).astype(np.int64)
+            dia_chegada[:] = np.where(pedir, dia + lt, dia_chegada)
+            pedido_pendente |= pedir
+            n_pedidos += pedir
+            estado["total_custo_pedido"] += np.where(pedir, custo_pedido, 0.0)
+
+    return estado
+
+
+def _simular_inclinado(Q, ROP, sementes, inclinacao, m_ciclos, horizonte,
+                       parametros, tamanho_bloco) -> dict:
+    """
+    Réplicas `sementes` (réplica i inclina o ciclo i mod m_ciclos), em blocos.
+    Devolve as métricas de _fechar_estado, os acumuladores da janela e os
+    valores por réplica dos estimadores (pesos já aplicados).
+    """
+    (demanda_media, demanda_desvio, lt_media, lt_desvio,
+     custo_pedido, custo_manutencao, custo_falta) = parametros
+    ciclo_alvo = np.arange(len(sementes)) % m_ciclos
+    blocos = []
+    for ini in range(0, len(sementes), tamanho_bloco):
+        z = normais_replicacoes(sementes[ini:ini + tamanho_bloco], 2 * horizonte)
+        with instr.fase("laco_diario"):
+            estado = _avancar_inclinado(
+                Q, ROP, z, ciclo_alvo[ini:ini + len(z)], m_ciclos, inclinacao,
+                horizonte, demanda_media, demanda_desvio, lt_media, lt_desvio,
+                custo_pedido, custo_falta)
+        with instr.fase("custos"):
+            bloco = _fechar_estado(estado, horizonte, custo_manutencao)
+        if instr.ativo():
+            _contar_bloco(len(z), horizonte, estado["n_pedidos"])
+        bloco.update({chave: estado[chave] for chave in (
+            "ciclos_total", "log_razao", "soma_z_demanda", "n_z_demanda",
+            "z_lead_time", "pediu_alvo", "ruptura_alvo", "falta_alvo",
+            "minimo_alvo", "rupturas_cauda", "falta_cauda")})
+        blocos.append(bloco)
+    r = {chave: np.concatenate([b[chave] for b in blocos]) for chave in blocos[0]}
+
+    pesos = np.exp(r["log_razao"])
+    ciclos = np.maximum(r["ciclos_total"], 1)
+    r["pesos"] = pesos
+    r["ciclo_alvo"] = ciclo_alvo
+    r["est_fracao_ruptura"] = pesos * (m_ciclos * r["ruptura_alvo"] + r["rupturas_cauda"]) / ciclos
+    r["est_custo_falta"] = pesos * (m_ciclos * r["falta_alvo"] + r["falta_cauda"])
+    return r
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. ESTATÍSTICAS PONDERADAS
+# ══════════════════════════════════════════════════════════════════════════════
+def estimar_ponderado(estimativas, estratos=None) -> dict:
+    """
+    Média, variância, erro padrão e IC 95% dos estimadores por réplica (já
+    multiplicados pelos pesos) e o ESS das contribuições: (Σx)² / Σx², o
+    número de réplicas que de fato pesam na média.
+
+    Com `estratos` (o estrato de cada réplica, ex.: ciclo_alvo) a média é a
+    dos estratos com pesos iguais e o erro padrão vem das variâncias dentro
+    de cada estrato. `variancia` é sempre a variância por réplica
+    equivalente, n · erro_padrao², comparável à do Monte Carlo simples.
+    """
+    estimativas = np.asarray(estimativas, dtype=float)
+    n = len(estimativas)
+    if estratos is None:
+        media = estimativas.mean()
+        variancia = estimativas.var(ddof=1) if n > 1 else 0.0
+    else:
+        _, estratos = np.unique(estratos, return_inverse=True)
+        n_k = np.bincount(estratos)
+        medias_k = np.bincount(estratos, estimativas) / n_k
+        desvios = estimativas - medias_k[estratos]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variancias_k = np.where(n_k > 1, np.bincount(estratos, desvios**2) / (n_k - 1), 0.0)
+        m = len(n_k)
+        media = medias_k.mean()
+        variancia = n * np.sum(variancias_k / n_k) / m**2
+    erro_padrao = np.sqrt(variancia / n)
+    z_ic = quantil_normal(0.975)
+    return {
+        "media": media,
+        "variancia": variancia,
+        "erro_padrao": erro_padrao,
+        "ic95": (media - z_ic * erro_padrao, media + z_ic * erro_padrao),
+        "ess": tamanho_efetivo(estimativas) if estimativas.any() else 0.0,
+    }
+
+
+def tamanho_efetivo(pesos) -> float:
+    """ESS de Kish: (Σw)² / Σw² (w ≥ 0)."""
+    pesos = np.asarray(pesos, dtype=float)
+    return pesos.sum()**2 / np.sum(pesos**2)
+
+
+def _ciclos_referencia(Q, horizonte, demanda_media) -> int:
+    """M: ciclos completos esperados no horizonte (os demais vão pela cauda)."""
+    return max(1, int(np.floor(horizonte * np.mean(demanda_media) / np.mean(Q))))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. ESCOLHA DE θ POR ENTROPIA CRUZADA
+# ══════════════════════════════════════════════════════════════════════════════
+def calibrar_inclinacao(Q, ROP, horizonte: int = HORIZONTE,
+                        n_piloto: int = REPLICACOES_PILOTO,
+                        iteracoes: int = ITERACOES_CE, rho: float = RHO_CE,
+                        seed: int | None = SEED, parametros=None,
+                        tamanho_bloco: int = TAMANHO_BLOCO_REPLICACOES) -> tuple:
+    """
+    (θ_demanda, θ_lead_time) pela entropia cruzada em vários níveis.
+
+    O escore de cada réplica é a maior falta do ciclo alvo (−estoque mínimo
+    nele). Enquanto menos de `rho` das réplicas rompem no ciclo alvo, a
+    elite são as réplicas acima do quantil 1 − rho do escore; depois, as que
+    rompem. θ passa a ser a média dos sorteios inclinados da elite
+    ponderada pelos pesos (máxima verossimilhança da média de uma normal de
+    variância 1). Para quando todo o nível é de ruptura e θ muda < 0,01.
+    """
+    if parametros is None:
+        parametros = _parametros_padrao()
+    m_ciclos = _ciclos_referencia(Q, horizonte, parametros[0])
+    theta = np.zeros(2)
+    for it in range(iteracoes):
+        # Sementes do piloto longe das da estimativa (seed + i): nada é reusado
+        base = None if seed is None else seed + 10**6 * (it + 1)
+        res = _simular_inclinado(Q, ROP, _sementes_replicacoes(n_piloto, base),
+                                 tuple(theta), m_ciclos, horizonte, parametros,
+                                 tamanho_bloco)
+        escore = -res["minimo_alvo"].astype(float)
+        nivel = min(np.quantile(escore, 1 - rho), 1.0)
+        elite = res["pesos"] * (escore >= nivel)
+        if not elite.any():
+            break
+        novo = np.array([
+            np.sum(elite * res["soma_z_demanda"]) / max(np.sum(elite * res["n_z_demanda"]), 1e-12),
+            np.sum(elite * res["z_lead_time"]) / max(np.sum(elite * res["pediu_alvo"]), 1e-12),
+        ])
+        novo = np.clip(novo, -INCLINACAO_MAXIMA, INCLINACAO_MAXIMA)
+        convergiu = nivel >= 1.0 and np.allclose(novo, theta, atol=0.01)
+        theta = novo
+        if convergiu:
+            break
+    return float(theta[0]), float(theta[1])
+
+
+def _parametros_padrao():
+    return (DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO, LEAD_TIME_DESVIO,
+            CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. ESTIMADOR
+# ══════════════════════════════════════════════════════════════════════════════
+def simular_estoque_importancia(Q: int, ROP: int, n_replicacoes: int = 2000,
+                                horizonte: int = HORIZONTE,
+                                demanda_media: float = DEMANDA_MEDIA,
+                                demanda_desvio: float = DEMANDA_DESVIO,
+                                lt_media: float = LEAD_TIME_MEDIO,
+                                lt_desvio: float = LEAD_TIME_DESVIO,
+                                custo_pedido: float = CUSTO_PEDIDO,
+                                custo_manutencao: float = CUSTO_MANUTENCAO,
+                                custo_falta: float = CUSTO_FALTA,
+                                inclinacao: tuple | None = None,
+                                seed: int | None = SEED,
+                                n_piloto: int = REPLICACOES_PILOTO,
+                                tamanho_bloco: int = TAMANHO_BLOCO_REPLICACOES) -> dict:
+    """
+    Monte Carlo da política (Q, ROP) por amostragem por importância.
+
+    `inclinacao` = (θ_demanda, θ_lead_time); None escolhe por
+    calibrar_inclinacao (n_piloto réplicas por iteração). n_replicacoes é
+    arredondado para cima até um múltiplo de m_ciclos (no mínimo 2 por
+    ciclo alvo). As réplicas usam as sementes de simular_estoque_lote
+    (seed + i).
+
+    Retorna dicionário com:
+        - métricas por réplica da trajetória sorteada (como
+          simular_estoque_lote), `pesos` e `ciclo_alvo`
+        - estimativas: {fracao_ruptura, nivel_servico, custo_falta} → ver
+          estimar_ponderado (estratificado por ciclo_alvo), cada uma com o
+          seu ESS. fracao_ruptura é a fração de ciclos com ruptura;
+          nivel_servico = 1 − fracao_ruptura, com o mesmo erro
+        - ess_pesos: ESS de Kish dos pesos w (muito abaixo de n_replicacoes
+          indica θ forte demais: poucas réplicas carregam a estimativa)
+        - inclinacao: θ usado; m_ciclos: ciclos repartidos entre as
+          réplicas; n_replicacoes: réplicas simuladas (após o arredondamento)
+    """
+    parametros = (demanda_media, demanda_desvio, lt_media, lt_desvio,
+                  custo_pedido, custo_manutencao, custo_falta)
+    if inclinacao is None:
+        inclinacao = calibrar_inclinacao(Q, ROP, horizonte, n_piloto, seed=seed,
+                                         parametros=parametros, tamanho_bloco=tamanho_bloco)
+    m_ciclos = _ciclos_referencia(Q, horizonte, demanda_media)
+    # Estimador não viesado só com estratos (ciclos alvo) do mesmo tamanho
+    n_replicacoes = m_ciclos * max(2, -(-n_replicacoes // m_ciclos))
+    sementes = _sementes_replicacoes(n_replicacoes, seed)
+    r = _simular_inclinado(Q, ROP, sementes, tuple(inclinacao), m_ciclos, horizonte,
+                           parametros, tamanho_bloco)
+
+    estimativas = {m: estimar_ponderado(r[f"est_{m}"], r["ciclo_alvo"]) for m in METRICAS_PONDERADAS}
+    ruptura = estimativas["fracao_ruptura"]
+    estimativas["nivel_servico"] = {
+        **ruptura,
+        "media": 1.0 - ruptura["media"],
+        "ic95": (1.0 - ruptura["ic95"][1], 1.0 - ruptura["ic95"][0]),
+    }
+    r.update(sementes=sementes, estimativas=estimativas, ess_pesos=tamanho_efetivo(r["pesos"]),
+             inclinacao=tuple(inclinacao), m_ciclos=m_ciclos, n_replicacoes=n_replicacoes)
+    return r
+
+
+def comparar_com_monte_carlo(Q: int, ROP: int, n_importancia: int = 2000,
+                             n_simples: int = 20000, seed: int | None = SEED,
+                             **kwargs) -> dict:
+    """
+    Mesma política por amostragem por importância (n_importancia réplicas)
+    e por Monte Carlo simples (simular_estoque_lote, n_simples réplicas).
+    `kwargs` vai para simular_estoque_importancia.
+
+    `replicacoes_equivalentes[m]` = réplicas simples com o erro padrão que a
+    amostragem por importância teve (réplicas usadas × razão das variâncias
+    por réplica) e `ganho[m]` = essa conta dividida pelas réplicas usadas.
+    `recomendacao[m]` é "importancia" se ganho[m] > 1 e "simples" caso
+    contrário: perto de níveis de serviço não tão raros (ex.: 99%) a
+    inclinação pode não pagar a variância que os pesos acrescentam.
+    """
+    importancia = simular_estoque_importancia(Q, ROP, n_importancia, seed=seed, **kwargs)
+    n_importancia = importancia["n_replicacoes"]
+    modelo = {k: v for k, v in kwargs.items() if k not in ("inclinacao", "n_piloto")}
+    lote = simular_estoque_lote(Q, ROP, n_simples, seed=seed, **modelo)
+    valores = {"fracao_ruptura": 1.0 - lote["nivel_servico"], "custo_falta": lote["custo_falta"]}
+    simples = {m: estimar_ponderado(v) for m, v in valores.items()}
+    ganho = {m: (simples[m]["variancia"] / importancia["estimativas"][m]["variancia"]
+                 if importancia["estimativas"][m]["variancia"] > 0 else np.inf)
+             for m in METRICAS_PONDERADAS}
+    return {"importancia": importancia, "simples": simples,
+            "n_importancia": n_importancia, "n_simples": n_simples, "ganho": ganho,
+            "replicacoes_equivalentes": {m: g * n_importancia for m, g in ganho.items()},
+            "recomendacao": {m: "importancia" if g > 1 else "simples" for m, g in ganho.items()}}
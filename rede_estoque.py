@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Rede de dois níveis: um centro de distribuição (CD) abastecendo lojas.
+
+  • Cada loja roda a política (Q, ROP) de simular_estoque, com um pedido
+    por vez; o pedido da loja sai do estoque do CD e chega depois do lead
+    time de transporte CD → loja
+  • Falta no CD atrasa as lojas: pedidos que o CD não consegue atender
+    esperam numa fila por ordem de chegada (pedido inteiro, sem envio
+    parcial) até a próxima entrega do fornecedor
+  • O CD segue (nQ, ROP) pela posição de estoque (físico + em trânsito −
+    pedidos em espera): pede o menor múltiplo de Q_cd que leva a posição
+    acima do ROP; vários pedidos ao fornecedor podem estar em trânsito
+  • O estado das lojas fica em arrays (réplicas × lojas) e todas avançam
+    juntas a cada dia; as réplicas são divididas em blocos (memória
+    limitada) que podem rodar num pool de processos
+  • A réplica r usa RandomState(seed + r), que sorteia, nesta ordem, as
+    demandas (dias × lojas), os lead times de transporte (envio k da loja s)
+    e os lead times do fornecedor (pedido k do CD): o resultado não depende
+    do tamanho do bloco nem do número de processos
+
+Uso:
+    python rede_estoque.py --lojas 300 --replicacoes 1000
+    python rede_estoque.py lojas.csv --replicacoes 1000   # formato de portfolio_estoque.py
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, CUSTO_PEDIDO,
+    CUSTO_MANUTENCAO, CUSTO_FALTA, NIVEL_SERVICO_ALVO, quantil_normal,
+    calcular_parametros_lote, resumir_replicacoes, _sementes_replicacoes,
+)
+
+LT_CD_MEDIO = 7.0                  # fornecedor → CD (dias)
+LT_CD_DESVIO = 2.0
+LT_LOJA_MEDIO = 2.0                # CD → loja (dias)
+LT_LOJA_DESVIO = 0.5
+CUSTO_PEDIDO_CD = 1000.0           # R$/pedido ao fornecedor
+CUSTO_MANUTENCAO_CD = 3.0          # R$/un/ano no CD
+NIVEL_SERVICO_CD = 0.95
+
+ELEMENTOS_POR_BLOCO = 2**14        # réplicas × lojas simuladas por vez
+METRICAS_LOJA = ("custo_pedido", "custo_manut", "custo_falta", "custo_total", "nivel_servico")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. PARÂMETROS DA REDE
+# ══════════════════════════════════════════════════════════════════════════════
+def montar_rede(demanda_media, demanda_desvio, lt_media=LT_LOJA_MEDIO,
+                lt_desvio=LT_LOJA_DESVIO, custo_pedido=CUSTO_PEDIDO,
+                custo_manutencao=CUSTO_MANUTENCAO, custo_falta=CUSTO_FALTA,
+                nivel_servico=NIVEL_SERVICO_ALVO,
+                lt_cd_media: float = LT_CD_MEDIO, lt_cd_desvio: float = LT_CD_DESVIO,
+                custo_pedido_cd: float = CUSTO_PEDIDO_CD,
+                custo_manutencao_cd: float = CUSTO_MANUTENCAO_CD,
+                nivel_servico_cd: float = NIVEL_SERVICO_CD,
+                horizonte: int = HORIZONTE) -> dict:
+    """
+    Parâmetros da rede a partir dos dados por loja (escalares ou arrays
+    (S,); lt_* é o transporte CD → loja).
+
+    Lojas: EOQ e ROP_B das fórmulas da seção 2 (calcular_parametros_lote).
+    CD: EOQ sobre a demanda total e ROP com estoque de segurança para a
+    demanda diária que chega ao CD em lotes — variância aproximada por
+    Σ σ_s² + Σ μ_s·Q_s (pedidos de Q_s a cada Q_s/μ_s dias, em média).
+    """
+    demanda_media = np.atleast_1d(np.asarray(demanda_media, dtype=float))
+    n = len(demanda_media)
+
+    def por_loja(v):
+        return np.broadcast_to(np.asarray(v, dtype=float), (n,)).copy()
+
+    lojas = {
+        "demanda_media": demanda_media,
+        "demanda_desvio": por_loja(demanda_desvio),
+        "lt_media": por_loja(lt_media),
+        "lt_desvio": por_loja(lt_desvio),
+        "custo_pedido": por_loja(custo_pedido),
+        "custo_manutencao": por_loja(custo_manutencao),
+        "custo_falta": por_loja(custo_falta),
+    }
+    formula = calcular_parametros_lote(
+        lojas["demanda_media"], lojas["demanda_desvio"], lojas["lt_media"],
+        lojas["lt_desvio"], lojas["custo_pedido"], lojas["custo_manutencao"],
+        por_loja(nivel_servico), horizonte=horizonte)
+    lojas["Q"] = np.maximum(formula["EOQ"], 1)
+    lojas["ROP"] = formula["ROP_B"]
+
+    media_cd = demanda_media.sum()
+    variancia_cd = np.sum(lojas["demanda_desvio"]**2) + np.sum(demanda_media * lojas["Q"])
+    ss_cd = max(0.0, quantil_normal(nivel_servico_cd)) * np.sqrt(
+        lt_cd_media * variancia_cd + media_cd**2 * lt_cd_desvio**2)
+    cd = {
+        "Q": max(1, round(np.sqrt(2 * media_cd * horizonte * custo_pedido_cd / custo_manutencao_cd))),
+        "ROP": round(media_cd * lt_cd_media + ss_cd),
+        "lt_media": float(lt_cd_media),
+        "lt_desvio": float(lt_cd_desvio),
+        "custo_pedido": float(custo_pedido_cd),
+        "custo_manutencao": float(custo_manutencao_cd),
+    }
+    return {"lojas": lojas, "cd": cd}
+
+
+def rede_sintetica(n_lojas: int, seed: int | None = SEED, **kwargs) -> dict:
+    """
+    Rede de exemplo: demanda média entre 0,2 e 1,5 × DEMANDA_MEDIA e
+    coeficiente de variação entre 0,1 e 0,4 (a mesma razão de
+    DEMANDA_DESVIO / DEMANDA_MEDIA no meio da faixa). `kwargs` vai para
+    montar_rede.
+    """
+    rng = np.random.RandomState(seed)
+    media = np.round(rng.uniform(0.2, 1.5, n_lojas) * DEMANDA_MEDIA)
+    cv = rng.uniform(0.5, 2.0, n_lojas) * DEMANDA_DESVIO / DEMANDA_MEDIA
+    return montar_rede(media, np.round(media * cv, 1), **kwargs)
+
+
+def rede_de_tabela(df, **kwargs) -> dict:
+    """Rede a partir de uma tabela de lojas no formato de portfolio_estoque."""
+    from portfolio_estoque import preparar_portfolio
+
+    df = preparar_portfolio(df)
+    return montar_rede(**{c: df[c].to_numpy() for c in (
+        "demanda_media", "demanda_desvio", "lt_media", "lt_desvio", "custo_pedido",
+        "custo_manutencao", "custo_falta", "nivel_servico")}, **kwargs)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. MOTOR VETORIZADO
+# ══════════════════════════════════════════════════════════════════════════════
+def _sorteios_rede(sementes, horizonte: int, n_lojas: int) -> tuple:
+    """Demandas e lead times de transporte (R, dias, lojas) e do fornecedor (R, dias)."""
+    with instr.fase("sorteios"):
+        zd = np.empty((len(sementes), horizonte, n_lojas))
+        zt = np.empty((len(sementes), horizonte, n_lojas))
+        zc = np.empty((len(sementes), horizonte))
+        rng = np.random.RandomState()
+        for i, s in enumerate(sementes):
+            rng.seed(int(s))
+            zd[i] = rng.standard_normal((horizonte, n_lojas))
+            zt[i] = rng.standard_normal((horizonte, n_lojas))
+            zc[i] = rng.standard_normal(horizonte)
+    return zd, zt, zc
+
+
+def _alocar_fifo(em_espera, dia_pedido, Q, estoque_cd) -> np.ndarray:
+    """
+    Pedidos em espera (R, S) que o CD envia hoje: por ordem de chegada (dia
+    do pedido, depois índice da loja), enquanto o estoque cobre o pedido
+    inteiro; o primeiro que não cabe segura os seguintes.
+    """
+    quantidade = np.where(em_espera, Q, 0)
+    cabe_tudo = quantidade.sum(axis=1) <= estoque_cd
+    envia = em_espera & cabe_tudo[:, None]
+    linhas = np.flatnonzero(~cabe_tudo)
+    if len(linhas):
+        n_lojas = em_espera.shape[1]
+        chave = np.where(em_espera[linhas], dia_pedido[linhas] * n_lojas + np.arange(n_lojas),
+                         np.iinfo(np.int64).max)
+        ordem = np.argsort(chave, axis=1, kind="stable")
+        acumulado = np.cumsum(np.take_along_axis(quantidade[linhas], ordem, axis=1), axis=1)
+        sai = np.take_along_axis(em_espera[linhas], ordem, axis=1) & (acumulado <= estoque_cd[linhas, None])
+        parcial = np.zeros_like(sai)
+        np.put_along_axis(parcial, ordem, sai, axis=1)
+        envia[linhas] = parcial
+    return envia
+
+
+def _avancar_rede(lojas: dict, cd: dict, zd, zt, zc, horizonte: int) -> dict:
+    """
+    Percorre o horizonte para um bloco de réplicas. Mesma ordem de
+    simular_estoque em cada loja (demanda, chegada, falta, manutenção,
+    pedido); depois o CD recebe do fornecedor, atende a fila e repõe.
+    """
+    n, n_lojas = zd.shape[0], zd.shape[2]
+    linhas = np.arange(n)[:, None]
+    colunas = np.arange(n_lojas)[None, :]
+    Q, ROP = lojas["Q"].astype(np.int64), lojas["ROP"].astype(np.int64)
+
+    estoque = np.broadcast_to(Q + ROP, (n, n_lojas)).copy()
+    pendente = np.zeros((n, n_lojas), dtype=bool)      # pedido em espera ou em transporte
+    em_espera = np.zeros((n, n_lojas), dtype=bool)
+    em_transporte = np.zeros((n, n_lojas), dtype=bool)
+    dia_pedido = np.zeros((n, n_lojas), dtype=np.int64)
+    dia_chegada = np.zeros((n, n_lojas), dtype=np.int64)
+    ruptura_no_ciclo = np.zeros((n, n_lojas), dtype=bool)
+    n_envios = np.zeros((n, n_lojas), dtype=np.int64)
+    lojas_estado = {
+        "n_pedidos": np.zeros((n, n_lojas), dtype=np.int64),
+        "ciclos_total": np.zeros((n, n_lojas), dtype=np.int64),
+        "ciclos_sem_ruptura": np.zeros((n, n_lojas), dtype=np.int64),
+        "unidades_em_estoque_dia": np.zeros((n, n_lojas), dtype=np.int64),
+        "total_custo_pedido": np.zeros((n, n_lojas)),
+        "total_custo_falta": np.zeros((n, n_lojas)),
+    }
+
+    # CD: calendário de chegadas do fornecedor (o último dia junta as tardias)
+    estoque_cd = np.full(n, cd["Q"] + cd["ROP"], dtype=np.int64)
+    chegadas_cd = np.zeros((n, horizonte + 1), dtype=np.int64)
+    em_transito_cd = np.zeros(n, dtype=np.int64)
+    n_pedidos_cd = np.zeros(n, dtype=np.int64)
+    cd_estado = {
+        "pedidos_cd": n_pedidos_cd,
+        "unidades_cd_dia": np.zeros(n, dtype=np.int64),
+        "pedidos_lojas": np.zeros(n, dtype=np.int64),
+        "atendidos_no_dia": np.zeros(n, dtype=np.int64),
+        "dias_espera": np.zeros(n, dtype=np.int64),
+        "envios": np.zeros(n, dtype=np.int64),
+    }
+
+    for dia in range(horizonte):
+        # ── Lojas ────────────────────────────────────────────────────────────
+        d = np.maximum(np.rint(lojas["demanda_media"] + lojas["demanda_desvio"] * zd[:, dia]), 0)
+        estoque -= d.astype(np.int64)
+
+        chegou = em_transporte & (dia >= dia_chegada)
+        estoque += Q * chegou
+        em_transporte &= ~chegou
+        pendente &= ~chegou
+        lojas_estado["ciclos_total"] += chegou
+        lojas_estado["ciclos_sem_ruptura"] += chegou & ~ruptura_no_ciclo
+        ruptura_no_ciclo &= ~chegou
+
+        falta = estoque < 0
+        lojas_estado["total_custo_falta"] += np.where(falta, -estoque * lojas["custo_falta"], 0.0)
+        ruptura_no_ciclo |= falta
+        lojas_estado["unidades_em_estoque_dia"] += np.maximum(estoque, 0)
+
+        pedir = ~pendente & (estoque <= ROP)
+        pendente |= pedir
+        em_espera |= pedir
+        dia_pedido[pedir] = dia
+        lojas_estado["n_pedidos"] += pedir
+        lojas_estado["total_custo_pedido"] += np.where(pedir, lojas["custo_pedido"], 0.0)
+        cd_estado["pedidos_lojas"] += pedir.sum(axis=1)
+
+        # ── CD: chegada do fornecedor e atendimento da fila ─────────────────
+        recebido = chegadas_cd[:, dia]
+        estoque_cd += recebido
+        em_transito_cd -= recebido
+        if em_espera.any():
+            envia = _alocar_fifo(em_espera, dia_pedido, Q, estoque_cd)
+            if envia.any():
+                estoque_cd -= np.where(envia, Q, 0).sum(axis=1)
+                em_espera &= ~envia
+                em_transporte |= envia
+                z = zt[linhas, np.minimum(n_envios, horizonte - 1), colunas]
+                lt = np.maximum(1, np.rint(lojas["lt_media"] + lojas["lt_desvio"] * z)).astype(np.int64)
+                dia_chegada[envia] = dia + lt[envia]
+                n_envios += envia
+                cd_estado["envios"] += envia.sum(axis=1)
+                cd_estado["atendidos_no_dia"] += (envia & (dia_pedido == dia)).sum(axis=1)
+                cd_estado["dias_espera"] += np.where(envia, dia - dia_pedido, 0).sum(axis=1)
+        cd_estado["unidades_cd_dia"] += estoque_cd
+
+        # ── CD: reposição (nQ, ROP) pela posição de estoque ─────────────────
+        posicao = estoque_cd + em_transito_cd - np.where(em_espera, Q, 0).sum(axis=1)
+        pedir_cd = posicao <= cd["ROP"]
+        if pedir_cd.any():
+            lotes = (cd["ROP"] - posicao) // cd["Q"] + 1
+            quantidade = np.where(pedir_cd, lotes * cd["Q"], 0)
+            z = zc[np.arange(n), np.minimum(n_pedidos_cd, horizonte - 1)]
+            lt = np.maximum(1, np.rint(cd["lt_media"] + cd["lt_desvio"] * z)).astype(np.int64)
+            np.add.at(chegadas_cd, (np.arange(n), np.minimum(dia + lt, horizonte)), quantidade)
+            em_transito_cd += quantidade
+            n_pedidos_cd += pedir_cd
+
+    return {**lojas_estado, **cd_estado}
+
+
+def _fechar_rede(estado: dict, lojas: dict, cd: dict, horizonte: int) -> dict:
+    """Métricas por (réplica, loja) e por réplica (rede e CD)."""
+    ciclos = estado["ciclos_total"]
+    por_loja = {
+        "custo_pedido": estado["total_custo_pedido"],
+        "custo_manut": estado["unidades_em_estoque_dia"] / horizonte * lojas["custo_manutencao"],
+        "custo_falta": estado["total_custo_falta"],
+        "nivel_servico": estado["ciclos_sem_ruptura"] / np.maximum(ciclos, 1),
+    }
+    por_loja["custo_total"] = (por_loja["custo_pedido"] + por_loja["custo_manut"]
+                               + por_loja["custo_falta"])
+
+    custo_pedido_cd = estado["pedidos_cd"] * cd["custo_pedido"]
+    custo_manut_cd = estado["unidades_cd_dia"] / horizonte * cd["custo_manutencao"]
+    rede = {
+        "custo_pedido": por_loja["custo_pedido"].sum(axis=1) + custo_pedido_cd,
+        "custo_manut": por_loja["custo_manut"].sum(axis=1) + custo_manut_cd,
+        "custo_falta": por_loja["custo_falta"].sum(axis=1),
+        "nivel_servico": estado["ciclos_sem_ruptura"].sum(axis=1) / np.maximum(ciclos.sum(axis=1), 1),
+        "custo_lojas": por_loja["custo_total"].sum(axis=1),
+        "custo_cd": custo_pedido_cd + custo_manut_cd,
+        "pedidos_cd": estado["pedidos_cd"],
+        "atendimento_cd": estado["atendidos_no_dia"] / np.maximum(estado["pedidos_lojas"], 1),
+        "espera_media_cd": estado["dias_espera"] / np.maximum(estado["envios"], 1),
+    }
+    rede["custo_total"] = rede["custo_pedido"] + rede["custo_manut"] + rede["custo_falta"]
+    return {"rede": rede, "por_loja": por_loja}
+
+
+def _simular_bloco_rede(rede: dict, sementes, horizonte: int) -> dict:
+    """Um bloco de réplicas: métricas da rede por réplica e somas por loja."""
+    lojas, cd = rede["lojas"], rede["cd"]
+    zd, zt, zc = _sorteios_rede(sementes, horizonte, len(lojas["Q"]))
+    with instr.fase("laco_diario"):
+        estado = _avancar_rede(lojas, cd, zd, zt, zc, horizonte)
+    with instr.fase("custos"):
+        metricas = _fechar_rede(estado, lojas, cd, horizonte)
+    if instr.ativo():
+        instr.contar("replicas", len(sementes))
+        instr.contar("dias_simulados", len(sementes) * horizonte)
+        instr.contar("lojas_dia", len(sementes) * horizonte * len(lojas["Q"]))
+    # Por loja só as somas sobre as réplicas voltam (R × S ficaria no bloco)
+    return {"rede": metricas["rede"],
+            "soma_lojas": {m: v.sum(axis=0) for m, v in metricas["por_loja"].items()}}
+
+
+def _simular_bloco_no_filho(instrumentar: bool, inicio: int, *tarefa):
+    """_simular_bloco_rede no pool, com o início do bloco e o que a instrumentação mediu."""
+    if instrumentar:
+        instr.ativar()
+    return inicio, _simular_bloco_rede(*tarefa), instr.coletar()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. SIMULAÇÃO DA REDE
+# ══════════════════════════════════════════════════════════════════════════════
+def simular_rede(rede: dict, n_replicacoes: int = 1000, horizonte: int = HORIZONTE,
+                 seed: int | None = SEED, n_processos: int | None = None,
+                 elementos_por_bloco: int = ELEMENTOS_POR_BLOCO) -> dict:
+    """
+    Simula a rede (ver montar_rede) em N réplicas.
+
+    Retorna dicionário com:
+        - métricas por réplica da rede, arrays (N,): custo_pedido,
+          custo_manut, custo_falta e custo_total (lojas + CD), nivel_servico
+          (ciclos sem ruptura / ciclos, somando todas as lojas), custo_lojas,
+          custo_cd, pedidos_cd, atendimento_cd (fração dos pedidos das lojas
+          enviados no mesmo dia) e espera_media_cd (dias na fila do CD)
+        - lojas: médias sobre as réplicas por loja, arrays (S,), de
+          custo_pedido, custo_manut, custo_falta, custo_total e nivel_servico
+        - sementes e resumo (ver resumir_replicacoes)
+
+    Cada bloco tem cerca de `elementos_por_bloco` réplicas × lojas;
+    n_processos=1 roda no processo atual, sem pool.
+    """
+    sementes = _sementes_replicacoes(n_replicacoes, seed)
+    n_lojas = len(rede["lojas"]["Q"])
+    por_bloco = max(1, elementos_por_bloco // n_lojas)
+    tarefas = [(ini, rede, sementes[ini:ini + por_bloco], horizonte)
+               for ini in range(0, n_replicacoes, por_bloco)]
+
+    partes = {}
+    if n_processos == 1 or len(tarefas) == 1:
+        for ini, *tarefa in tarefas:
+            partes[ini] = _simular_bloco_rede(*tarefa)
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos or os.cpu_count()) as pool:
+            futuros = [pool.submit(_simular_bloco_no_filho, instr.ativo(), *tarefa)
+                       for tarefa in tarefas]
+            for futuro in as_completed(futuros):
+                ini, parte, medido = futuro.result()
+                instr.mesclar(medido)
+                partes[ini] = parte
+
+    ordem = [partes[ini] for ini in sorted(partes)]
+    resultado = {m: np.concatenate([p["rede"][m] for p in ordem]) for m in ordem[0]["rede"]}
+    resultado["lojas"] = {m: sum(p["soma_lojas"][m] for p in ordem) / n_replicacoes
+                          for m in METRICAS_LOJA}
+    resultado["sementes"] = sementes
+    resultado["resumo"] = resumir_replicacoes(resultado)
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. LINHA DE COMANDO
+# ══════════════════════════════════════════════════════════════════════════════
+def main():
+    parser = argparse.ArgumentParser(description="Simula uma rede CD -> lojas com politicas (Q, ROP).")
+    parser.add_argument("entrada", nargs="?", default=None,
+                        help="CSV/Parquet de lojas (formato de portfolio_estoque.py)")
+    parser.add_argument("--lojas", type=int, default=300,
+                        help="lojas da rede sintetica (sem arquivo de entrada)")
+    parser.add_argument("--replicacoes", type=int, default=1000)
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--saida", default=None, help="CSV com os resultados medios por loja")
+    args = parser.parse_args()
+
+    if args.entrada:
+        from portfolio_estoque import carregar_portfolio
+
+        rede = rede_de_tabela(carregar_portfolio(args.entrada), horizonte=args.horizonte)
+    else:
+        rede = rede_sintetica(args.lojas, args.seed, horizonte=args.horizonte)
+    n_lojas = len(rede["lojas"]["Q"])
+    print(f"Simulando CD + {n_lojas} lojas ({args.replicacoes} replicas, "
+          f"Q_cd={rede['cd']['Q']}, ROP_cd={rede['cd']['ROP']})...")
+    res = simular_rede(rede, args.replicacoes, args.horizonte, args.seed, args.processos)
+
+    r = res["resumo"]
+    print(f"  Custo total da rede = R$ {r['custo_total']['media']:>14,.2f} +- {r['custo_total']['erro_padrao']:,.2f}")
+    print(f"    lojas             = R$ {res['custo_lojas'].mean():>14,.2f}")
+    print(f"    CD                = R$ {res['custo_cd'].mean():>14,.2f}")
+    print(f"  Nivel de servico    = {r['nivel_servico']['media']*100:.2f}%"
+          f" (pior loja {res['lojas']['nivel_servico'].min()*100:.1f}%)")
+    print(f"  Atendimento do CD   = {res['atendimento_cd'].mean()*100:.1f}% no mesmo dia,"
+          f" espera media {res['espera_media_cd'].mean():.2f} dias")
+    if args.saida:
+        import pandas as pd
+
+        pd.DataFrame({"loja": np.arange(n_lojas), "Q": rede["lojas"]["Q"],
+                      "ROP": rede["lojas"]["ROP"], **res["lojas"]}).to_csv(args.saida, index=False)
+        print(f"Resultados por loja salvos em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
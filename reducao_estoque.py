@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Redução de séries para gráficos interativos: o navegador recebe no máximo
+algumas centenas/milhares de pontos por traço, qualquer que seja o
+horizonte ou o número de réplicas.
+
+  • decimar_min_max: em cada balde de dias guarda o mínimo e o máximo (na
+    ordem em que ocorrem), então as rupturas (vales) e os picos de
+    reposição nunca somem do gráfico
+  • lttb: Largest-Triangle-Three-Buckets, escolhe um ponto por balde pela
+    maior área de triângulo; preserva a forma de curvas suaves
+  • FaixasPercentis: percentis por dia sobre as réplicas, acumulados
+    trecho a trecho (ex.: pelo ao_trecho de simular_estoque_fluxo), então a
+    matriz réplicas × dias nunca existe inteira; reduzir() dá os envelopes
+    por balde — limites inferiores pelo mínimo do balde, superiores pelo
+    máximo
+  • faixas_percentis: o mesmo para uma matriz já pronta, em fatias de dias
+  • Só NumPy: usado pelo dashboard, mas independente do Streamlit/Plotly
+
+Uso:
+    dias, niveis = decimar_min_max(hist_estoque, max_pontos=2000)
+    faixas = faixas_percentis(matriz_niveis, (5, 25, 50, 75, 95))
+    acumulador = FaixasPercentis(horizonte)
+    simular_estoque_fluxo(..., ao_trecho=lambda ini, dia, niveis: acumulador.atualizar(dia, niveis))
+"""
+
+import numpy as np
+
+MAX_PONTOS = 2000                  # pontos por traço enviados ao navegador
+PERCENTIS_PADRAO = (5, 25, 50, 75, 95)
+DIAS_POR_FATIA = 2048              # dias por vez no cálculo dos percentis
+
+
+def _baldes(n: int, n_baldes: int) -> np.ndarray:
+    """Índices (≤ n_baldes, largura) que cobrem 0..n-1, com -1 no preenchimento."""
+    largura = -(-n // n_baldes)
+    indices = np.arange(n_baldes * largura).reshape(n_baldes, largura)
+    indices[indices >= n] = -1
+    return indices[indices[:, 0] >= 0]
+
+
+def decimar_min_max(y, max_pontos: int = MAX_PONTOS, x=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (x, y) com no máximo `max_pontos` pontos: mínimo e máximo de cada um dos
+    max_pontos/2 baldes, na ordem do tempo. Séries curtas voltam inteiras.
+    """
+    y = np.asarray(y)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    if len(y) <= max_pontos:
+        return x, y
+    indices = _baldes(len(y), max(1, max_pontos // 2))
+    valores = np.where(indices >= 0, y[indices.clip(0)], np.nan).astype(float)
+    i_min = indices[np.arange(len(indices)), np.nanargmin(valores, axis=1)]
+    i_max = indices[np.arange(len(indices)), np.nanargmax(valores, axis=1)]
+    escolhidos = np.unique(np.concatenate([i_min, i_max]))  # unique também ordena
+    return x[escolhidos], y[escolhidos]
+
+
+def lttb(y, max_pontos: int = MAX_PONTOS, x=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: o primeiro e o último ponto e, em cada
+    balde intermediário, o ponto que forma o maior triângulo com o ponto
+    escolhido no balde anterior e a média do balde seguinte.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.arange(len(y), dtype=float) if x is None else np.asarray(x, dtype=float)
+    n = len(y)
+    if n <= max_pontos or max_pontos < 3:
+        return x, y
+    bordas = np.linspace(1, n - 1, max_pontos - 1).astype(int)
+    escolhidos = np.empty(max_pontos, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for b in range(max_pontos - 2):
+        ini, fim = bordas[b], bordas[b + 1]
+        prox_fim = bordas[b + 2] if b + 2 < len(bordas) else n
+        mx, my = x[fim:prox_fim].mean(), y[fim:prox_fim].mean()
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs((ax - mx) * (y[ini:fim] - ay) - (ax - x[ini:fim]) * (my - ay))
+        anterior = ini + int(areas.argmax())
+        escolhidos[b + 1] = anterior
+    return x[escolhidos], y[escolhidos]
+
+
+class FaixasPercentis:
+    """
+    Percentis por dia acumulados trecho a trecho. Cada atualizar(dia_ini,
+    niveis) recebe TODAS as réplicas dos dias do trecho, (réplicas, dias);
+    só os percentis por dia (len(percentis) × n_dias) ficam guardados.
+    """
+
+    def __init__(self, n_dias: int, percentis=PERCENTIS_PADRAO):
+        self.percentis = tuple(percentis)
+        self.por_dia = np.full((len(self.percentis), n_dias), np.nan)
+
+    def atualizar(self, dia_ini: int, niveis):
+        niveis = np.asarray(niveis)
+        fim = dia_ini + niveis.shape[1]
+        self.por_dia[:, dia_ini:fim] = np.percentile(niveis, self.percentis, axis=0)
+
+    def reduzir(self, max_pontos: int = MAX_PONTOS, dias=None) -> dict:
+        """
+        Retorna {"dias": primeiro dia de cada balde, p: array por percentil},
+        com no máximo `max_pontos` baldes: percentis abaixo de 50 pelo mínimo
+        do balde, acima pelo máximo e a mediana pela média (o envelope nunca
+        esconde um vale ou pico de alguma faixa).
+        """
+        n_dias = self.por_dia.shape[1]
+        dias = np.arange(n_dias) if dias is None else np.asarray(dias)
+        if n_dias <= max_pontos:
+            return {"dias": dias, **{p: self.por_dia[k] for k, p in enumerate(self.percentis)}}
+        indices = _baldes(n_dias, max_pontos)
+        faixas = {"dias": dias[indices[:, 0]]}
+        for k, p in enumerate(self.percentis):
+            valores = np.where(indices >= 0, self.por_dia[k][indices.clip(0)], np.nan)
+            reducao = np.nanmin if p < 50 else np.nanmax if p > 50 else np.nanmean
+            faixas[p] = reducao(valores, axis=1)
+        return faixas
+
+
+def faixas_percentis(niveis, percentis=PERCENTIS_PADRAO, max_pontos: int = MAX_PONTOS,
+                     dias=None) -> dict:
+    """
+    Percentis por dia de uma matriz (réplicas, dias) já pronta, calculados
+    em fatias de DIAS_POR_FATIA dias e reduzidos como FaixasPercentis.reduzir.
+    """
+    niveis = np.asarray(niveis)
+    acumulador = FaixasPercentis(niveis.shape[1], percentis)
+    for ini in range(0, niveis.shape[1], DIAS_POR_FATIA):
+        acumulador.atualizar(ini, niveis[:, ini:ini + DIAS_POR_FATIA])
+    return acumulador.reduzir(max_pontos, dias)
@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Análise de sensibilidade conjunta com cubos de resultados em disco.
+
+  • Oito parâmetros podem variar juntos: demanda (μ, σ), lead time (μ, σ),
+    os três custos e o nível de serviço alvo; em cada combinação a política
+    é a do cenário B (ou A): EOQ e ROP recalculados pelas fórmulas
+  • Planejamento fatorial completo (um eixo por parâmetro, cubo com a forma
+    da grade) ou hipercubo latino (pontos sorteados dentro de limites)
+  • As combinações são simuladas em tarefas de várias células espalhadas
+    num pool de processos
+  • Os resultados vão para uma pasta: um .npy por métrica (aberto com
+    np.load(..., mmap_mode="r"), sem ler o cubo inteiro), a máscara das
+    células prontas e um indice.json com os eixos
+  • Extensão incremental: novos valores de eixo (ou novos pontos do
+    hipercubo) só simulam as células que faltam; as já prontas são copiadas
+  • Números aleatórios comuns: toda célula usa as mesmas sementes, então o
+    resultado de uma célula não depende da sua posição na grade
+
+Uso:
+    python sensibilidade_estoque.py cubos/sensibilidade \\
+        --eixo demanda_desvio 10 20 30 --eixo lt_desvio 0.5 1.5 2.5
+    python sensibilidade_estoque.py cubos/hipercubo --hipercubo 200 \\
+        --limite demanda_desvio 10 40 --limite custo_falta 5 50
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    NIVEL_SERVICO_ALVO, calcular_parametros_lote, simular_estoque_lote,
+)
+
+# Parâmetros que podem virar eixo do cubo, com o valor usado quando fixos
+VALORES_BASE = {
+    "demanda_media": DEMANDA_MEDIA,
+    "demanda_desvio": DEMANDA_DESVIO,
+    "lt_media": LEAD_TIME_MEDIO,
+    "lt_desvio": LEAD_TIME_DESVIO,
+    "custo_pedido": CUSTO_PEDIDO,
+    "custo_manutencao": CUSTO_MANUTENCAO,
+    "custo_falta": CUSTO_FALTA,
+    "nivel_servico": NIVEL_SERVICO_ALVO,
+}
+EIXOS_SENSIBILIDADE = tuple(VALORES_BASE)
+
+# Métricas guardadas por célula (médias nas réplicas, custo_total_ep é o
+# erro padrão do custo total)
+METRICAS_CUBO = ("Q", "ROP", "n_pedidos", "custo_pedido", "custo_manut",
+                 "custo_falta", "custo_total", "custo_total_ep", "nivel_servico")
+
+REPLICACOES_SENSIBILIDADE = 200    # réplicas por célula
+CELULAS_POR_TAREFA = 16            # células enviadas juntas ao pool
+TAREFAS_POR_GRAVACAO = 32          # tarefas concluídas entre dois flush
+PASTA_CUBO = os.path.join("cubos", "sensibilidade")   # lida pelo dashboard
+
+ARQUIVO_INDICE = "indice.json"
+ARQUIVO_FEITO = "feito.npy"
+PASTA_METRICAS = "metricas"
+PASTA_PARAMETROS = "parametros"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. PLANEJAMENTOS
+# ══════════════════════════════════════════════════════════════════════════════
+def _validar_nomes(nomes):
+    desconhecidos = [n for n in nomes if n not in VALORES_BASE]
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {desconhecidos} "
+                         f"(use {', '.join(EIXOS_SENSIBILIDADE)})")
+
+
+def _base_completa(base: dict | None, variaveis) -> dict:
+    """Valores fixos de todos os parâmetros que não variam."""
+    base = dict(base or {})
+    _validar_nomes(base)
+    return {n: float(base.get(n, v)) for n, v in VALORES_BASE.items()
+            if n not in variaveis}
+
+
+def hipercubo_latino(limites: dict, n_pontos: int,
+                     seed: int | None = SEED) -> dict:
+    """
+    Hipercubo latino em `limites` ({nome: (mínimo, máximo)}): cada eixo é
+    dividido em n_pontos faixas iguais e cada faixa recebe exatamente um
+    ponto. Retorna {nome: array (n_pontos,)}.
+    """
+    _validar_nomes(limites)
+    rng = np.random.default_rng(seed)
+    amostra = {}
+    for nome, (minimo, maximo) in limites.items():
+        u = (rng.permutation(n_pontos) + rng.random(n_pontos)) / n_pontos
+        amostra[nome] = minimo + u * (maximo - minimo)
+    return amostra
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. AVALIAÇÃO DAS CÉLULAS
+# ══════════════════════════════════════════════════════════════════════════════
+def avaliar_celulas(parametros: dict, n_replicacoes: int = REPLICACOES_SENSIBILIDADE,
+                    horizonte: int = HORIZONTE, cenario: str = "B",
+                    seed: int | None = SEED) -> dict:
+    """
+    Simula k combinações de parâmetros ({nome: array (k,)}, todos os oito
+    parâmetros) com a política do cenário escolhido. Toda célula usa as
+    sementes seed, seed+1, …, então k células rodam num só lote de
+    k·n_replicacoes réplicas. Retorna {métrica: array (k,)} (METRICAS_CUBO).
+    """
+    p = {n: np.atleast_1d(np.asarray(parametros[n], dtype=float))
+         for n in EIXOS_SENSIBILIDADE}
+    k = len(p["demanda_media"])
+    politica = calcular_parametros_lote(
+        p["demanda_media"], p["demanda_desvio"], p["lt_media"], p["lt_desvio"],
+        p["custo_pedido"], p["custo_manutencao"], p["nivel_servico"],
+        horizonte=horizonte)
+    Q = np.maximum(politica["EOQ"], 1)
+    ROP = politica["ROP_A"] if cenario == "A" else politica["ROP_B"]
+
+    def rep(v):
+        return np.repeat(v, n_replicacoes)
+
+    sementes = np.tile((seed if seed is not None else 0)
+                       + np.arange(n_replicacoes, dtype=np.int64), k)
+    res = simular_estoque_lote(
+        rep(Q), rep(ROP), horizonte=horizonte,
+        demanda_media=rep(p["demanda_media"]), demanda_desvio=rep(p["demanda_desvio"]),
+        lt_media=rep(p["lt_media"]), lt_desvio=rep(p["lt_desvio"]),
+        custo_pedido=rep(p["custo_pedido"]),
+        custo_manutencao=rep(p["custo_manutencao"]),
+        custo_falta=rep(p["custo_falta"]), sementes=sementes)
+
+    def por_celula(chave):
+        return np.asarray(res[chave], dtype=float).reshape(k, n_replicacoes)
+
+    metricas = {"Q": Q.astype(float), "ROP": ROP.astype(float)}
+    for m in ("n_pedidos", "custo_pedido", "custo_manut", "custo_falta",
+              "custo_total", "nivel_servico"):
+        metricas[m] = por_celula(m).mean(axis=1)
+    if n_replicacoes > 1:
+        metricas["custo_total_ep"] = (por_celula("custo_total").std(axis=1, ddof=1)
+                                      / np.sqrt(n_replicacoes))
+    else:
+        metricas["custo_total_ep"] = np.zeros(k)
+    return metricas
+
+
+def _avaliar_tarefa(celulas: np.ndarray, parametros: dict, opcoes: dict):
+    """Executa no processo filho: devolve as células e suas métricas."""
+    return celulas, avaliar_celulas(parametros, **opcoes)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. ARMAZENAMENTO EM DISCO
+# ══════════════════════════════════════════════════════════════════════════════
+def _ler_indice(pasta: str) -> dict | None:
+    try:
+        with open(os.path.join(pasta, ARQUIVO_INDICE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _gravar_indice(pasta: str, indice: dict):
+    caminho = os.path.join(pasta, ARQUIVO_INDICE)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=2)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def _caminhos_arrays(pasta: str, indice: dict) -> dict:
+    """Arquivo .npy de cada array do cubo (métricas, máscara e parâmetros)."""
+    caminhos = {"feito": os.path.join(pasta, ARQUIVO_FEITO)}
+    for m in METRICAS_CUBO:
+        caminhos[m] = os.path.join(pasta, PASTA_METRICAS, f"{m}.npy")
+    if indice["tipo"] == "hipercubo":
+        for n in indice["limites"]:
+            caminhos[f"parametro:{n}"] = os.path.join(pasta, PASTA_PARAMETROS, f"{n}.npy")
+    return caminhos
+
+
+def _reescrever(pasta: str, indice: dict, forma: tuple, copiar):
+    """
+    Cria os arrays com a nova `forma` (células vazias: NaN e feito=False),
+    chama copiar(chave, novo, antigo) para aproveitar o conteúdo anterior e
+    troca os arquivos só no fim. Arrays gravados com np.lib.format.open_memmap:
+    nada do cubo precisa caber em memória.
+    """
+    os.makedirs(os.path.join(pasta, PASTA_METRICAS), exist_ok=True)
+    if indice["tipo"] == "hipercubo":
+        os.makedirs(os.path.join(pasta, PASTA_PARAMETROS), exist_ok=True)
+
+    trocas = []
+    for chave, caminho in _caminhos_arrays(pasta, indice).items():
+        dtype = (np.bool_ if chave == "feito"
+                 else np.float64 if chave.startswith("parametro:") else np.float32)
+        novo = np.lib.format.open_memmap(caminho + ".novo.npy", mode="w+",
+                                         dtype=dtype, shape=forma)
+        novo[...] = False if chave == "feito" else np.nan
+        antigo = np.load(caminho, mmap_mode="r") if os.path.exists(caminho) else None
+        copiar(chave, novo, antigo)
+        novo.flush()
+        del novo, antigo
+        trocas.append((caminho + ".novo.npy", caminho))
+
+    for temporario, caminho in trocas:
+        os.replace(temporario, caminho)
+    _gravar_indice(pasta, indice)
+
+
+def _preencher(pasta: str, parametros_das_celulas, n_processos: int | None,
+               celulas_por_tarefa: int, verbose: bool) -> int:
+    """
+    Simula as células ainda não prontas e grava cada tarefa no cubo assim
+    que ela termina (feito marcado a cada TAREFAS_POR_GRAVACAO tarefas, então
+    uma execução interrompida recomeça de onde parou). Retorna quantas
+    células foram simuladas.
+    """
+    indice = _ler_indice(pasta)
+    caminhos = _caminhos_arrays(pasta, indice)
+    feito = np.load(caminhos["feito"], mmap_mode="r+")
+    metricas = {m: np.load(caminhos[m], mmap_mode="r+") for m in METRICAS_CUBO}
+    planos = {m: a.reshape(-1) for m, a in metricas.items()}
+    feito_plano = feito.reshape(-1)
+
+    pendentes = np.flatnonzero(~feito_plano)
+    opcoes = dict(n_replicacoes=indice["n_replicacoes"], horizonte=indice["horizonte"],
+                  cenario=indice["cenario"], seed=indice["seed"])
+    tarefas = [(celulas, parametros_das_celulas(celulas), opcoes)
+               for celulas in (pendentes[i:i + celulas_por_tarefa]
+                               for i in range(0, len(pendentes), celulas_por_tarefa))]
+    if verbose:
+        print(f"  {len(pendentes)} de {feito_plano.size} celulas a simular "
+              f"({len(tarefas)} tarefas)")
+
+    concluidas = 0
+
+    def gravar(celulas, valores):
+        nonlocal concluidas
+        for m in METRICAS_CUBO:
+            planos[m][celulas] = valores[m]
+        feito_plano[celulas] = True
+        concluidas += 1
+        if concluidas % TAREFAS_POR_GRAVACAO == 0:
+            for a in metricas.values():
+                a.flush()
+            feito.flush()
+
+    if n_processos == 1 or len(tarefas) <= 1:
+        for tarefa in tarefas:
+            gravar(*_avaliar_tarefa(*tarefa))
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos or os.cpu_count()) as pool:
+            futuros = [pool.submit(_avaliar_tarefa, *t) for t in tarefas]
+            for futuro in as_completed(futuros):
+                gravar(*futuro.result())
+
+    for a in metricas.values():
+        a.flush()
+    feito.flush()
+    return len(pendentes)
+
+
+def _conferir_compatibilidade(indice: dict, novo: dict):
+    """Só estende cubos simulados com as mesmas opções e parâmetros fixos."""
+    for chave in ("tipo", "cenario", "n_replicacoes", "horizonte", "seed", "base"):
+        if indice[chave] != novo[chave]:
+            raise ValueError(f"O cubo existente tem outro valor de '{chave}': "
+                             f"{indice[chave]!r} (pedido: {novo[chave]!r})")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. CONSTRUÇÃO E EXTENSÃO DOS CUBOS
+# ══════════════════════════════════════════════════════════════════════════════
+def construir_cubo(pasta: str = PASTA_CUBO, eixos: dict | None = None,
+                   base: dict | None = None, cenario: str = "B",
+                   n_replicacoes: int = REPLICACOES_SENSIBILIDADE,
+                   horizonte: int = HORIZONTE, seed: int | None = SEED,
+                   n_processos: int | None = None,
+                   celulas_por_tarefa: int = CELULAS_POR_TAREFA,
+                   verbose: bool = True) -> "CuboSensibilidade":
+    """
+    Planejamento fatorial completo: uma dimensão do cubo por eixo
+    ({nome: valores}), demais parâmetros fixos em `base` (ou VALORES_BASE).
+
+    Se `pasta` já tem um cubo com os mesmos eixos e opções, os valores
+    pedidos são unidos aos existentes (cada eixo fica ordenado) e só as
+    células novas são simuladas.
+    """
+    if cenario not in ("A", "B"):
+        raise ValueError("cenario deve ser 'A' ou 'B'")
+    if not eixos:
+        raise ValueError("Informe ao menos um eixo")
+    _validar_nomes(eixos)
+    novo = {
+        "versao": 1, "tipo": "fatorial", "cenario": cenario,
+        "n_replicacoes": int(n_replicacoes), "horizonte": int(horizonte),
+        "seed": seed, "base": _base_completa(base, eixos),
+        "eixos": {n: np.unique(np.asarray(v, dtype=float)).tolist()
+                  for n, v in eixos.items()},
+    }
+    os.makedirs(pasta, exist_ok=True)
+    indice = _ler_indice(pasta)
+
+    if indice is None:
+        forma = tuple(len(v) for v in novo["eixos"].values())
+        _reescrever(pasta, novo, forma, lambda chave, a, b: None)
+    else:
+        if list(indice.get("eixos", {})) != list(novo["eixos"]):
+            raise ValueError(f"O cubo existente varia {list(indice.get('eixos', {}))}; "
+                             f"pedido: {list(novo['eixos'])}")
+        _conferir_compatibilidade(indice, novo)
+        eixos_unidos = {n: np.union1d(indice["eixos"][n], novo["eixos"][n]).tolist()
+                        for n in novo["eixos"]}
+        if eixos_unidos != indice["eixos"]:
+            # Posição de cada valor antigo no eixo ampliado
+            posicoes = np.ix_(*(np.searchsorted(eixos_unidos[n], indice["eixos"][n])
+                                for n in eixos_unidos))
+
+            def copiar(chave, a, b):
+                a[posicoes] = b
+
+            novo["eixos"] = eixos_unidos
+            forma = tuple(len(v) for v in eixos_unidos.values())
+            _reescrever(pasta, novo, forma, copiar)
+
+    cubo = CuboSensibilidade(pasta)
+
+    def parametros_das_celulas(celulas):
+        posicoes = np.unravel_index(celulas, cubo.forma)
+        parametros = {n: np.full(len(celulas), v) for n, v in cubo.base.items()}
+        for n, pos in zip(cubo.nomes_eixos, posicoes):
+            parametros[n] = cubo.eixos[n][pos]
+        return parametros
+
+    _preencher(pasta, parametros_das_celulas, n_processos, celulas_por_tarefa, verbose)
+    return CuboSensibilidade(pasta)
+
+
+def amostrar_hipercubo(pasta: str, limites: dict, n_pontos: int,
+                       base: dict | None = None, cenario: str = "B",
+                       n_replicacoes: int = REPLICACOES_SENSIBILIDADE,
+                       horizonte: int = HORIZONTE, seed: int | None = SEED,
+                       n_processos: int | None = None,
+                       celulas_por_tarefa: int = CELULAS_POR_TAREFA,
+                       verbose: bool = True) -> "CuboSensibilidade":
+    """
+    Hipercubo latino de n_pontos dentro de `limites` ({nome: (mín, máx)}).
+
+    Se `pasta` já tem uma amostra com os mesmos limites e opções, acrescenta
+    um novo lote de n_pontos (outro hipercubo, sorteado a partir de seed e
+    do número de pontos existentes) e só simula os pontos novos.
+    """
+    if cenario not in ("A", "B"):
+        raise ValueError("cenario deve ser 'A' ou 'B'")
+    _validar_nomes(limites)
+    novo = {
+        "versao": 1, "tipo": "hipercubo", "cenario": cenario,
+        "n_replicacoes": int(n_replicacoes), "horizonte": int(horizonte),
+        "seed": seed, "base": _base_completa(base, limites),
+        "limites": {n: [float(a), float(b)] for n, (a, b) in limites.items()},
+    }
+    os.makedirs(pasta, exist_ok=True)
+    indice = _ler_indice(pasta)
+    if indice is not None:
+        _conferir_compatibilidade(indice, novo)
+        if indice["limites"] != novo["limites"]:
+            raise ValueError(f"A amostra existente usa os limites {indice['limites']}")
+    n_antigos = 0 if indice is None else indice["n_pontos"]
+
+    sorteio = np.random.SeedSequence([seed if seed is not None else 0, n_antigos])
+    amostra = hipercubo_latino(limites, n_pontos, seed=sorteio)
+    novo["n_pontos"] = n_antigos + n_pontos
+
+    def copiar(chave, a, b):
+        if b is not None:
+            a[:n_antigos] = b
+        if chave.startswith("parametro:"):
+            a[n_antigos:] = amostra[chave.split(":", 1)[1]]
+
+    _reescrever(pasta, novo, (novo["n_pontos"],), copiar)
+    cubo = CuboSensibilidade(pasta)
+
+    def parametros_das_celulas(celulas):
+        parametros = {n: np.full(len(celulas), v) for n, v in cubo.base.items()}
+        for n, valores in cubo.parametros.items():
+            parametros[n] = valores[celulas]
+        return parametros
+
+    _preencher(pasta, parametros_das_celulas, n_processos, celulas_por_tarefa, verbose)
+    return CuboSensibilidade(pasta)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 5. LEITURA
+# ══════════════════════════════════════════════════════════════════════════════
+class CuboSensibilidade:
+    """
+    Cubo gravado por construir_cubo ou amostrar_hipercubo, aberto só para
+    leitura. As métricas são memmaps: fatiar lê do disco apenas as células
+    da fatia.
+    """
+
+    def __init__(self, pasta: str = PASTA_CUBO):
+        indice = _ler_indice(pasta)
+        if indice is None:
+            raise FileNotFoundError(f"Nenhum cubo de sensibilidade em {pasta}")
+        self.pasta = pasta
+        self.indice = indice
+        self.tipo = indice["tipo"]
+        self.base = indice["base"]
+        caminhos = _caminhos_arrays(pasta, indice)
+        self.feito = np.load(caminhos["feito"], mmap_mode="r")
+        self.metricas = {m: np.load(caminhos[m], mmap_mode="r") for m in METRICAS_CUBO}
+        if self.tipo == "fatorial":
+            self.eixos = {n: np.asarray(v) for n, v in indice["eixos"].items()}
+            self.parametros = {}
+        else:
+            self.eixos = {}
+            self.parametros = {n: np.load(caminhos[f"parametro:{n}"], mmap_mode="r")
+                               for n in indice["limites"]}
+
+    @property
+    def nomes_eixos(self) -> list[str]:
+        return list(self.eixos)
+
+    @property
+    def forma(self) -> tuple:
+        return self.feito.shape
+
+    @property
+    def completo(self) -> bool:
+        return bool(self.feito.all())
+
+    def __getitem__(self, metrica: str) -> np.ndarray:
+        return self.metricas[metrica]
+
+    def posicao(self, eixo: str, valor: float) -> int:
+        """Índice do valor do eixo mais próximo de `valor`."""
+        return int(np.abs(self.eixos[eixo] - valor).argmin())
+
+    def fatia(self, metrica: str, **fixos) -> tuple[list[str], np.ndarray]:
+        """
+        Fixa alguns eixos (no valor da grade mais próximo do pedido) e devolve
+        (eixos livres, array da métrica sobre eles). Eixos não citados ficam
+        livres, na ordem do cubo.
+        """
+        if self.tipo != "fatorial":
+            raise ValueError("fatia só se aplica a cubos fatoriais")
+        desconhecidos = [n for n in fixos if n not in self.eixos]
+        if desconhecidos:
+            raise ValueError(f"Eixos desconhecidos: {desconhecidos} "
+                             f"(o cubo varia {self.nomes_eixos})")
+        seletor = tuple(self.posicao(n, fixos[n]) if n in fixos else slice(None)
+                        for n in self.eixos)
+        livres = [n for n in self.eixos if n not in fixos]
+        return livres, np.asarray(self.metricas[metrica][seletor])
+
+    def tabela(self):
+        """
+        Todas as células prontas num DataFrame: parâmetros variados e métricas.
+        Parâmetros com nome de métrica (custo_pedido, custo_falta) ganham o
+        sufixo _parametro.
+        """
+        import pandas as pd
+
+        feito = np.asarray(self.feito).reshape(-1)
+        if self.tipo == "fatorial":
+            grades = np.meshgrid(*self.eixos.values(), indexing="ij")
+            variados = {n: g.reshape(-1) for n, g in zip(self.eixos, grades)}
+        else:
+            variados = {n: np.asarray(v) for n, v in self.parametros.items()}
+        colunas = {(f"{n}_parametro" if n in METRICAS_CUBO else n): v[feito]
+                   for n, v in variados.items()}
+        for m in METRICAS_CUBO:
+            colunas[m] = np.asarray(self.metricas[m]).reshape(-1)[feito]
+        return pd.DataFrame(colunas)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 6. LINHA DE COMANDO
+# ══════════════════════════════════════════════════════════════════════════════
+def main():
+    parser = argparse.ArgumentParser(
+        description="Constroi ou estende um cubo de sensibilidade em disco.")
+    parser.add_argument("pasta", nargs="?", default=PASTA_CUBO)
+    parser.add_argument("--eixo", nargs="+", action="append", default=[],
+                        metavar=("NOME", "VALOR"),
+                        help="eixo do fatorial: nome seguido dos valores")
+    parser.add_argument("--hipercubo", type=int, default=None, metavar="N",
+                        help="sorteia N pontos por hipercubo latino")
+    parser.add_argument("--limite", nargs=3, action="append", default=[],
+                        metavar=("NOME", "MIN", "MAX"),
+                        help="limites de um parametro do hipercubo")
+    parser.add_argument("--fixo", nargs=2, action="append", default=[],
+                        metavar=("NOME", "VALOR"), help="valor de um parametro fixo")
+    parser.add_argument("--cenario", choices=("A", "B"), default="B")
+    parser.add_argument("--replicacoes", type=int, default=REPLICACOES_SENSIBILIDADE)
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    opcoes = dict(base={n: float(v) for n, v in args.fixo}, cenario=args.cenario,
+                  n_replicacoes=args.replicacoes, horizonte=args.horizonte,
+                  seed=args.seed, n_processos=args.processos)
+    if args.hipercubo:
+        if not args.limite:
+            parser.error("--hipercubo exige ao menos um --limite")
+        limites = {n: (float(a), float(b)) for n, a, b in args.limite}
+        print(f"Hipercubo latino: {args.hipercubo} pontos em {', '.join(limites)}")
+        cubo = amostrar_hipercubo(args.pasta, limites, args.hipercubo, **opcoes)
+    else:
+        if not args.eixo or any(len(e) < 2 for e in args.eixo):
+            parser.error("informe --eixo NOME VALOR [VALOR ...] (ou --hipercubo)")
+        eixos = {e[0]: [float(v) for v in e[1:]] for e in args.eixo}
+        print(f"Fatorial: {' x '.join(f'{n}({len(v)})' for n, v in eixos.items())}")
+        cubo = construir_cubo(args.pasta, eixos, **opcoes)
+
+    print(f"Cubo salvo em: {args.pasta} (forma {cubo.forma}, "
+          f"{int(np.count_nonzero(cubo.feito))} celulas prontas)")
+
+
+if __name__ == "__main__":
+    main()
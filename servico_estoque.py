@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Serviço local de avaliação de políticas (Q, ROP) em lote.
+
+  • Cada pedido é um objeto JSON com os parâmetros de um SKU (demanda,
+    lead time, custos, nível de serviço e, opcionalmente, Q e ROP; os
+    ausentes vêm das constantes do núcleo, Q e ROP das fórmulas de
+    calcular_parametros_lote) e o número de réplicas
+  • Micro-lotes: os pedidos que chegam são agrupados até juntar
+    LOTE_MAX_REPLICACOES réplicas ou até o mais antigo esperar
+    LATENCIA_MAXIMA segundos; cada lote vira uma única chamada vetorizada
+    de simular_estoque_lote (uma linha por SKU × réplica) num pool de
+    processos
+  • O pedido com seed s usa as sementes s, s+1, ... (como
+    simular_estoque_lote(seed=s)): o resultado não depende de com quem ele
+    foi agrupado
+  • Dois modos: JSONL em stdin/stdout (uma resposta por linha, na ordem da
+    entrada, escrita assim que fica pronta) e HTTP em localhost
+    (POST /avaliar com JSONL, resposta em fluxo; GET /estatisticas)
+  • Estatísticas: pedidos avaliados e réplicas por segundo, erros de
+    avaliação e linhas rejeitadas (contados à parte), tamanho médio dos
+    lotes e latências p50/p99 (da chegada do pedido à resposta pronta)
+
+Uso:
+    python servico_estoque.py jsonl < pedidos.jsonl > resultados.jsonl
+    python servico_estoque.py http --porta 8765
+    curl --data-binary @pedidos.jsonl http://127.0.0.1:8765/avaliar
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from nucleo_estoque import (
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    NIVEL_SERVICO_ALVO, TAMANHO_BLOCO_REPLICACOES, quantil_normal,
+    calcular_parametros_lote, simular_estoque_lote,
+)
+
+REPLICACOES_PADRAO = 100           # réplicas por pedido, se não informadas
+REPLICACOES_MAX_PEDIDO = 10000     # limita o tempo de um único pedido
+HORIZONTE_MAX = 20 * HORIZONTE     # dias por réplica (20 anos)
+# Réplica-dias por bloco do motor: com horizontes longos o bloco encolhe e a
+# memória do trabalhador fica a mesma do horizonte padrão
+REPLICA_DIAS_POR_BLOCO = TAMANHO_BLOCO_REPLICACOES * HORIZONTE
+SEMENTE_MAX = 2**32                # RandomState aceita sementes em [0, 2**32)
+LOTE_MAX_REPLICACOES = 2**14       # SKUs × réplicas por lote (~1 s de simulação)
+LATENCIA_MAXIMA = 0.05             # s que um pedido espera o lote encher
+LOTES_EM_VOO_POR_PROCESSO = 2      # lotes no pool por processo (o resto espera e engorda o lote)
+LATENCIAS_GUARDADAS = 100_000      # janela dos percentis de latência
+PEDIDOS_PENDENTES_MAX = 100_000    # respostas aguardando escrita no modo JSONL (limita memória)
+PORTA_PADRAO = 8765
+
+# Campos aceitos em cada pedido e seus valores padrão
+CAMPOS_PEDIDO = {
+    "demanda_media": DEMANDA_MEDIA,
+    "demanda_desvio": DEMANDA_DESVIO,
+    "lt_media": LEAD_TIME_MEDIO,
+    "lt_desvio": LEAD_TIME_DESVIO,
+    "custo_pedido": CUSTO_PEDIDO,
+    "custo_manutencao": CUSTO_MANUTENCAO,
+    "custo_falta": CUSTO_FALTA,
+    "nivel_servico": NIVEL_SERVICO_ALVO,
+}
+CAMPOS_CONTROLE = ("id", "Q", "ROP", "n_replicacoes", "seed", "horizonte")
+METRICAS_SERVICO = ("custo_pedido", "custo_manut", "custo_falta", "custo_total",
+                    "nivel_servico", "n_pedidos")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. PEDIDOS E AVALIAÇÃO VETORIZADA
+# ══════════════════════════════════════════════════════════════════════════════
+def validar_pedido(obj) -> dict:
+    """Pedido completo (padrões preenchidos) ou ValueError com o motivo."""
+    if not isinstance(obj, dict):
+        raise ValueError("cada pedido deve ser um objeto JSON")
+    desconhecidos = sorted(set(obj) - set(CAMPOS_PEDIDO) - set(CAMPOS_CONTROLE))
+    if desconhecidos:
+        raise ValueError(f"campos desconhecidos: {desconhecidos}")
+    # true/false passariam por int()/float() como 1/0
+    booleanos = sorted(c for c, v in obj.items() if c != "id" and isinstance(v, bool))
+    if booleanos:
+        raise ValueError(f"campos numéricos não aceitam true/false: {booleanos}")
+    pedido = {"id": obj.get("id")}
+    try:
+        for campo, padrao in CAMPOS_PEDIDO.items():
+            pedido[campo] = float(obj.get(campo, padrao))
+        for campo in ("Q", "ROP"):
+            pedido[campo] = None if obj.get(campo) is None else int(obj[campo])
+        pedido["n_replicacoes"] = int(obj.get("n_replicacoes", REPLICACOES_PADRAO))
+        pedido["seed"] = int(obj.get("seed", SEED))
+        pedido["horizonte"] = int(obj.get("horizonte", HORIZONTE))
+    except (TypeError, ValueError) as erro:
+        raise ValueError(f"valor inválido: {erro}") from None
+    if not all(np.isfinite(pedido[c]) for c in CAMPOS_PEDIDO):
+        raise ValueError("os parâmetros devem ser números finitos")
+    if not 1 <= pedido["n_replicacoes"] <= REPLICACOES_MAX_PEDIDO:
+        raise ValueError(f"n_replicacoes deve estar entre 1 e {REPLICACOES_MAX_PEDIDO}")
+    if not 1 <= pedido["horizonte"] <= HORIZONTE_MAX:
+        raise ValueError(f"horizonte deve estar entre 1 e {HORIZONTE_MAX} dias")
+    if not 0 <= pedido["seed"] <= SEMENTE_MAX - pedido["n_replicacoes"]:
+        # As réplicas usam seed, seed+1, ..., seed+n_replicacoes-1
+        raise ValueError(f"seed deve estar entre 0 e {SEMENTE_MAX} - n_replicacoes")
+    if pedido["Q"] is not None and pedido["Q"] < 1:
+        raise ValueError("Q deve ser positivo")
+    if min(pedido["demanda_media"], pedido["demanda_desvio"], pedido["lt_desvio"],
+           pedido["custo_falta"]) < 0:
+        raise ValueError("demanda, desvios e custo de falta não podem ser negativos")
+    if min(pedido["lt_media"], pedido["custo_pedido"], pedido["custo_manutencao"]) <= 0:
+        raise ValueError("lead time médio, custo de pedido e custo de manutenção devem ser positivos")
+    if not 0 < pedido["nivel_servico"] < 1:
+        raise ValueError("nivel_servico deve estar entre 0 e 1")
+    return pedido
+
+
+def _avaliar_horizonte(pedidos: list[dict], horizonte: int) -> list[dict]:
+    """Pedidos de mesmo horizonte numa única chamada de simular_estoque_lote."""
+    col = {c: np.array([p[c] for p in pedidos], dtype=float) for c in CAMPOS_PEDIDO}
+    params = calcular_parametros_lote(col["demanda_media"], col["demanda_desvio"],
+                                      col["lt_media"], col["lt_desvio"],
+                                      col["custo_pedido"], col["custo_manutencao"],
+                                      col["nivel_servico"], horizonte=horizonte)
+    # EOQ arredondado pode dar 0 com demanda média nula: o lote mínimo é 1
+    Q = np.array([max(1, params["EOQ"][i]) if p["Q"] is None else p["Q"]
+                  for i, p in enumerate(pedidos)], dtype=np.int64)
+    ROP = np.array([params["ROP_B"][i] if p["ROP"] is None else p["ROP"]
+                    for i, p in enumerate(pedidos)], dtype=np.int64)
+
+    # Uma linha por (pedido, réplica): repete os parâmetros de cada pedido
+    contagens = np.array([p["n_replicacoes"] for p in pedidos])
+    inicios = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+    sementes = np.concatenate([p["seed"] + np.arange(p["n_replicacoes"], dtype=np.int64)
+                               for p in pedidos])
+
+    def rep(v):
+        return np.repeat(v, contagens)
+
+    res = simular_estoque_lote(
+        rep(Q), rep(ROP), horizonte=horizonte,
+        demanda_media=rep(col["demanda_media"]), demanda_desvio=rep(col["demanda_desvio"]),
+        lt_media=rep(col["lt_media"]), lt_desvio=rep(col["lt_desvio"]),
+        custo_pedido=rep(col["custo_pedido"]), custo_manutencao=rep(col["custo_manutencao"]),
+        custo_falta=rep(col["custo_falta"]), sementes=sementes,
+        tamanho_bloco=max(1, min(TAMANHO_BLOCO_REPLICACOES, REPLICA_DIAS_POR_BLOCO // horizonte)))
+
+    # Médias por pedido com somas por segmento (sem laço sobre as réplicas)
+    medias = {m: np.add.reduceat(np.asarray(res[m], dtype=float), inicios) / contagens
+              for m in METRICAS_SERVICO}
+    custo = np.asarray(res["custo_total"], dtype=float)
+    quadrados = np.add.reduceat((custo - rep(medias["custo_total"])) ** 2, inicios)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        meia_ic = quantil_normal(0.975) * np.sqrt(quadrados / (contagens - 1) / contagens)
+
+    return [{
+        "id": p["id"],
+        "Q": int(Q[i]),
+        "ROP": int(ROP[i]),
+        "SS": int(params["SS"][i]),
+        "n_replicacoes": p["n_replicacoes"],
+        **{m: float(medias[m][i]) for m in METRICAS_SERVICO},
+        "custo_total_ic95": float(meia_ic[i]) if contagens[i] > 1 else None,
+    } for i, p in enumerate(pedidos)]
+
+
+def avaliar_pedidos(pedidos: list[dict]) -> list[dict]:
+    """
+    Avalia pedidos já validados (ver validar_pedido), na mesma ordem. Executa
+    no processo trabalhador: uma chamada vetorizada por horizonte distinto.
+    Se a chamada de um grupo falhar, cada pedido dele é reavaliado sozinho e
+    só os que falham de novo respondem com {"id", "erro"}.
+    """
+    respostas = [None] * len(pedidos)
+    for horizonte in sorted({p["horizonte"] for p in pedidos}):
+        indices = [i for i, p in enumerate(pedidos) if p["horizonte"] == horizonte]
+        try:
+            grupo = _avaliar_horizonte([pedidos[i] for i in indices], horizonte)
+        except Exception as erro:  # noqa: BLE001  (um pedido não derruba os outros do lote)
+            grupo = ([_avaliar_isolado(pedidos[i]) for i in indices] if len(indices) > 1
+                     else [_resposta_erro(pedidos[indices[0]], erro)])
+        for i, resposta in zip(indices, grupo):
+            respostas[i] = resposta
+    return respostas
+
+
+def _avaliar_isolado(pedido: dict) -> dict:
+    try:
+        return _avaliar_horizonte([pedido], pedido["horizonte"])[0]
+    except Exception as erro:  # noqa: BLE001  (o erro vai na resposta do pedido)
+        return _resposta_erro(pedido, erro)
+
+
+def _resposta_erro(pedido: dict, erro: Exception) -> dict:
+    return {"id": pedido["id"], "erro": f"{type(erro).__name__}: {erro}"}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. ESTATÍSTICAS DO SERVIÇO
+# ══════════════════════════════════════════════════════════════════════════════
+class EstatisticasServico:
+    """
+    Contadores e latências recentes (seguro entre threads). `pedidos` são os
+    avaliados no pool, `erros` os que falharam na avaliação e `rejeitados`
+    as linhas recusadas antes do pool (JSON ou parâmetros inválidos).
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._latencias = deque(maxlen=LATENCIAS_GUARDADAS)
+        self._inicio = time.perf_counter()
+        self.pedidos = 0
+        self.erros = 0
+        self.rejeitados = 0
+        self.lotes = 0
+        self.replicacoes = 0
+
+    def registrar_lote(self, latencias: list[float], replicacoes: int):
+        with self._trava:
+            self.lotes += 1
+            self.pedidos += len(latencias)
+            self.replicacoes += replicacoes
+            self._latencias.extend(latencias)
+
+    def registrar_erro(self):
+        with self._trava:
+            self.erros += 1
+
+    def registrar_rejeitado(self):
+        with self._trava:
+            self.rejeitados += 1
+
+    def relatorio(self) -> dict:
+        with self._trava:
+            segundos = time.perf_counter() - self._inicio
+            latencias = np.array(self._latencias) * 1000
+            p50, p99 = np.percentile(latencias, [50, 99]) if len(latencias) else (0.0, 0.0)
+            return {
+                "pedidos": self.pedidos,
+                "erros": self.erros,
+                "rejeitados": self.rejeitados,
+                "lotes": self.lotes,
+                "pedidos_por_lote": self.pedidos / self.lotes if self.lotes else 0.0,
+                "replicacoes": self.replicacoes,
+                "segundos": segundos,
+                "pedidos_por_s": self.pedidos / segundos,
+                "replicacoes_por_s": self.replicacoes / segundos,
+                "latencia_p50_ms": float(p50),
+                "latencia_p99_ms": float(p99),
+                "latencia_max_ms": float(latencias.max()) if len(latencias) else 0.0,
+            }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. MICRO-LOTES
+# ══════════════════════════════════════════════════════════════════════════════
+class MicroLotes:
+    """
+    Junta pedidos em lotes (até `max_replicacoes` réplicas ou `latencia_max`
+    segundos de espera do mais antigo) e avalia cada lote no pool.
+    submeter() devolve um Future com o dicionário de resposta; pedidos
+    inválidos respondem na hora com {"id", "erro"}. n_processos=1 avalia
+    numa thread do processo atual.
+    """
+
+    def __init__(self, n_processos: int | None = None,
+                 max_replicacoes: int = LOTE_MAX_REPLICACOES,
+                 latencia_max: float = LATENCIA_MAXIMA):
+        n_processos = n_processos or os.cpu_count()
+        self._pool = (ThreadPoolExecutor(max_workers=1) if n_processos == 1
+                      else ProcessPoolExecutor(max_workers=n_processos))
+        # Com o pool ocupado os pedidos se acumulam na fila e o próximo lote sai maior
+        self._vagas = threading.Semaphore(LOTES_EM_VOO_POR_PROCESSO * n_processos)
+        self.max_replicacoes = max_replicacoes
+        self.latencia_max = latencia_max
+        self.estatisticas = EstatisticasServico()
+        self._fila = queue.Queue()
+        self._montador = threading.Thread(target=self._montar, name="micro-lotes", daemon=True)
+        self._montador.start()
+
+    def submeter(self, obj) -> Future:
+        futuro = Future()
+        try:
+            pedido = validar_pedido(obj)
+        except ValueError as erro:
+            self.estatisticas.registrar_rejeitado()
+            futuro.set_result({"id": obj.get("id") if isinstance(obj, dict) else None,
+                               "erro": str(erro)})
+            return futuro
+        self._fila.put((pedido, futuro, time.perf_counter()))
+        return futuro
+
+    def encerrar(self):
+        """Avalia o que está na fila e libera o pool."""
+        self._fila.put(None)
+        self._montador.join()
+        self._pool.shutdown(wait=True)
+
+    def _montar(self):
+        encerrar = False
+        while not encerrar:
+            item = self._fila.get()
+            if item is None:
+                break
+            lote = [item]
+            replicacoes = item[0]["n_replicacoes"]
+            prazo = item[2] + self.latencia_max
+            while replicacoes < self.max_replicacoes:
+                try:
+                    item = self._fila.get(timeout=max(0.0, prazo - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    encerrar = True
+                    break
+                lote.append(item)
+                replicacoes += item[0]["n_replicacoes"]
+            self._despachar(lote, replicacoes)
+
+    def _despachar(self, lote: list, replicacoes: int):
+        self._vagas.acquire()
+        instr.contar("servico:lotes")
+        futuro_lote = self._pool.submit(avaliar_pedidos, [pedido for pedido, _, _ in lote])
+
+        def entregar(f):
+            self._vagas.release()
+            try:
+                respostas = f.result()
+            except Exception as erro:  # noqa: BLE001  (o erro vai na resposta de cada pedido)
+                respostas = [{"id": p["id"], "erro": f"{type(erro).__name__}: {erro}"}
+                             for p, _, _ in lote]
+            agora = time.perf_counter()
+            self.estatisticas.registrar_lote([agora - t for _, _, t in lote], replicacoes)
+            for (_, futuro, _), resposta in zip(lote, respostas):
+                if "erro" in resposta:
+                    self.estatisticas.registrar_erro()
+                futuro.set_result(resposta)
+
+        futuro_lote.add_done_callback(entregar)
+
+
+def _decodificar_linha(linha: str, numero: int):
+    """Objeto da linha JSONL ou, se não for JSON, uma resposta de erro pronta."""
+    try:
+        return json.loads(linha), None
+    except json.JSONDecodeError as erro:
+        return None, {"id": None, "linha": numero, "erro": f"JSON inválido: {erro.msg}"}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. MODOS JSONL E HTTP
+# ══════════════════════════════════════════════════════════════════════════════
+def servir_jsonl(entrada, saida, lotes: MicroLotes):
+    """
+    Lê pedidos de `entrada` (um JSON por linha) e escreve as respostas em
+    `saida`, na ordem da entrada, assim que cada uma fica pronta.
+    """
+    respostas = queue.Queue(maxsize=PEDIDOS_PENDENTES_MAX)
+
+    def escrever():
+        while (futuro := respostas.get()) is not None:
+            saida.write(json.dumps(futuro.result(), ensure_ascii=False) + "\n")
+            saida.flush()
+
+    escritor = threading.Thread(target=escrever, name="jsonl-saida", daemon=True)
+    escritor.start()
+    for numero, linha in enumerate(entrada, 1):
+        if not linha.strip():
+            continue
+        obj, erro = _decodificar_linha(linha, numero)
+        if erro is not None:
+            lotes.estatisticas.registrar_rejeitado()
+            futuro = Future()
+            futuro.set_result(erro)
+        else:
+            futuro = lotes.submeter(obj)
+        respostas.put(futuro)
+    respostas.put(None)
+    escritor.join()
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # resposta em fluxo (chunked)
+    lotes: MicroLotes = None
+
+    def log_message(self, formato, *args):
+        pass  # uma linha por requisição atrapalharia a saída do serviço
+
+    def _json(self, status: int, corpo: dict):
+        dados = json.dumps(corpo, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path == "/estatisticas":
+            self._json(200, self.lotes.estatisticas.relatorio())
+        else:
+            self._json(404, {"erro": "use POST /avaliar ou GET /estatisticas"})
+
+    def do_POST(self):
+        if self.path != "/avaliar":
+            self._json(404, {"erro": "use POST /avaliar ou GET /estatisticas"})
+            return
+        tamanho = int(self.headers.get("Content-Length", 0))
+        linhas = self.rfile.read(tamanho).decode("utf-8").splitlines()
+        futuros = []
+        for numero, linha in enumerate(linhas, 1):
+            if not linha.strip():
+                continue
+            obj, erro = _decodificar_linha(linha, numero)
+            if erro is None:
+                futuros.append(self.lotes.submeter(obj))
+            else:
+                self.lotes.estatisticas.registrar_rejeitado()
+                futuros.append(Future())
+                futuros[-1].set_result(erro)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for futuro in futuros:
+            dados = (json.dumps(futuro.result(), ensure_ascii=False) + "\n").encode()
+            self.wfile.write(f"{len(dados):X}\r\n".encode() + dados + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128        # conexões simultâneas aguardando aceite (padrão: 5)
+
+
+def criar_servidor(lotes: MicroLotes, porta: int = PORTA_PADRAO,
+                   host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Servidor HTTP (uma thread por conexão) ligado a `lotes`."""
+    manipulador = type("Manipulador", (_Manipulador,), {"lotes": lotes})
+    return _Servidor((host, porta), manipulador)
+
+
+def _imprimir_estatisticas(relatorio: dict, arquivo=sys.stderr):
+    print(f"  {relatorio['pedidos']} pedidos avaliados ({relatorio['erros']} com erro), "
+          f"{relatorio['rejeitados']} rejeitados em "
+          f"{relatorio['segundos']:.2f} s: {relatorio['pedidos_por_s']:,.0f} pedidos avaliados/s, "
+          f"{relatorio['replicacoes_por_s']:,.0f} replicas/s", file=arquivo)
+    print(f"  {relatorio['lotes']} lotes ({relatorio['pedidos_por_lote']:.1f} pedidos/lote), "
+          f"latencia p50 {relatorio['latencia_p50_ms']:.1f} ms, "
+          f"p99 {relatorio['latencia_p99_ms']:.1f} ms", file=arquivo)
+
+
+def main(argv=None):
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--processos", type=int, default=None)
+    comum.add_argument("--latencia-max", type=float, default=LATENCIA_MAXIMA,
+                       help="segundos que um pedido espera o lote encher")
+    comum.add_argument("--lote-max", type=int, default=LOTE_MAX_REPLICACOES,
+                       help="replicas (SKUs x replicas) por lote")
+    parser = argparse.ArgumentParser(description="Servico local de avaliacao de politicas (Q, ROP) em lote.")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    sub.add_parser("jsonl", parents=[comum], help="pedidos em stdin, respostas em stdout")
+    p_http = sub.add_parser("http", parents=[comum], help="POST /avaliar e GET /estatisticas em localhost")
+    p_http.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    args = parser.parse_args(argv)
+
+    lotes = MicroLotes(args.processos, args.lote_max, args.latencia_max)
+    if args.modo == "jsonl":
+        servir_jsonl(sys.stdin, sys.stdout, lotes)
+        lotes.encerrar()
+        _imprimir_estatisticas(lotes.estatisticas.relatorio())
+        return
+
+    servidor = criar_servidor(lotes, args.porta)
+    print(f"Servico em http://127.0.0.1:{args.porta} (POST /avaliar, GET /estatisticas);"
+          f" Ctrl+C encerra", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        lotes.encerrar()
+        _imprimir_estatisticas(lotes.estatisticas.relatorio())
+
+
+if __name__ == "__main__":
+    main()
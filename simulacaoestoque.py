@@ -6,409 +6,491 @@ Compara dois cenários de gerenciamento de estoque:
   • Cenário B – ROP estocástico (com estoque de segurança, nível de serviço 95%)
 
 Seed  : 111
+
+Linha de comando (sem subcomando gera o relatório completo):
+    python simulacaoestoque.py                  # cenários + resumo + 7 figuras
+    python simulacaoestoque.py simular          # cenários A/B e resumo no console
+    python simulacaoestoque.py varrer tradeoff  # varredura da Fig 6 (ou sigma-lt, Fig 7)
+    python simulacaoestoque.py varrer sigma-lt --adaptativo   # réplicas até o IC atingir a meta
+    python simulacaoestoque.py graficos         # figuras (carrega matplotlib/seaborn)
+    python simulacaoestoque.py importacao       # mede o tempo de importação dos módulos
+    python simulacaoestoque.py otimizar         # (Q, ROP) ótimo por simulação
+    python simulacaoestoque.py longo            # horizonte de décadas, estatísticas em fluxo
+    python simulacaoestoque.py analitico        # aproximação analítica vs simulação
+    python simulacaoestoque.py politicas        # (Q, ROP), (s, S), (R, S) e estoque base
+    python simulacaoestoque.py raro             # rupturas a 99%+ por amostragem por importância
+    python simulacaoestoque.py simular --perfil perfil.json   # tempos por fase e contadores
+    python simulacaoestoque.py simular --gerador pcg64        # Generator/PCG64 em vez do legado
+    python simulacaoestoque.py cache --limpar   # resultados guardados em .cache_simulacao/
+
+Cenários e varreduras ficam no cache em disco (cache_estoque.py), com chave no
+número de réplicas, na semente, no gerador e no código do motor; --sem-cache
+recalcula.
+
+O núcleo (parâmetros e motores de simulação) está em nucleo_estoque.py e é
+reexportado aqui. Módulos pesados só são importados pelo subcomando que
+precisa deles.
 """
 
+import argparse
+import subprocess
 import sys
-import os
-
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import norm
-
-# ══════════════════════════════════════════════════════════════════════════════
-# 1. PARÂMETROS GLOBAIS
-# ══════════════════════════════════════════════════════════════════════════════
-SEED = 111
-np.random.seed(SEED)
 
-HORIZONTE = 365                    # dias
-DEMANDA_MEDIA = 100                # μ_d (unidades/dia)
-DEMANDA_DESVIO = 20                # σ_d
-
-LEAD_TIME_MEDIO = 5                # μ_L (dias)
-LEAD_TIME_DESVIO = 1.5             # σ_L
+from nucleo_estoque import (  # noqa: F401  (reexportados para quem importa este módulo)
+    SEED, HORIZONTE, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, CUSTO_PEDIDO, CUSTO_MANUTENCAO, CUSTO_FALTA,
+    NIVEL_SERVICO_ALVO, Z_SCORE, EOQ, ROP_A, SS_B, ROP_B, N_REPLICACOES,
+    TAMANHO_BLOCO_REPLICACOES, quantil_normal, calcular_parametros_lote,
+    simular_estoque, simular_estoque_lote, simular_estoque_eventos,
+    simular_estoque_fluxo, resumir_replicacoes, EstatisticasOnline,
+)
+from aleatorio_estoque import GERADORES, GERADOR_PADRAO
 
-CUSTO_PEDIDO = 150.0               # S  (R$/pedido)
-CUSTO_MANUTENCAO = 5.0             # H  (R$/un/ano)
-CUSTO_FALTA = 20.0                 # Shortage (R$/un perdida)
+# Módulos medidos pelo subcomando `importacao` e dependências que não devem
+# ser carregadas só por importar o núcleo
+MODULOS_PROJETO = ("nucleo_estoque", "simulacaoestoque", "varredura_estoque",
+                   "portfolio_estoque", "graficos_estoque", "otimizador_estoque",
+                   "analitico_estoque", "sensibilidade_estoque",
+                   "historico_estoque", "politicas_estoque",
+                   "instrumentacao_estoque", "cache_estoque", "raridade_estoque",
+                   "rede_estoque", "aleatorio_estoque", "tarefas_estoque",
+                   "servico_estoque", "reducao_estoque")
+MODULOS_PESADOS = ("matplotlib", "seaborn", "scipy", "pandas")
 
-NIVEL_SERVICO_ALVO = 0.95          # Para cenário B
-Z_SCORE = norm.ppf(NIVEL_SERVICO_ALVO)   # ≈ 1.645
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 2. CÁLCULOS ANALÍTICOS (EOQ, ROP, SS)
+# 4. EXECUTAR CENÁRIOS A e B
 # ══════════════════════════════════════════════════════════════════════════════
-demanda_anual = DEMANDA_MEDIA * HORIZONTE  # D anual
-
-# EOQ clássico: Q* = sqrt(2·D·S / H)
-EOQ = np.sqrt(2 * demanda_anual * CUSTO_PEDIDO / CUSTO_MANUTENCAO)
-EOQ = round(EOQ)
+def executar_cenarios(n_replicacoes: int = N_REPLICACOES, seed: int = SEED,
+                      gerador: str = GERADOR_PADRAO) -> dict:
+    """Trajetória de referência e Monte Carlo dos cenários A e B."""
+    lote = dict(n_replicacoes=n_replicacoes, seed=seed, gerador=gerador)
+    return {
+        "resultado_A": simular_estoque(Q=EOQ, ROP=ROP_A, seed=seed, gerador=gerador),
+        "resultado_B": simular_estoque(Q=EOQ, ROP=ROP_B, seed=seed, gerador=gerador),
+        # Monte Carlo: N réplicas por cenário (réplica 0 = trajetória acima no legado)
+        "mc_A": simular_estoque_lote(Q=EOQ, ROP=ROP_A, **lote),
+        "mc_B": simular_estoque_lote(Q=EOQ, ROP=ROP_B, **lote),
+    }
 
-# ── Cenário A: ROP determinístico (sem segurança) ──────────────────────────
-ROP_A = DEMANDA_MEDIA * LEAD_TIME_MEDIO                       # = 500 un
 
-# ── Cenário B: ROP com estoque de segurança ─────────────────────────────────
-SS_B = Z_SCORE * np.sqrt(
-    LEAD_TIME_MEDIO * DEMANDA_DESVIO**2
-    + DEMANDA_MEDIA**2 * LEAD_TIME_DESVIO**2
-)
-SS_B = round(SS_B)
-ROP_B = DEMANDA_MEDIA * LEAD_TIME_MEDIO + SS_B
+# ══════════════════════════════════════════════════════════════════════════════
+# 5. RESUMO NO CONSOLE
+# ══════════════════════════════════════════════════════════════════════════════
+def imprimir_resumo(cenarios: dict):
+    print(f"\n{'-'*65}")
+    print(f"  PARAMETROS CALCULADOS")
+    print(f"{'-'*65}")
+    print(f"  EOQ (Q*)          = {EOQ} unidades")
+    print(f"  ROP Cenario A     = {ROP_A} unidades (sem seguranca)")
+    print(f"  ROP Cenario B     = {ROP_B} unidades (com SS)")
+    print(f"  Estoque Seg. (SS) = {SS_B} unidades")
+    print(f"  Z (95%)           = {Z_SCORE:.4f}")
+
+    for label, res in [("A (Deterministico)", cenarios["resultado_A"]),
+                       ("B (Estocastico 95%)", cenarios["resultado_B"])]:
+        print(f"\n{'-'*65}")
+        print(f"  CENARIO {label}")
+        print(f"{'-'*65}")
+        print(f"  Custo de Pedido    = R$ {res['custo_pedido']:>12,.2f}")
+        print(f"  Custo de Manutencao= R$ {res['custo_manut']:>12,.2f}")
+        print(f"  Custo de Falta     = R$ {res['custo_falta']:>12,.2f}")
+        print(f"  Custo Total        = R$ {res['custo_total']:>12,.2f}")
+        print(f"  Nivel de Servico   = {res['nivel_servico']*100:.1f}%")
+
+    n_replicacoes = len(cenarios["mc_A"]["custo_total"])
+    print(f"\n{'-'*65}")
+    print(f"  MONTE CARLO ({n_replicacoes} replicas, media +- IC 95%)")
+    print(f"{'-'*65}")
+    for label, mc in [("A", cenarios["mc_A"]), ("B", cenarios["mc_B"])]:
+        ct = mc["resumo"]["custo_total"]
+        ns = mc["resumo"]["nivel_servico"]
+        meia_ct = ct["ic95"][1] - ct["media"]
+        meia_ns = ns["ic95"][1] - ns["media"]
+        print(f"  Cenario {label}: Custo Total = R$ {ct['media']:>10,.2f} +- {meia_ct:,.2f}"
+              f" | Nivel de Servico = {ns['media']*100:.1f}% +- {meia_ns*100:.1f}%")
+
+    print(f"\n{'='*65}\n")
+
+
+def imprimir_varredura(titulo: str, rotulo: str, eixo, resultados: list[dict]):
+    adaptativo = "replicacoes" in resultados[0]
+    largura = 95 if adaptativo else 65
+    print(f"\n{'-'*largura}")
+    print(f"  {titulo}")
+    print(f"{'-'*largura}")
+    print(f"  {rotulo:>10} | {'ROP':>6} | {'Custo Total (R$)':>18} | {'Servico':>8}"
+          + (f" | {'Replicas':>8} | {'IC custo':>9} | {'IC serv.':>8}" if adaptativo else ""))
+    for valor, r in zip(eixo, resultados):
+        ct = r["resumo"]["custo_total"]["media"]
+        ns = r["resumo"]["nivel_servico"]["media"]
+        linha = f"  {valor:>10.2f} | {r['parametros']['ROP']:>6} | {ct:>18,.2f} | {ns*100:>7.1f}%"
+        if adaptativo:
+            ml = r["meia_largura"]
+            linha += (f" | {r['replicacoes']:>8} | {ml['custo_total']:>9,.2f} |"
+                      f" {ml['nivel_servico']*100:>6.2f}pp" + ("" if r["convergiu"] else "  *"))
+        print(linha)
+    if adaptativo:
+        total = sum(r["replicacoes"] for r in resultados)
+        print(f"  Replicas no total: {total}  (* = meta do IC nao atingida)")
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 3. FUNÇÃO DE SIMULAÇÃO DIA-A-DIA
+# 6. SUBCOMANDOS
 # ══════════════════════════════════════════════════════════════════════════════
-def simular_estoque(Q: int, ROP: int, horizonte: int = HORIZONTE,
-                    demanda_media: float = DEMANDA_MEDIA,
-                    demanda_desvio: float = DEMANDA_DESVIO,
-                    lt_media: float = LEAD_TIME_MEDIO,
-                    lt_desvio: float = LEAD_TIME_DESVIO,
-                    custo_pedido: float = CUSTO_PEDIDO,
-                    custo_manutencao: float = CUSTO_MANUTENCAO,
-                    custo_falta: float = CUSTO_FALTA,
-                    seed: int | None = None) -> dict:
+def medir_importacao(modulos=MODULOS_PROJETO) -> list[dict]:
+    """
+    Mede o tempo de importação de cada módulo num interpretador novo (sem
+    cache de módulos) e quais dependências pesadas ele carrega.
     """
-    Simula o estoque dia a dia com política (Q, ROP).
-
-    Retorna dicionário com:
-        - niveis       : array de nível de estoque real por dia
-        - demandas     : array de demandas geradas
-        - lead_times   : lista de lead-times realizados
-        - custo_pedido : custo total de pedidos
-        - custo_manut  : custo total de manutenção
-        - custo_falta  : custo total de falta
-        - custo_total  : soma dos três custos
-        - nivel_servico: fração de ciclos sem ruptura
+    medicoes = []
+    for modulo in modulos:
+        codigo = (
+            "import sys, time\n"
+            "t = time.perf_counter()\n"
+            f"import {modulo}\n"
+            "dt = time.perf_counter() - t\n"
+            f"pesados = [m for m in {MODULOS_PESADOS!r} if m in sys.modules]\n"
+            "print(dt, ','.join(pesados))\n"
+        )
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True,
+                               text=True, check=True).stdout.split()
+        medicoes.append({
+            "modulo": modulo,
+            "segundos": float(saida[0]),
+            "pesados": saida[1].split(",") if len(saida) > 1 else [],
+        })
+    return medicoes
+
+
+def _em_cache(args, nome: str, calcular, modulos=("nucleo_estoque", "aleatorio_estoque"),
+              extras: dict | None = None):
     """
-    if seed is not None:
-        rng = np.random.RandomState(seed)
+    Resultado de calcular() pelo cache em disco, com chave em (nome, réplicas,
+    semente, gerador, `extras`, código de `modulos`); os parâmetros do modelo
+    são constantes do núcleo, então entram pela versão do código.
+    --sem-cache recalcula sem ler nem gravar.
+    """
+    if getattr(args, "sem_cache", False):
+        return calcular()
+    from cache_estoque import CacheResultados
+
+    parametros = {"n_replicacoes": args.replicacoes, "seed": args.seed,
+                  "gerador": args.gerador, **(extras or {})}
+    return CacheResultados().memorizar(nome, parametros, calcular, modulos)
+
+
+def _cenarios_em_cache(args) -> dict:
+    # executar_cenarios mora neste script: o código dele também entra na chave
+    return _em_cache(args, "cenarios",
+                     lambda: executar_cenarios(args.replicacoes, args.seed, args.gerador),
+                     modulos=("nucleo_estoque", "aleatorio_estoque", "simulacaoestoque"))
+
+
+def _estudo_em_cache(args, estudo: str) -> dict:
+    import varredura_estoque
+
+    funcao = {"tradeoff": varredura_estoque.estudo_tradeoff,
+              "sigma-lt": varredura_estoque.estudo_sigma_lead_time}[estudo]
+    opcoes = {"seed": args.seed, "n_processos": args.processos, "gerador": args.gerador}
+    extras = None
+    if getattr(args, "adaptativo", False):
+        # --replicacoes vira a rodada inicial de cada ponto
+        metas = dict(varredura_estoque.META_MEIA_LARGURA)
+        if args.meta_custo is not None:
+            metas["custo_total"] = args.meta_custo
+        if args.meta_servico is not None:
+            metas["nivel_servico"] = args.meta_servico
+        extras = {"adaptativo": True, "orcamento": args.orcamento, "metas": metas,
+                  "replicacoes_max": args.max_por_ponto or varredura_estoque.REPLICACOES_MAX_PONTO}
+        opcoes.update(extras, replicacoes_iniciais=args.replicacoes)
+    else:
+        opcoes["n_replicacoes"] = args.replicacoes
+    return _em_cache(args, f"varredura:{estudo}", lambda: funcao(**opcoes),
+                     modulos=("nucleo_estoque", "varredura_estoque", "aleatorio_estoque"),
+                     extras=extras)
+
+
+def cmd_simular(args):
+    print("=" * 65)
+    print("  ETAPA 2 - SIMULACAO DE ESTOQUE SOB INCERTEZA")
+    print("=" * 65)
+    cenarios = _cenarios_em_cache(args)
+    imprimir_resumo(cenarios)
+    return cenarios
+
+
+def cmd_varrer(args):
+    estudo = _estudo_em_cache(args, args.estudo)
+    if args.estudo == "tradeoff":
+        imprimir_varredura("TRADE-OFF: NIVEL DE SERVICO ALVO (Fig 6)", "Alvo",
+                           estudo["niveis_alvo"], estudo["resultados"])
     else:
-        rng = np.random.RandomState()
-
-    # Estado inicial
-    estoque = Q + ROP  # começar com estoque confortável
-    estoque_posicao = estoque  # posição = real + em trânsito
-    pedido_pendente = False
-    dia_chegada = -1
-
-    niveis = np.zeros(horizonte)
-    demandas = np.zeros(horizonte)
-    lead_times_list = []
-
-    total_custo_pedido = 0.0
-    total_custo_falta = 0.0
-    unidades_em_estoque_dia = 0.0   # para custo de manutenção
-
-    ciclos_total = 0
-    ciclos_sem_ruptura = 0
-    ruptura_no_ciclo = False
-
-    for dia in range(horizonte):
-        # 3a. Gerar demanda do dia
-        d = rng.normal(demanda_media, demanda_desvio)
-        d = max(0, round(d))
-        demandas[dia] = d
-
-        # 3b. Consumir estoque
-        estoque -= d
-        estoque_posicao -= d
-
-        # 3c. Verificar chegada de pedido
-        if pedido_pendente and dia >= dia_chegada:
-            estoque += Q
-            estoque_posicao += Q  # posição já tinha sido somada na emissão?
-            # Nota: estoque_posicao foi incrementado no momento da emissão,
-            # mas devemos corrigir: re-sincronizar
-            pedido_pendente = False
-
-            # Fechar ciclo
-            ciclos_total += 1
-            if not ruptura_no_ciclo:
-                ciclos_sem_ruptura += 1
-            ruptura_no_ciclo = False
-
-        # 3d. Registrar ruptura
-        if estoque < 0:
-            total_custo_falta += abs(estoque) * custo_falta
-            ruptura_no_ciclo = True
-
-        # 3e. Manutenção (apenas estoque ≥ 0)
-        if estoque > 0:
-            unidades_em_estoque_dia += estoque
-
-        # 3f. Emitir novo pedido se necessário
-        # Usa estoque virtual (posição) = estoque real + pedido em trânsito
-        estoque_virtual = estoque + (Q if pedido_pendente else 0)
-        if estoque_virtual <= ROP and not pedido_pendente:
-            pedido_pendente = True
-            lt = rng.normal(lt_media, lt_desvio)
-            lt = max(1, round(lt))
-            lead_times_list.append(lt)
-            dia_chegada = dia + lt
-            total_custo_pedido += custo_pedido
-
-        niveis[dia] = estoque
-
-    # Fechar último ciclo se havia pedido pendente
-    if ciclos_total == 0:
-        ciclos_total = 1  # evitar divisão por zero
-
-    # Custo de manutenção anual → proporcional
-    total_custo_manut = (unidades_em_estoque_dia / horizonte) * custo_manutencao
-
-    nivel_servico = ciclos_sem_ruptura / ciclos_total if ciclos_total > 0 else 1.0
+        imprimir_varredura("SENSIBILIDADE AO DESVIO DO LEAD TIME (Fig 7)", "sigma_L",
+                           estudo["sigma_L"], estudo["resultados"])
+    return estudo
 
-    return {
-        "niveis": niveis,
-        "demandas": demandas,
-        "lead_times": lead_times_list,
-        "custo_pedido": total_custo_pedido,
-        "custo_manut": total_custo_manut,
-        "custo_falta": total_custo_falta,
-        "custo_total": total_custo_pedido + total_custo_manut + total_custo_falta,
-        "nivel_servico": nivel_servico,
-    }
 
+def cmd_graficos(args, cenarios=None):
+    from graficos_estoque import gerar_graficos
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 4. EXECUTAR CENÁRIOS A e B
-# ══════════════════════════════════════════════════════════════════════════════
-print("=" * 65)
-print("  ETAPA 2 - SIMULACAO DE ESTOQUE SOB INCERTEZA")
-print("=" * 65)
+    if cenarios is None:
+        cenarios = _cenarios_em_cache(args)
+    print("Gerando curva de trade-off (variando nivel de servico 80% a 99%)...")
+    tradeoff = _estudo_em_cache(args, "tradeoff")
+    print("Gerando analise de sensibilidade do lead time...")
+    sensibilidade = _estudo_em_cache(args, "sigma-lt")
+    gerar_graficos(cenarios, tradeoff, sensibilidade, exibir=not args.sem_exibir,
+                   n_processos=args.processos, forcar=args.redesenhar)
 
-resultado_A = simular_estoque(Q=EOQ, ROP=ROP_A, seed=SEED)
-resultado_B = simular_estoque(Q=EOQ, ROP=ROP_B, seed=SEED)
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 5. RESUMO NO CONSOLE
-# ══════════════════════════════════════════════════════════════════════════════
-print(f"\n{'-'*65}")
-print(f"  PARAMETROS CALCULADOS")
-print(f"{'-'*65}")
-print(f"  EOQ (Q*)          = {EOQ} unidades")
-print(f"  ROP Cenario A     = {ROP_A} unidades (sem seguranca)")
-print(f"  ROP Cenario B     = {ROP_B} unidades (com SS)")
-print(f"  Estoque Seg. (SS) = {SS_B} unidades")
-print(f"  Z (95%)           = {Z_SCORE:.4f}")
-
-for label, res in [("A (Deterministico)", resultado_A),
-                   ("B (Estocastico 95%)", resultado_B)]:
+def cmd_otimizar(args):
+    from otimizador_estoque import otimizar_politica, otimizar_portfolio
+
+    if args.portfolio:
+        from portfolio_estoque import carregar_portfolio
+
+        tabela = otimizar_portfolio(carregar_portfolio(args.portfolio),
+                                    nivel_servico_min=args.nivel_min,
+                                    n_replicacoes=args.replicacoes, seed=args.seed,
+                                    n_processos=args.processos)
+        tabela.to_csv(args.saida, index=False)
+        print(f"{len(tabela)} SKUs otimizados. Resultados salvos em: {args.saida}")
+        return tabela
+
+    res = otimizar_politica(nivel_servico_min=args.nivel_min,
+                            n_replicacoes=args.replicacoes, seed=args.seed)
+    print(f"\n{'-'*65}")
+    print(f"  OTIMIZACAO (Q, ROP) POR SIMULACAO ({args.replicacoes} trajetorias comuns)")
+    print(f"{'-'*65}")
+    print(f"  Ponto de partida   : Q = {res['Q0']:>5}  ROP = {res['ROP0']:>5}"
+          f"  Custo = R$ {res['custo_inicial']:>10,.2f}  Servico = {res['servico_inicial']*100:.1f}%")
+    print(f"  Otimo              : Q = {res['Q']:>5}  ROP = {res['ROP']:>5}"
+          f"  Custo = R$ {res['custo_total']:>10,.2f}  Servico = {res['nivel_servico']*100:.1f}%")
+    print(f"  Politicas avaliadas: {res['n_avaliacoes']}"
+          + ("" if res["viavel"] else "  (nivel de servico minimo NAO atingido)"))
+    return res
+
+
+def cmd_longo(args):
+    res = simular_estoque_fluxo(EOQ, ROP_B, n_replicacoes=args.replicacoes,
+                                horizonte=args.horizonte, seed=args.seed,
+                                gerador=args.gerador)
+    anos = args.horizonte / 365
     print(f"\n{'-'*65}")
-    print(f"  CENARIO {label}")
+    print(f"  HORIZONTE LONGO - CENARIO B ({args.horizonte} dias ~ {anos:.0f} anos,"
+          f" {args.replicacoes} replicas)")
     print(f"{'-'*65}")
-    print(f"  Custo de Pedido    = R$ {res['custo_pedido']:>12,.2f}")
-    print(f"  Custo de Manutencao= R$ {res['custo_manut']:>12,.2f}")
-    print(f"  Custo de Falta     = R$ {res['custo_falta']:>12,.2f}")
-    print(f"  Custo Total        = R$ {res['custo_total']:>12,.2f}")
-    print(f"  Nivel de Servico   = {res['nivel_servico']*100:.1f}%")
+    ct = res["resumo"]["custo_total"]
+    ns = res["resumo"]["nivel_servico"]
+    print(f"  Custo Total        = R$ {ct['media']:>12,.2f} (desvio {ct['desvio']:,.2f})")
+    print(f"  Nivel de Servico   = {ns['media']*100:.2f}%")
+    for nome, e in res["estatisticas"].items():
+        print(f"  {nome:<10}: media {e['media']:>9.2f}  desvio {e['desvio']:>8.2f}"
+              f"  min {e['minimo']:>7.0f}  p05 {e['p05']:>7.0f}  p50 {e['p50']:>7.0f}"
+              f"  p95 {e['p95']:>7.0f}  max {e['maximo']:>7.0f}")
+    return res
+
+
+def cmd_analitico(args):
+    from analitico_estoque import comparar_com_simulacao, resumir_erro
+    from varredura_estoque import NIVEIS_ALVO_TRADEOFF, grade_tradeoff_servico
+
+    pontos = grade_tradeoff_servico(NIVEIS_ALVO_TRADEOFF)
+    comp = comparar_com_simulacao([p["Q"] for p in pontos], [p["ROP"] for p in pontos],
+                                  n_replicacoes=args.replicacoes, seed=args.seed)
+    print(f"\n{'-'*65}")
+    print(f"  AVALIACAO ANALITICA vs SIMULACAO (pontos da Fig 6, {args.replicacoes} replicas)")
+    print(f"{'-'*65}")
+    print(f"  {'ROP':>6} | {'Custo anal.':>11} | {'Custo sim.':>11} | {'Erro':>6} |"
+          f" {'Serv. anal.':>11} | {'Serv. sim.':>10}")
+    ct, ns = comp["custo_total"], comp["nivel_servico"]
+    for k, p in enumerate(pontos):
+        print(f"  {p['ROP']:>6} | {ct['analitico'][k]:>11,.2f} | {ct['simulado'][k]:>11,.2f} |"
+              f" {ct['erro_relativo'][k]*100:>5.1f}% | {ns['analitico'][k]*100:>10.1f}% |"
+              f" {ns['simulado'][k]*100:>9.1f}%")
+    print(f"\n  {'Metrica':<14} {'Vies':>8} {'Erro medio':>11} {'Erro max':>9}")
+    for m, e in resumir_erro(comp).items():
+        print(f"  {m:<14} {e['vies']*100:>7.1f}% {e['erro_medio']*100:>10.1f}% {e['erro_maximo']*100:>8.1f}%")
+    return comp
+
+
+def cmd_politicas(args):
+    from politicas_estoque import comparar_politicas, politicas_padrao
+
+    politicas = politicas_padrao()
+    resultados = comparar_politicas(politicas, n_replicacoes=args.replicacoes, seed=args.seed,
+                                    gerador=args.gerador)
+    print(f"\n{'-'*72}")
+    print(f"  POLITICAS DE REPOSICAO (mesmos sorteios, {args.replicacoes} replicas)")
+    print(f"{'-'*72}")
+    print(f"  {'Politica':<14} {'Parametros':<22} {'Custo total':>20} {'Servico':>8} {'Pedidos':>8}")
+    for nome, politica in politicas.items():
+        res = resultados[nome]
+        ct = res["resumo"]["custo_total"]
+        parametros = ", ".join(f"{k}={int(v)}" for k, v in politica.parametros.items())
+        print(f"  {nome:<14} {parametros:<22} {ct['media']:>10,.2f} +- {ct['erro_padrao']:>6,.2f}"
+              f" {res['resumo']['nivel_servico']['media']*100:>7.1f}% {res['n_pedidos'].mean():>8.1f}")
+    return resultados
+
+
+def cmd_raro(args):
+    from raridade_estoque import (NIVEIS_ALVO_RAROS, comparar_com_monte_carlo,
+                                  simular_estoque_importancia)
+    from varredura_estoque import rop_para_alvo
+
+    print(f"\n{'-'*78}")
+    print(f"  RUPTURAS RARAS - AMOSTRAGEM POR IMPORTANCIA ({args.replicacoes} replicas)")
+    print(f"{'-'*78}")
+    print(f"  {'Alvo':>6} {'ROP':>5} | {'Nivel de servico':>22} | {'Custo de falta':>20} |"
+          f" {'theta (d, L)':>13} | {'ESS est/pesos':>13}")
+    resultados = {}
+    for alvo in NIVEIS_ALVO_RAROS:
+        rop = rop_para_alvo(alvo)[1]
+        if args.comparar:
+            comp = comparar_com_monte_carlo(EOQ, rop, args.replicacoes, args.comparar, seed=args.seed)
+            res = comp["importancia"]
+        else:
+            res = simular_estoque_importancia(EOQ, rop, args.replicacoes, seed=args.seed)
+        ns, cf = res["estimativas"]["nivel_servico"], res["estimativas"]["custo_falta"]
+        print(f"  {alvo*100:>5.1f}% {rop:>5} | {ns['media']*100:>9.3f}% +- {ns['erro_padrao']*100:>6.3f}% |"
+              f" {cf['media']:>9,.2f} +- {cf['erro_padrao']:>7,.2f} |"
+              f" {res['inclinacao'][0]:>5.2f}, {res['inclinacao'][1]:>5.2f} |"
+              f" {res['estimativas']['fracao_ruptura']['ess']:>6.0f}/{res['ess_pesos']:<6.0f}")
+        if args.comparar:
+            simples = comp["simples"]
+            print(f"  {'MC simples':>12} | {(1 - simples['fracao_ruptura']['media'])*100:>9.3f}%"
+                  f" +- {simples['fracao_ruptura']['erro_padrao']*100:>6.3f}% |"
+                  f" {simples['custo_falta']['media']:>9,.2f} +- {simples['custo_falta']['erro_padrao']:>7,.2f} |"
+                  f" {args.comparar} replicas; ganho {comp['ganho']['fracao_ruptura']:.1f}x"
+                  f" / {comp['ganho']['custo_falta']:.1f}x")
+            sem_ganho = [m for m, r in comp["recomendacao"].items() if r == "simples"]
+            if sem_ganho:
+                print(f"  {'':>12} | sem reducao de variancia em {', '.join(sem_ganho)}:"
+                      f" use Monte Carlo simples neste alvo")
+        resultados[alvo] = res
+    return resultados
+
+
+def cmd_importacao(args):
+    print(f"{'Modulo':<20} {'Tempo (ms)':>10}   Dependencias pesadas carregadas")
+    for m in medir_importacao():
+        pesados = ", ".join(m["pesados"]) or "-"
+        print(f"{m['modulo']:<20} {m['segundos']*1000:>10.1f}   {pesados}")
+
+
+def cmd_relatorio(args):
+    """Sem subcomando: comportamento original do script (resumo + figuras)."""
+    cenarios = cmd_simular(args)
+    cmd_graficos(args, cenarios)
+
+
+def cmd_cache(args):
+    from cache_estoque import CacheResultados
+
+    cache = CacheResultados()
+    if args.limpar:
+        print(f"{cache.limpar()} entradas apagadas de {cache.pasta}/")
+        return
+    entradas = cache.entradas()
+    total = sum(b for _, b, _ in entradas)
+    print(f"{cache.pasta}/: {len(entradas)} entradas, {total / 2**20:.1f} MB "
+          f"(limite {cache.limite_bytes / 2**20:.0f} MB)")
+
+
+def main(argv=None):
+    perfil = argparse.ArgumentParser(add_help=False)
+    perfil.add_argument("--perfil", default=None, metavar="ARQUIVO",
+                        help="liga a instrumentacao e grava os tempos em ARQUIVO (.json ou .csv)")
+    comum = argparse.ArgumentParser(add_help=False, parents=[perfil])
+    comum.add_argument("--replicacoes", type=int, default=N_REPLICACOES,
+                       help="replicas de Monte Carlo por cenario/ponto")
+    comum.add_argument("--seed", type=int, default=SEED)
+    comum.add_argument("--gerador", choices=GERADORES, default=GERADOR_PADRAO,
+                       help="legado (RandomState, numeros do relatorio) ou pcg64 (Generator)")
+    comum.add_argument("--processos", type=int, default=None,
+                       help="processos da varredura (padrao: todos os nucleos)")
+    comum.add_argument("--sem-exibir", action="store_true",
+                       help="salva as figuras sem abrir janelas (plt.show)")
+    comum.add_argument("--redesenhar", action="store_true",
+                       help="redesenha todas as figuras, ignorando o cache de graficos/")
+    comum.add_argument("--sem-cache", action="store_true",
+                       help="recalcula cenarios e varreduras sem usar o cache em disco")
+
+    # Sem subcomando as opções comuns também valem (relatório completo)
+    parser = argparse.ArgumentParser(description="Simulacao de estoque sob incerteza (Q, ROP).",
+                                     parents=[comum])
+    parser.set_defaults(funcao=cmd_relatorio)
+
+    sub = parser.add_subparsers(dest="comando")
+    sub.add_parser("simular", parents=[comum], help="cenarios A/B e resumo no console"
+                   ).set_defaults(funcao=cmd_simular)
+    p_varrer = sub.add_parser("varrer", parents=[comum], help="varreduras das Figs 6 e 7")
+    p_varrer.add_argument("estudo", choices=("tradeoff", "sigma-lt"))
+    p_varrer.add_argument("--adaptativo", action="store_true",
+                          help="acrescenta replicas por ponto ate o IC 95%% atingir a meta "
+                               "(--replicacoes vira a rodada inicial)")
+    p_varrer.add_argument("--meta-custo", type=float, default=None,
+                          help="meia-largura do IC do custo total em R$ (padrao: 100)")
+    p_varrer.add_argument("--meta-servico", type=float, default=None,
+                          help="meia-largura do IC do nivel de servico, fracao (padrao: 0.005)")
+    p_varrer.add_argument("--max-por-ponto", type=int, default=None,
+                          help="teto de replicas por ponto (padrao: 20000)")
+    p_varrer.add_argument("--orcamento", type=int, default=None,
+                          help="total de replicas da varredura (padrao: sem limite)")
+    p_varrer.set_defaults(funcao=cmd_varrer)
+    sub.add_parser("graficos", parents=[comum], help="gera as 7 figuras em graficos/"
+                   ).set_defaults(funcao=cmd_graficos)
+    sub.add_parser("importacao", help="mede o tempo de importacao dos modulos"
+                   ).set_defaults(funcao=cmd_importacao)
+    p_analitico = sub.add_parser("analitico", parents=[perfil],
+                                 help="erro da avaliacao analitica vs simulacao")
+    p_analitico.add_argument("--replicacoes", type=int, default=500)
+    p_analitico.add_argument("--seed", type=int, default=SEED)
+    p_analitico.set_defaults(funcao=cmd_analitico)
+    sub.add_parser("politicas", parents=[comum], help="compara (Q, ROP), (s, S), (R, S) e estoque base"
+                   ).set_defaults(funcao=cmd_politicas)
+    p_longo = sub.add_parser("longo", parents=[perfil],
+                             help="horizonte longo em fluxo (memoria constante)")
+    p_longo.add_argument("--horizonte", type=int, default=100 * 365)
+    p_longo.add_argument("--replicacoes", type=int, default=32)
+    p_longo.add_argument("--seed", type=int, default=SEED)
+    p_longo.add_argument("--gerador", choices=GERADORES, default=GERADOR_PADRAO)
+    p_longo.set_defaults(funcao=cmd_longo)
+    p_otimizar = sub.add_parser("otimizar", parents=[perfil],
+                                help="busca o (Q, ROP) de menor custo por simulacao")
+    p_otimizar.add_argument("--nivel-min", type=float, default=None,
+                            help="nivel de servico minimo (ex.: 0.95)")
+    p_otimizar.add_argument("--replicacoes", type=int, default=200,
+                            help="trajetorias comuns por SKU")
+    p_otimizar.add_argument("--seed", type=int, default=SEED)
+    p_otimizar.add_argument("--portfolio", default=None,
+                            help="CSV/Parquet de SKUs (ver portfolio_estoque.py)")
+    p_otimizar.add_argument("--saida", default="politicas_otimas.csv")
+    p_otimizar.add_argument("--processos", type=int, default=None)
+    p_otimizar.set_defaults(funcao=cmd_otimizar)
+    p_raro = sub.add_parser("raro", parents=[perfil],
+                            help="nivel de servico e custo de falta a 99%%+ por amostragem por importancia")
+    p_raro.add_argument("--replicacoes", type=int, default=2000)
+    p_raro.add_argument("--seed", type=int, default=SEED)
+    p_raro.add_argument("--comparar", type=int, default=0, metavar="N",
+                        help="compara com Monte Carlo simples de N replicas")
+    p_raro.set_defaults(funcao=cmd_raro)
+    p_cache = sub.add_parser("cache", help="tamanho do cache de resultados em disco")
+    p_cache.add_argument("--limpar", action="store_true", help="apaga todas as entradas")
+    p_cache.set_defaults(funcao=cmd_cache)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "perfil", None):
+        import instrumentacao_estoque as instr
+
+        instr.ativar()
+        args.funcao(args)
+        instr.imprimir_relatorio()
+        print(f"Perfil salvo em: {instr.exportar(args.perfil)}")
+    else:
+        args.funcao(args)
 
-print(f"\n{'='*65}\n")
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 6. GRÁFICOS
-# ══════════════════════════════════════════════════════════════════════════════
-sns.set_theme(style="whitegrid", palette="muted", font_scale=1.05)
-
-PASTA_GRAFICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graficos")
-os.makedirs(PASTA_GRAFICOS, exist_ok=True)
-
-dias = np.arange(HORIZONTE)
-
-# ── BLOCO 1: Entendendo a Incerteza ─────────────────────────────────────────
-
-# Fig 1 — Histograma da demanda simulada
-fig1, ax1 = plt.subplots(figsize=(10, 5))
-sns.histplot(resultado_A["demandas"], bins=30, kde=True, color="steelblue",
-             edgecolor="white", ax=ax1)
-ax1.axvline(DEMANDA_MEDIA, color="crimson", ls="--", lw=2,
-            label=f"μ = {DEMANDA_MEDIA}")
-ax1.set_title("Fig 1 — Distribuição da Demanda Diária Simulada", fontsize=14,
-              fontweight="bold")
-ax1.set_xlabel("Demanda (unidades)")
-ax1.set_ylabel("Frequência")
-ax1.legend()
-plt.tight_layout()
-fig1.savefig(os.path.join(PASTA_GRAFICOS, "fig1_histograma_demanda.png"), dpi=300, bbox_inches="tight")
-
-
-# Fig 2 — Histograma do lead time simulado
-todos_lt = resultado_A["lead_times"] + resultado_B["lead_times"]
-fig2, ax2 = plt.subplots(figsize=(10, 5))
-sns.histplot(todos_lt, bins=range(0, max(todos_lt) + 2), kde=False,
-             color="darkorange", edgecolor="white", ax=ax2)
-ax2.axvline(LEAD_TIME_MEDIO, color="crimson", ls="--", lw=2,
-            label=f"μ = {LEAD_TIME_MEDIO} dias")
-ax2.set_title("Fig 2 — Distribuição do Lead Time Simulado", fontsize=14,
-              fontweight="bold")
-ax2.set_xlabel("Lead Time (dias)")
-ax2.set_ylabel("Frequência")
-ax2.legend()
-plt.tight_layout()
-fig2.savefig(os.path.join(PASTA_GRAFICOS, "fig2_histograma_lead_time.png"), dpi=300, bbox_inches="tight")
-
-# ── BLOCO 2: Comparação de Desempenho (Evolução Temporal) ───────────────────
-
-# Fig 3 — Nível de estoque Cenário A
-fig3, ax3 = plt.subplots(figsize=(14, 5))
-niveis_A = resultado_A["niveis"]
-cor = np.where(niveis_A >= 0, "steelblue", "crimson")
-
-ax3.bar(dias, niveis_A, color=["steelblue" if v >= 0 else "crimson" for v in niveis_A],
-        width=1.0, edgecolor="none")
-ax3.axhline(0, color="black", lw=0.8)
-ax3.axhline(ROP_A, color="green", ls="--", lw=1.2, label=f"ROP = {ROP_A}")
-ax3.fill_between(dias, niveis_A, 0, where=niveis_A < 0,
-                 color="crimson", alpha=0.3, label="Ruptura (estoque < 0)")
-ax3.set_title("Fig 3 — Nível de Estoque Diário — Cenário A (Determinístico)",
-              fontsize=14, fontweight="bold")
-ax3.set_xlabel("Dia")
-ax3.set_ylabel("Estoque (unidades)")
-ax3.legend(loc="upper right")
-plt.tight_layout()
-fig3.savefig(os.path.join(PASTA_GRAFICOS, "fig3_estoque_cenario_A.png"), dpi=300, bbox_inches="tight")
-
-# Fig 4 — Nível de estoque Cenário B
-fig4, ax4 = plt.subplots(figsize=(14, 5))
-niveis_B = resultado_B["niveis"]
-
-ax4.bar(dias, niveis_B, color=["steelblue" if v >= 0 else "crimson" for v in niveis_B],
-        width=1.0, edgecolor="none")
-ax4.axhline(0, color="black", lw=0.8)
-ax4.axhline(ROP_B, color="green", ls="--", lw=1.2, label=f"ROP = {ROP_B}")
-ax4.axhline(SS_B, color="orange", ls=":", lw=1.5,
-            label=f"Estoque de Segurança = {SS_B}")
-ax4.fill_between(dias, niveis_B, 0, where=niveis_B < 0,
-                 color="crimson", alpha=0.3, label="Ruptura (estoque < 0)")
-ax4.set_title("Fig 4 — Nível de Estoque Diário — Cenário B (Estocástico, 95%)",
-              fontsize=14, fontweight="bold")
-ax4.set_xlabel("Dia")
-ax4.set_ylabel("Estoque (unidades)")
-ax4.legend(loc="upper right")
-plt.tight_layout()
-fig4.savefig(os.path.join(PASTA_GRAFICOS, "fig4_estoque_cenario_B.png"), dpi=300, bbox_inches="tight")
-
-# ── BLOCO 3: Análise Econômica e Sensibilidade ──────────────────────────────
-
-# Fig 5 — Comparação de custos (barras agrupadas)
-fig5, ax5 = plt.subplots(figsize=(10, 6))
-categorias = ["Custo de Pedido", "Custo de Manutenção", "Custo de Falta", "Custo Total"]
-valores_A = [resultado_A["custo_pedido"], resultado_A["custo_manut"],
-             resultado_A["custo_falta"], resultado_A["custo_total"]]
-valores_B = [resultado_B["custo_pedido"], resultado_B["custo_manut"],
-             resultado_B["custo_falta"], resultado_B["custo_total"]]
-
-x = np.arange(len(categorias))
-largura = 0.35
-barras_A = ax5.bar(x - largura/2, valores_A, largura, label="Cenário A",
-                   color="salmon", edgecolor="white")
-barras_B = ax5.bar(x + largura/2, valores_B, largura, label="Cenário B",
-                   color="mediumseagreen", edgecolor="white")
-
-ax5.set_title("Fig 5 — Comparação de Custos: Cenário A vs B", fontsize=14,
-              fontweight="bold")
-ax5.set_ylabel("Custo (R$)")
-ax5.set_xticks(x)
-ax5.set_xticklabels(categorias, rotation=15, ha="right")
-ax5.legend()
-
-# Adicionar valores sobre as barras
-for barra in barras_A:
-    h = barra.get_height()
-    ax5.annotate(f"R${h:,.0f}", xy=(barra.get_x() + barra.get_width()/2, h),
-                 xytext=(0, 5), textcoords="offset points",
-                 ha="center", va="bottom", fontsize=8)
-for barra in barras_B:
-    h = barra.get_height()
-    ax5.annotate(f"R${h:,.0f}", xy=(barra.get_x() + barra.get_width()/2, h),
-                 xytext=(0, 5), textcoords="offset points",
-                 ha="center", va="bottom", fontsize=8)
-plt.tight_layout()
-fig5.savefig(os.path.join(PASTA_GRAFICOS, "fig5_comparacao_custos.png"), dpi=300, bbox_inches="tight")
-
-# Fig 6 — Curva de Trade-off (Fronteira Eficiente)
-print("Gerando curva de trade-off (variando nivel de servico 80% a 99%)...")
-niveis_alvo = np.arange(0.80, 0.995, 0.01)
-custos_tradeoff = []
-servicos_obtidos = []
-
-for ns_alvo in niveis_alvo:
-    z = norm.ppf(ns_alvo)
-    ss = z * np.sqrt(
-        LEAD_TIME_MEDIO * DEMANDA_DESVIO**2
-        + DEMANDA_MEDIA**2 * LEAD_TIME_DESVIO**2
-    )
-    ss = max(0, round(ss))
-    rop = DEMANDA_MEDIA * LEAD_TIME_MEDIO + ss
-    res = simular_estoque(Q=EOQ, ROP=rop, seed=SEED)
-    custos_tradeoff.append(res["custo_total"])
-    servicos_obtidos.append(res["nivel_servico"] * 100)
-
-fig6, ax6 = plt.subplots(figsize=(10, 6))
-ax6.plot(servicos_obtidos, custos_tradeoff, "o-", color="darkorchid",
-         markersize=6, linewidth=2)
-ax6.set_title("Fig 6 — Curva de Trade-off: Nível de Serviço vs Custo Total",
-              fontsize=14, fontweight="bold")
-ax6.set_xlabel("Nível de Serviço Obtido (%)")
-ax6.set_ylabel("Custo Total (R$)")
-ax6.grid(True, alpha=0.3)
-
-# Destacar o ponto 95%
-idx_95 = np.argmin(np.abs(np.array(niveis_alvo) - 0.95))
-ax6.annotate(f"  95% -> R${custos_tradeoff[idx_95]:,.0f}",
-             xy=(servicos_obtidos[idx_95], custos_tradeoff[idx_95]),
-             fontsize=10, color="crimson", fontweight="bold")
-ax6.plot(servicos_obtidos[idx_95], custos_tradeoff[idx_95], "s",
-         color="crimson", markersize=10, zorder=5)
-plt.tight_layout()
-fig6.savefig(os.path.join(PASTA_GRAFICOS, "fig6_tradeoff_servico_custo.png"), dpi=300, bbox_inches="tight")
-
-# Fig 7 — Impacto da Incerteza do Fornecedor (σ_L vs SS)
-print("Gerando analise de sensibilidade do lead time...")
-sigma_L_range = np.arange(0, 4.1, 0.25)
-ss_necessarios = []
-custos_sigma = []
-
-for sigma_L in sigma_L_range:
-    ss = Z_SCORE * np.sqrt(
-        LEAD_TIME_MEDIO * DEMANDA_DESVIO**2
-        + DEMANDA_MEDIA**2 * sigma_L**2
-    )
-    ss_necessarios.append(round(ss))
-    rop = DEMANDA_MEDIA * LEAD_TIME_MEDIO + round(ss)
-    res = simular_estoque(Q=EOQ, ROP=rop, seed=SEED,
-                          lt_desvio=sigma_L)
-    custos_sigma.append(res["custo_total"])
-
-fig7, ax7a = plt.subplots(figsize=(10, 6))
-color_ss = "teal"
-color_custo = "tomato"
-
-ax7a.plot(sigma_L_range, ss_necessarios, "s-", color=color_ss,
-          linewidth=2, markersize=6, label="Estoque de Segurança (SS)")
-ax7a.set_xlabel("Desvio Padrão do Lead Time — σ_L (dias)")
-ax7a.set_ylabel("Estoque de Segurança (unidades)", color=color_ss)
-ax7a.tick_params(axis="y", labelcolor=color_ss)
-
-ax7b = ax7a.twinx()
-ax7b.plot(sigma_L_range, custos_sigma, "o--", color=color_custo,
-          linewidth=2, markersize=5, label="Custo Total")
-ax7b.set_ylabel("Custo Total (R$)", color=color_custo)
-ax7b.tick_params(axis="y", labelcolor=color_custo)
-
-ax7a.set_title("Fig 7 — Impacto da Incerteza do Fornecedor no Estoque de Segurança",
-               fontsize=14, fontweight="bold")
-
-# Combinar legendas
-lines_1, labels_1 = ax7a.get_legend_handles_labels()
-lines_2, labels_2 = ax7b.get_legend_handles_labels()
-ax7a.legend(lines_1 + lines_2, labels_1 + labels_2, loc="upper left")
-plt.tight_layout()
-fig7.savefig(os.path.join(PASTA_GRAFICOS, "fig7_impacto_incerteza_fornecedor.png"), dpi=300, bbox_inches="tight")
-
-# ── Exibir todos os gráficos ────────────────────────────────────────────────
-print(f"Todos os graficos foram salvos em: {PASTA_GRAFICOS}")
-print("Exibindo...")
-plt.show()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Tarefas em segundo plano para o dashboard (e qualquer outro cliente).
+
+  • Um GerenciadorTarefas por servidor, com um único pool de processos
+    compartilhado por todas as sessões; cada varredura submetida vira uma
+    Tarefa conduzida por uma thread própria
+  • Resultados progressivos: cada ponto entra em `instantaneo()` assim que
+    todas as suas fatias de réplicas terminam, junto com o progresso
+  • Justiça entre sessões: os processos do pool são repartidos entre as
+    tarefas ativas — cada uma mantém no máximo n_processos // (tarefas
+    ativas) fatias no pool (mínimo 1), recalculado a cada fatia concluída,
+    então uma varredura grande cede vagas assim que outra chega
+  • Cancelamento: cancelar() descarta as fatias ainda não iniciadas (usado
+    quando os parâmetros da tela mudam e a tarefa fica obsoleta)
+  • Mesmas sementes de varredura_estoque (SeedSequence por ponto): o
+    resultado é idêntico ao de varrer() com os mesmos argumentos
+
+Uso:
+    gerenciador = GerenciadorTarefas()
+    tarefa = gerenciador.submeter(pontos, n_replicacoes=1000)
+    tarefa.instantaneo()   # {"estado", "progresso", "resultados", ...}
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from multiprocessing import get_context
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from nucleo_estoque import SEED, N_REPLICACOES, GERADOR_PADRAO, resumir_replicacoes, tabela_resultados
+from varredura_estoque import (METRICAS, REPLICACOES_POR_TAREFA, _executar_tarefa,
+                               sementes_dos_pontos)
+
+INTERVALO_VERIFICACAO = 0.2        # s entre verificações de cancelamento
+
+ESTADOS = ("rodando", "concluida", "cancelada", "erro")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. TAREFA
+# ══════════════════════════════════════════════════════════════════════════════
+class Tarefa:
+    """
+    Uma varredura em andamento. Escrita só pela thread do gerenciador;
+    leia pelo instantaneo(), que devolve uma cópia consistente.
+    """
+
+    def __init__(self, pontos: list[dict], n_replicacoes: int, rotulo=None):
+        self.pontos = pontos
+        self.n_replicacoes = n_replicacoes
+        self.rotulo = rotulo              # livre: ex. os parâmetros da tela
+        self.total = 0                    # fatias de réplicas
+        self.concluidas = 0
+        self.estado = "rodando"
+        self.erro = None
+        self._resultados = {}             # indice → {"parametros", "resumo"}
+        self._trava = threading.Lock()
+        self._cancelada = threading.Event()
+        self._inicio = time.perf_counter()
+        self._fim = None
+
+    @property
+    def ativa(self) -> bool:
+        return self.estado == "rodando"
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    def instantaneo(self) -> dict:
+        """
+        Estado atual:
+            - estado     : "rodando", "concluida", "cancelada" ou "erro"
+            - progresso  : fração das fatias de réplicas concluídas
+            - resultados : pontos prontos, na ordem de `pontos` (dicts com
+                           indice, parametros e resumo)
+            - segundos   : tempo desde a submissão (até o fim, se acabou)
+            - erro       : mensagem, se estado == "erro"
+        """
+        with self._trava:
+            fim = self._fim if self._fim is not None else time.perf_counter()
+            return {
+                "estado": self.estado,
+                "progresso": self.concluidas / self.total if self.total else 0.0,
+                "resultados": [{"indice": i, **r} for i, r in sorted(self._resultados.items())],
+                "segundos": fim - self._inicio,
+                "erro": self.erro,
+            }
+
+    def _registrar(self, indice: int, resumo: dict):
+        with self._trava:
+            self._resultados[indice] = {"parametros": self.pontos[indice], "resumo": resumo}
+
+    def _encerrar(self, estado: str, erro=None):
+        with self._trava:
+            self.estado = estado
+            self.erro = erro
+            self._fim = time.perf_counter()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. GERENCIADOR (POOL COMPARTILHADO)
+# ══════════════════════════════════════════════════════════════════════════════
+class GerenciadorTarefas:
+    """
+    Pool compartilhado + uma thread condutora por tarefa. n_processos=1 usa
+    uma thread em vez de processos (mesmos resultados, sem paralelismo).
+    `em_voo` fixa as fatias no pool por tarefa; None reparte o pool entre
+    as tarefas ativas.
+    """
+
+    def __init__(self, n_processos: int | None = None, em_voo: int | None = None):
+        self.n_processos = n_processos or os.cpu_count()
+        if self.n_processos == 1:
+            self._pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            # spawn: o servidor (ex.: Streamlit) tem threads, e fork com threads é frágil
+            self._pool = ProcessPoolExecutor(max_workers=self.n_processos,
+                                             mp_context=get_context("spawn"))
+        self.em_voo = em_voo
+        self._tarefas = []
+        self._trava = threading.Lock()
+
+    def submeter(self, pontos: list[dict], n_replicacoes: int = N_REPLICACOES,
+                 seed: int | None = SEED, gerador: str = GERADOR_PADRAO,
+                 replicacoes_por_tarefa: int = REPLICACOES_POR_TAREFA,
+                 dtype_custo=np.float32, rotulo=None) -> Tarefa:
+        """Inicia a varredura de `pontos` em segundo plano e devolve a Tarefa."""
+        tarefa = Tarefa(pontos, n_replicacoes, rotulo)
+        with self._trava:
+            self._tarefas = [t for t in self._tarefas if t.ativa] + [tarefa]
+        threading.Thread(target=self._conduzir, name="tarefa-varredura", daemon=True,
+                         args=(tarefa, seed, gerador, replicacoes_por_tarefa, dtype_custo)
+                         ).start()
+        instr.contar("tarefas:submetidas")
+        return tarefa
+
+    def ativas(self) -> int:
+        with self._trava:
+            return sum(t.ativa for t in self._tarefas)
+
+    def _vagas(self) -> int:
+        """Fatias que cada tarefa pode ter no pool agora (parte justa do pool)."""
+        if self.em_voo:
+            return self.em_voo
+        return max(1, self.n_processos // max(1, self.ativas()))
+
+    def encerrar(self):
+        """Cancela tudo e libera o pool (fim do servidor)."""
+        with self._trava:
+            for t in self._tarefas:
+                t.cancelar()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _conduzir(self, tarefa: Tarefa, seed, gerador, replicacoes_por_tarefa, dtype_custo):
+        n_pontos, n = len(tarefa.pontos), tarefa.n_replicacoes
+        tabela = tabela_resultados((n_pontos, n), dtype_custo)
+        sementes = sementes_dos_pontos(n_pontos, n, seed, gerador)
+        fila = deque((i, ini, p, s[ini:ini + replicacoes_por_tarefa], tabela.dtype, gerador)
+                     for i, (p, s) in enumerate(zip(tarefa.pontos, sementes))
+                     for ini in range(0, n, replicacoes_por_tarefa))
+        tarefa.total = len(fila)
+        pendentes = [-(-n // replicacoes_por_tarefa)] * n_pontos
+        em_voo = set()
+        try:
+            while (fila or em_voo) and not tarefa._cancelada.is_set():
+                vagas = self._vagas()
+                while fila and len(em_voo) < vagas:
+                    em_voo.add(self._pool.submit(_executar_tarefa, *fila.popleft()))
+                feitos, em_voo = wait(em_voo, timeout=INTERVALO_VERIFICACAO,
+                                      return_when=FIRST_COMPLETED)
+                for futuro in feitos:
+                    indice, inicio, parte = futuro.result()
+                    tabela[indice, inicio:inicio + len(parte)] = parte
+                    tarefa.concluidas += 1
+                    pendentes[indice] -= 1
+                    if not pendentes[indice]:
+                        registros = tabela[indice]
+                        tarefa._registrar(indice, resumir_replicacoes(
+                            {m: registros[m] for m in METRICAS}))
+        except Exception as erro:  # noqa: BLE001  (vai para a tela, não derruba o servidor)
+            tarefa._encerrar("erro", f"{type(erro).__name__}: {erro}")
+            return
+        finally:
+            for futuro in em_voo:
+                futuro.cancel()
+        if tarefa._cancelada.is_set():
+            instr.contar("tarefas:canceladas")
+            tarefa._encerrar("cancelada")
+        else:
+            tarefa._encerrar("concluida")
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+======================================================
+Varredura paralela de cenários (Q, ROP) com várias réplicas por ponto.
+
+  • Cada ponto da grade é um conjunto de parâmetros de simular_estoque_lote
+  • As réplicas de cada ponto são divididas em tarefas e espalhadas num
+    pool de processos
+  • As sementes vêm de SeedSequence(seed).spawn(n_pontos): cada ponto tem
+    um fluxo independente e o resultado não depende do número de processos
+    (nem do gerador de cada réplica, "legado" ou "pcg64")
+  • Os pontos são devolvidos à medida que terminam (varrer_em_fluxo)
+  • Os resultados por réplica de todos os pontos ficam numa única tabela
+    compacta (pontos × réplicas), pré-alocada (ver tabela_resultados)
+  • Modo adaptativo (varrer_adaptativo): réplicas acrescentadas em rodadas
+    até a meia-largura do IC 95% de custo_total e nivel_servico atingir a
+    meta ou o orçamento de réplicas acabar; o esforço vai para os pontos
+    ruidosos (σ_L alto, alvos de serviço apertados)
+"""
+
+import contextlib
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import instrumentacao_estoque as instr
+from aleatorio_estoque import SementesFilhas
+from nucleo_estoque import (
+    SEED, N_REPLICACOES, EOQ, DEMANDA_MEDIA, DEMANDA_DESVIO, LEAD_TIME_MEDIO,
+    LEAD_TIME_DESVIO, NIVEL_SERVICO_ALVO, CAMPOS_RESULTADO, simular_estoque_lote,
+    resumir_replicacoes, quantil_normal, tabela_resultados, GERADOR_PADRAO,
+)
+
+REPLICACOES_POR_TAREFA = 250       # granularidade do trabalho enviado ao pool
+
+# Modo adaptativo
+META_MEIA_LARGURA = {"custo_total": 100.0,      # R$
+                     "nivel_servico": 0.005}    # fração (0,5 p.p.)
+REPLICACOES_INICIAIS = 250         # primeira rodada de cada ponto
+REPLICACOES_MAX_PONTO = 20000      # teto de réplicas por ponto
+INCREMENTO_MINIMO = 100            # menor acréscimo de réplicas numa rodada
+
+NIVEIS_ALVO_TRADEOFF = np.arange(0.80, 0.995, 0.01)   # Fig 6
+SIGMA_L_SENSIBILIDADE = np.arange(0, 4.1, 0.25)       # Fig 7
+METRICAS = CAMPOS_RESULTADO
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 1. GRADES DE PARÂMETROS
+# ══════════════════════════════════════════════════════════════════════════════
+def montar_grade(base: dict | None = None, **eixos) -> list[dict]:
+    """
+    Produto cartesiano dos eixos sobre os parâmetros fixos de `base`.
+
+    Ex.: montar_grade({"Q": 1480}, ROP=[500, 757], lt_desvio=[0.5, 1.5])
+    → 4 pontos.
+    """
+    base = dict(base or {})
+    nomes = list(eixos)
+    return [{**base, **dict(zip(nomes, valores))}
+            for valores in itertools.product(*(eixos[n] for n in nomes))]
+
+
+def rop_para_alvo(nivel_servico: float, lt_desvio: float = LEAD_TIME_DESVIO,
+                  demanda_media: float = DEMANDA_MEDIA,
+                  demanda_desvio: float = DEMANDA_DESVIO,
+                  lt_media: float = LEAD_TIME_MEDIO) -> tuple[int, int]:
+    """(SS, ROP) da fórmula da seção 2 para um nível de serviço alvo (SS ≥ 0)."""
+    ss = quantil_normal(nivel_servico) * np.sqrt(
+        lt_media * demanda_desvio**2 + demanda_media**2 * lt_desvio**2)
+    ss = max(0, round(ss))
+    return ss, demanda_media * lt_media + ss
+
+
+def grade_tradeoff_servico(niveis_alvo, Q: int = EOQ) -> list[dict]:
+    """Pontos da Fig 6: um ROP por nível de serviço alvo."""
+    return [{"Q": Q, "ROP": rop_para_alvo(ns)[1]} for ns in niveis_alvo]
+
+
+def grade_sigma_lead_time(sigma_L_range, nivel_servico: float,
+                          Q: int = EOQ) -> list[dict]:
+    """Pontos da Fig 7: ROP recalculado para cada σ_L."""
+    return [{"Q": Q, "ROP": rop_para_alvo(nivel_servico, lt_desvio=s)[1],
+             "lt_desvio": float(s)}
+            for s in sigma_L_range]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 2. EXECUÇÃO EM PARALELO
+# ══════════════════════════════════════════════════════════════════════════════
+def _executar_tarefa(indice: int, inicio: int, parametros: dict,
+                     sementes: np.ndarray, dtype: np.dtype,
+                     gerador: str = GERADOR_PADRAO):
+    """
+    Roda uma fatia de réplicas de um ponto (executa no processo filho) e
+    devolve uma tabela compacta: menos bytes para voltar ao processo pai.
+    """
+    parte = np.zeros(len(sementes), dtype=dtype)
+    simular_estoque_lote(**parametros, sementes=sementes, saida=parte, gerador=gerador)
+    return indice, inicio, parte
+
+
+def _executar_tarefa_no_filho(instrumentar: bool, *tarefa):
+    """_executar_tarefa no pool, devolvendo também o que a instrumentação mediu."""
+    if instrumentar:
+        instr.ativar()
+    return (*_executar_tarefa(*tarefa), instr.coletar())
+
+
+def _executar_tarefas(tarefas: list, pool):
+    """
+    (indice, inicio, parte, medido) de cada tarefa, na ordem de conclusão;
+    pool=None roda no processo atual.
+    """
+    if pool is None:
+        for tarefa in tarefas:
+            yield (*_executar_tarefa(*tarefa), None)
+        return
+    futuros = [pool.submit(_executar_tarefa_no_filho, instr.ativo(), *tarefa)
+               for tarefa in tarefas]
+    for futuro in as_completed(futuros):
+        yield futuro.result()
+
+
+def _abrir_pool(n_processos: int | None):
+    if n_processos == 1:
+        return contextlib.nullcontext()
+    return ProcessPoolExecutor(max_workers=n_processos or os.cpu_count())
+
+
+def sementes_dos_pontos(n_pontos: int, n_replicacoes: int,
+                        seed: int | None = SEED, gerador: str = GERADOR_PADRAO) -> list:
+    """
+    Sementes das réplicas de cada ponto, derivadas de fluxos independentes
+    SeedSequence(seed).spawn(n_pontos):
+        - legado: n_replicacoes inteiros de 32 bits do estado de cada filho
+                  (o que o RandomState aceita)
+        - pcg64 : os netos do filho, um SeedSequence por réplica
+                  (SementesFilhas, criados só na fatia de cada tarefa)
+    As primeiras k sementes não dependem de n_replicacoes (o modo
+    adaptativo estende a sequência do modo fixo).
+    """
+    pontos = np.random.SeedSequence(seed).spawn(n_pontos)
+    if gerador != "legado":
+        return [SementesFilhas(p, n_replicacoes) for p in pontos]
+    return [p.generate_state(n_replicacoes, dtype=np.uint32).astype(np.int64)
+            for p in pontos]
+
+
+def varrer_em_fluxo(pontos: list[dict], n_replicacoes: int = N_REPLICACOES,
+                    seed: int | None = SEED, n_processos: int | None = None,
+                    replicacoes_por_tarefa: int = REPLICACOES_POR_TAREFA,
+                    tabela: np.ndarray | None = None, dtype_custo=np.float32,
+                    gerador: str = GERADOR_PADRAO):
+    """
+    Simula cada ponto com `n_replicacoes` réplicas e gera um dicionário por
+    ponto assim que todas as suas tarefas terminam (ordem de conclusão):
+        - indice     : posição do ponto em `pontos`
+        - parametros : o próprio ponto
+        - resumo     : estatísticas (ver resumir_replicacoes)
+        - registros  : linha da tabela do ponto (semente e métricas por réplica)
+        - custo_*, nivel_servico, n_pedidos: colunas de `registros`
+
+    Os resultados são gravados em `tabela` (pontos × réplicas, ver
+    tabela_resultados), criada com custos em `dtype_custo` se não for dada.
+    n_processos=1 roda tudo no processo atual, sem pool. Cada réplica tem a
+    sua semente, então a tabela é a mesma com qualquer número de processos.
+    """
+    if tabela is None:
+        tabela = tabela_resultados((len(pontos), n_replicacoes), dtype_custo)
+    sementes = sementes_dos_pontos(len(pontos), n_replicacoes, seed, gerador)
+    tarefas = [(i, ini, p, s[ini:ini + replicacoes_por_tarefa], tabela.dtype, gerador)
+               for i, (p, s) in enumerate(zip(pontos, sementes))
+               for ini in range(0, n_replicacoes, replicacoes_por_tarefa)]
+    pendentes = [-(-n_replicacoes // replicacoes_por_tarefa)] * len(pontos)
+
+    def concluir(indice, inicio, parte, medido=None):
+        # As fatias chegam fora de ordem: cada uma vai para a sua posição
+        tabela[indice, inicio:inicio + len(parte)] = parte
+        instr.mesclar(medido)
+        pendentes[indice] -= 1
+        if pendentes[indice]:
+            return None
+        instr.contar("varredura:pontos")
+        registros = tabela[indice]
+        resultado = {m: registros[m] for m in METRICAS}
+        resultado["registros"] = registros
+        resultado["indice"] = indice
+        resultado["parametros"] = pontos[indice]
+        resultado["resumo"] = resumir_replicacoes(resultado)
+        return resultado
+
+    with _abrir_pool(n_processos) as pool:
+        for feito in _executar_tarefas(tarefas, pool):
+            pronto = concluir(*feito)
+            if pronto is not None:
+                yield pronto
+
+
+def varrer(pontos: list[dict], **kwargs) -> list[dict]:
+    """Como varrer_em_fluxo, mas devolve a lista completa na ordem de `pontos`."""
+    return sorted(varrer_em_fluxo(pontos, **kwargs), key=lambda r: r["indice"])
+
+
+def varrer_promissores(pontos: list[dict], margem: float = 0.10,
+                       nivel_servico_min: float | None = None,
+                       n_max: int | None = None, **kwargs) -> list[dict]:
+    """
+    Simula só os pontos aprovados na triagem analítica (ver
+    analitico_estoque.triar_pontos); `indice` continua sendo a posição em
+    `pontos`. Os demais argumentos vão para varrer.
+    """
+    from analitico_estoque import triar_pontos
+
+    escolhidos = triar_pontos(pontos, margem=margem,
+                              nivel_servico_min=nivel_servico_min, n_max=n_max)
+    resultados = varrer([pontos[i] for i in escolhidos], **kwargs)
+    for r in resultados:
+        r["indice"] = escolhidos[r["indice"]]
+    return resultados
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 3. MODO ADAPTATIVO (PARADA PELO IC)
+# ══════════════════════════════════════════════════════════════════════════════
+def meias_larguras(registros: np.ndarray, metricas) -> dict:
+    """Meia-largura do IC 95% da média de cada métrica das réplicas."""
+    z_ic = quantil_normal(0.975)
+    n = len(registros)
+    return {m: (z_ic * np.asarray(registros[m], dtype=float).std(ddof=1) / np.sqrt(n)
+                if n > 1 else np.inf)
+            for m in metricas}
+
+
+def _replicacoes_necessarias(n: int, meias: dict, metas: dict) -> int:
+    """Réplicas para atingir todas as metas, pelo IC que cai com 1/√n."""
+    razao = max((meias[m] / metas[m]) ** 2 for m in metas)
+    return math.ceil(n * razao) if np.isfinite(razao) else 2 * n
+
+
+def varrer_adaptativo(pontos: list[dict], metas: dict | None = None,
+                      replicacoes_iniciais: int = REPLICACOES_INICIAIS,
+                      replicacoes_max: int = REPLICACOES_MAX_PONTO,
+                      orcamento: int | None = None,
+                      seed: int | None = SEED, n_processos: int | None = None,
+                      replicacoes_por_tarefa: int = REPLICACOES_POR_TAREFA,
+                      dtype_custo=np.float32, gerador: str = GERADOR_PADRAO) -> list[dict]:
+    """
+    Simula cada ponto em rodadas até a meia-largura do IC 95% de cada métrica
+    de `metas` ({métrica: meia-largura}, padrão META_MEIA_LARGURA) ficar
+    abaixo da meta, o ponto chegar a `replicacoes_max` réplicas ou o total
+    de réplicas da varredura chegar a `orcamento`.
+
+    A cada rodada, cada ponto pendente pede as réplicas que faltam pela
+    estimativa atual do desvio (no máximo dobrando o que já tem); se o
+    orçamento não der para todos, os pontos mais longe da meta vêm primeiro.
+    As réplicas de um ponto são as primeiras de sementes_dos_pontos, então
+    o resultado não depende do número de processos e as primeiras N réplicas
+    coincidem com varrer(n_replicacoes=N).
+
+    Retorna um dicionário por ponto, na ordem de `pontos`, com as chaves de
+    varrer mais:
+        - replicacoes  : réplicas usadas
+        - meia_largura : {métrica: meia-largura do IC 95% atingida}
+        - convergiu    : True se todas as metas foram atingidas
+    """
+    metas = dict(META_MEIA_LARGURA if metas is None else metas)
+    n_pontos = len(pontos)
+    if orcamento is not None and orcamento < n_pontos * replicacoes_iniciais:
+        raise ValueError(f"orcamento ({orcamento}) menor que a rodada inicial "
+                         f"({n_pontos} pontos × {replicacoes_iniciais} réplicas)")
+    tabela = tabela_resultados((n_pontos, replicacoes_max), dtype_custo)
+    sementes = sementes_dos_pontos(n_pontos, replicacoes_max, seed, gerador)
+    usadas = [0] * n_pontos
+    meias = [None] * n_pontos
+    pedidos = {i: min(replicacoes_iniciais, replicacoes_max) for i in range(n_pontos)}
+    restante = np.inf if orcamento is None else orcamento
+
+    with _abrir_pool(n_processos) as pool:
+        while pedidos:
+            instr.contar("varredura:rodadas")
+            tarefas = []
+            for i, extra in pedidos.items():
+                fim = usadas[i] + extra
+                tarefas += [(i, ini, pontos[i], sementes[i][ini:min(ini + replicacoes_por_tarefa, fim)],
+                             tabela.dtype, gerador)
+                            for ini in range(usadas[i], fim, replicacoes_por_tarefa)]
+            for indice, inicio, parte, medido in _executar_tarefas(tarefas, pool):
+                tabela[indice, inicio:inicio + len(parte)] = parte
+                instr.mesclar(medido)
+            for i, extra in pedidos.items():
+                usadas[i] += extra
+                restante -= extra
+                meias[i] = meias_larguras(tabela[i, :usadas[i]], metas)
+
+            # Próxima rodada: os pontos mais longe da meta primeiro
+            faltando = []
+            for i in range(n_pontos):
+                if usadas[i] >= replicacoes_max or all(meias[i][m] <= metas[m] for m in metas):
+                    continue
+                alvo = _replicacoes_necessarias(usadas[i], meias[i], metas)
+                extra = min(max(alvo - usadas[i], INCREMENTO_MINIMO),
+                            usadas[i], replicacoes_max - usadas[i])
+                faltando.append((alvo / usadas[i], i, extra))
+            pedidos = {}
+            for _, i, extra in sorted(faltando, reverse=True):
+                extra = int(min(extra, restante - sum(pedidos.values())))
+                if extra <= 0:
+                    break
+                pedidos[i] = extra
+
+    resultados = []
+    for i, ponto in enumerate(pontos):
+        instr.contar("varredura:pontos")
+        registros = tabela[i, :usadas[i]]
+        resultado = {m: registros[m] for m in METRICAS}
+        resultado.update(registros=registros, indice=i, parametros=ponto,
+                         replicacoes=usadas[i], meia_largura=meias[i],
+                         convergiu=all(meias[i][m] <= metas[m] for m in metas))
+        resultado["resumo"] = resumir_replicacoes(resultado)
+        resultados.append(resultado)
+    return resultados
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 4. ESTUDOS DO RELATÓRIO (FIGS 6 E 7)
+# ══════════════════════════════════════════════════════════════════════════════
+def estudo_tradeoff(niveis_alvo=NIVEIS_ALVO_TRADEOFF, Q: int = EOQ,
+                    adaptativo: bool = False, **kwargs) -> dict:
+    """
+    Fig 6: custo total médio e nível de serviço obtido por nível alvo.
+    adaptativo=True usa varrer_adaptativo (kwargs vão para ele).
+    """
+    executar = varrer_adaptativo if adaptativo else varrer
+    resultados = executar(grade_tradeoff_servico(niveis_alvo, Q=Q), **kwargs)
+    return {
+        "niveis_alvo": np.asarray(niveis_alvo),
+        "custos": [r["resumo"]["custo_total"]["media"] for r in resultados],
+        "servicos": [r["resumo"]["nivel_servico"]["media"] * 100 for r in resultados],
+        "resultados": resultados,
+    }
+
+
+def estudo_sigma_lead_time(sigma_L_range=SIGMA_L_SENSIBILIDADE,
+                           nivel_servico: float = NIVEL_SERVICO_ALVO,
+                           Q: int = EOQ, adaptativo: bool = False,
+                           **kwargs) -> dict:
+    """Fig 7: SS necessário e custo total médio para cada σ_L (ver estudo_tradeoff)."""
+    pontos = grade_sigma_lead_time(sigma_L_range, nivel_servico, Q=Q)
+    executar = varrer_adaptativo if adaptativo else varrer
+    resultados = executar(pontos, **kwargs)
+    return {
+        "sigma_L": np.asarray(sigma_L_range),
+        "ss": [p["ROP"] - DEMANDA_MEDIA * LEAD_TIME_MEDIO for p in pontos],
+        "custos": [r["resumo"]["custo_total"]["media"] for r in resultados],
+        "resultados": resultados,
+    }